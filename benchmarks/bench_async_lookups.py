@@ -0,0 +1,133 @@
+# benchmarks/bench_async_lookups.py
+"""
+Benchmark : N lectures d'opérations par ID, synchrones puis asynchrones.
+
+- synchrone : boucle sur read.get_operation_by_id (sans cache, une requête par ID),
+  sur l'engine partagé de database.connection
+- asynchrone : async_api.fetch_operations (asyncio.gather sur le pool asyncpg)
+
+Dans les deux modes, les connexions sont ouvertes avant la mesure : seules les
+lectures sont chronométrées, pas la création de l'engine ni des connexions.
+
+Sur une base locale, l'aller-retour réseau est quasi nul : chaque lecture est limitée
+par le CPU et la concurrence n'apporte rien. --latency-ms interpose un relais TCP local
+qui retarde chaque paquet (moitié de la latence dans chaque sens), comme une base
+distante : les lectures synchrones attendent chaque aller-retour l'une après l'autre,
+les lectures asynchrones se recouvrent.
+
+Les IDs lus sont pris parmi les opérations existantes (répétés si la base en contient
+moins que N). À lancer depuis src/ (fichier .env) :
+
+    python ../benchmarks/bench_async_lookups.py --n 1000
+    python ../benchmarks/bench_async_lookups.py --n 1000 --latency-ms 5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+from dotenv import dotenv_values
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+def start_latency_proxy(host: str, port: int, latency_ms: float) -> int:
+    """
+    Relais TCP local (thread dédié) vers host:port, qui retarde chaque paquet de
+    latency_ms / 2 dans chaque sens. Retourne le port d'écoute.
+    """
+    delay = latency_ms / 2000
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    async def pipe(reader, writer):
+        queue = asyncio.Queue()
+
+        async def receive():
+            while True:
+                data = await reader.read(65536)
+                await queue.put((loop.time() + delay, data))
+                if not data:
+                    return
+
+        async def deliver():
+            while True:
+                due, data = await queue.get()
+                await asyncio.sleep(max(0.0, due - loop.time()))
+                if not data:
+                    writer.close()
+                    return
+                writer.write(data)
+                await writer.drain()
+
+        await asyncio.gather(receive(), deliver())
+
+    async def handle(client_reader, client_writer):
+        server_reader, server_writer = await asyncio.open_connection(host, port)
+        await asyncio.gather(pipe(client_reader, server_writer), pipe(server_reader, client_writer),
+                             return_exceptions=True)
+
+    server = asyncio.run_coroutine_threadsafe(asyncio.start_server(handle, "127.0.0.1", 0), loop).result()
+    return server.sockets[0].getsockname()[1]
+
+def _sample_ids(n: int):
+    from sqlalchemy import text
+    from database.connection import get_engine
+
+    with get_engine().connect() as conn:
+        ids = list(conn.execute(text("SELECT operation_id FROM operations ORDER BY operation_id")).scalars())
+    if not ids:
+        raise SystemExit("Aucune opération en base : rien à lire")
+    return [ids[i % len(ids)] for i in range(n)]
+
+def bench_sync(ids):
+    from database.read import get_operation_by_id
+
+    # Engine partagé et connexion ouverts avant la mesure
+    get_operation_by_id.uncached(ids[0])
+    start = time.perf_counter()
+    found = sum(get_operation_by_id.uncached(op_id) is not None for op_id in ids)
+    return time.perf_counter() - start, found
+
+async def _bench_async(ids, concurrency):
+    from database import async_api
+
+    # Connexions ouvertes avant la mesure, comme en mode synchrone
+    await async_api.fetch_operations(ids[:concurrency or async_api.ASYNC_POOL_SIZE], concurrency)
+    start = time.perf_counter()
+    results = await async_api.fetch_operations(ids, concurrency)
+    elapsed = time.perf_counter() - start
+    await async_api.dispose_async_engine()
+    # fetch_operations déduplique par ID : recompter sur la liste demandée
+    return elapsed, sum(results[op_id] is not None for op_id in ids)
+
+def bench_async(ids, concurrency=None):
+    return asyncio.run(_bench_async(ids, concurrency))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lectures par ID : synchrone vs asyncio")
+    parser.add_argument("--n", type=int, default=1000, help="Nombre de lectures (défaut : 1000)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Requêtes asynchrones simultanées (défaut : taille maximale du pool)")
+    parser.add_argument("--latency-ms", type=float, default=0,
+                        help="Aller-retour réseau simulé vers la base, en ms (défaut : 0, connexion directe)")
+    args = parser.parse_args()
+
+    if args.latency_ms > 0:
+        # Avant l'import de database.connection, qui lit DB_HOST / DB_PORT
+        config = {**dotenv_values(), **os.environ}
+        os.environ["DB_PORT"] = str(start_latency_proxy(config["DB_HOST"], int(config["DB_PORT"]), args.latency_ms))
+        os.environ["DB_HOST"] = "127.0.0.1"
+
+    ids = _sample_ids(args.n)
+    sync_seconds, sync_found = bench_sync(ids)
+    async_seconds, async_found = bench_async(ids, args.concurrency)
+
+    print(f"Latence simulée : {args.latency_ms:g} ms")
+    print(f"{'mode':<12}{'secondes':>10}{'lectures/s':>12}{'trouvées':>10}")
+    for mode, seconds, found in (("synchrone", sync_seconds, sync_found),
+                                 ("asyncio", async_seconds, async_found)):
+        print(f"{mode:<12}{seconds:>10.3f}{len(ids) / seconds:>12.0f}{found:>10}")
+    print(f"Accélération : x{sync_seconds / async_seconds:.2f}")
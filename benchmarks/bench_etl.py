@@ -0,0 +1,231 @@
+# benchmarks/bench_etl.py
+"""
+Benchmark : chaque étape du pipeline ETL, sur données synthétiques, à plusieurs échelles.
+
+Pour chaque échelle (nombre d'opérations), les CSV bruts sont générés par
+ingestion.synthetic_data (graine fixe) dans un répertoire temporaire, puis mesurés :
+- lecture_csv : lecture de operations.csv et operations_stats.csv
+- une étape par transformation de prepare_tables.OPERATIONS_STEPS (dates, imputations...)
+- stats, fusion : préparation de operations_stats et jointure avec les opérations
+- validation : OPERATIONS_SCHEMA (DataValidator.validate_operations)
+- quarantaine : écriture des lignes invalides (répertoire temporaire)
+- tables_filles : prepare_flotteurs et prepare_resultats_humain
+- chargement : insertion comme database/load_to_postgres.py (to_sql puis agrégats), dans
+  une transaction annulée à la fin : rien n'est conservé en base
+
+Par étape : durée (médiane de --repeat passes), lignes/s, pic mémoire mesuré par
+tracemalloc lors d'une passe séparée (allocations Python et numpy ; les buffers Arrow,
+dont les colonnes texte de pandas, sont rapportés à part : `arrow_mb`, retenus en fin d'étape).
+
+Les résultats sont comparés à une référence (--baseline) : le script sort en erreur si une
+étape est plus lente ou plus gourmande en mémoire que la référence au-delà de --threshold.
+La référence s'enregistre avec --save-baseline, sur la machine où le benchmark sera rejoué.
+Le chargement nécessite une base accessible (fichier .env) ; --no-load pour l'ignorer.
+À lancer depuis src/ :
+
+    python ../benchmarks/bench_etl.py --scales 10000 100000 --save-baseline
+    python ../benchmarks/bench_etl.py --scales 10000 100000 --json etl.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+import pandas as pd  # noqa: E402
+import pyarrow as pa  # noqa: E402
+
+from database.aggregates import apply_operations  # noqa: E402
+from database.audit_triggers import set_changed_by  # noqa: E402
+from database.connection import get_engine  # noqa: E402
+from ingestion.data_ingestion import conform_text_columns  # noqa: E402
+from ingestion.prepare_tables import (  # noqa: E402
+    OPERATIONS_STEPS, merge_stats, prepare_flotteurs, prepare_resultats_humain, prepare_stats,
+)
+from ingestion.readers import read_raw  # noqa: E402
+from ingestion.synthetic_data import generate_dataset  # noqa: E402
+from validation.validator import DataValidator  # noqa: E402
+
+DEFAULT_SCALES = (10_000, 100_000)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "etl_baseline.json")
+DEFAULT_THRESHOLD = 0.25
+SEED = 0
+# IDs hors de la plage des données réelles : pas de conflit avec les opérations en base
+FIRST_OPERATION_ID = 900_000_000_000
+# En deçà, un écart avec la référence est considéré comme du bruit de mesure
+MIN_SECONDS_DELTA = 0.05
+MIN_MB_DELTA = 5.0
+
+def _measure(stage: str, func, trace: bool):
+    """Exécute func() ; retourne son résultat et les mesures de l'étape."""
+    arrow_start = pa.total_allocated_bytes()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    peak_mb = None
+    if trace:
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    arrow_mb = max(pa.total_allocated_bytes() - arrow_start, 0) / 2**20
+    return result, {"stage": stage, "seconds": seconds, "peak_mb": peak_mb, "arrow_mb": arrow_mb}
+
+def load_rolled_back(df_ops: pd.DataFrame, df_fl: pd.DataFrame, df_rh: pd.DataFrame):
+    """Chargement de database/load_to_postgres.py, dans une transaction annulée."""
+    with get_engine().connect() as conn:
+        transaction = conn.begin()
+        try:
+            set_changed_by(conn, "bench_etl")
+            df_ops.to_sql("operations", conn, if_exists="append", index=False)
+            df_fl.to_sql("flotteurs", conn, if_exists="append", index=False)
+            df_rh.to_sql("resultats_humain", conn, if_exists="append", index=False)
+            apply_operations(conn, df_ops["operation_id"], +1)
+        finally:
+            transaction.rollback()
+
+def run_pipeline(data_dir: str, quarantine_dir: str, load: bool = True, trace: bool = False) -> list:
+    """Une passe complète du pipeline ; retourne les mesures de chaque étape."""
+    stages = []
+
+    def stage(name, func, rows):
+        result, record = _measure(name, func, trace)
+        record["rows"] = rows(result) if callable(rows) else rows
+        stages.append(record)
+        return result
+
+    ops, stats = stage("lecture_csv", lambda: (read_raw(data_dir, "operations", low_memory=False),
+                                               read_raw(data_dir, "operations_stats", low_memory=False)),
+                       lambda frames: len(frames[0]))
+    n = len(ops)
+    for name, step in OPERATIONS_STEPS:
+        ops = stage(name, lambda: step(ops), n)
+    stats_minimal = stage("stats", lambda: prepare_stats(stats), n)
+    ops = stage("fusion", lambda: merge_stats(ops, stats_minimal), n)
+
+    validator = DataValidator(quarantine_dir)
+    to_validate = ops.copy()
+    _, invalid, report = stage("validation", lambda: validator.validate_operations(conform_text_columns(to_validate)), n)
+    if not invalid.empty:
+        stage("quarantaine", lambda: validator.quarantine_invalid_data(invalid, "bench_etl", report), len(invalid))
+
+    df_fl, df_rh = stage("tables_filles", lambda: (prepare_flotteurs(data_dir), prepare_resultats_humain(data_dir)),
+                         lambda frames: len(frames[0]) + len(frames[1]))
+    if load:
+        stage("chargement", lambda: load_rolled_back(ops, df_fl, df_rh), n + len(df_fl) + len(df_rh))
+    return stages
+
+def bench_scale(operations: int, repeat: int, load: bool, workers=None) -> list:
+    """Mesures d'une échelle : durées médianes de `repeat` passes, mémoire d'une passe tracée."""
+    with tempfile.TemporaryDirectory(prefix="bench_etl_") as tmp:
+        data_dir = os.path.join(tmp, "raw")
+        generate_dataset(data_dir, operations, seed=SEED, workers=workers, first_operation_id=FIRST_OPERATION_ID)
+        passes = [run_pipeline(data_dir, os.path.join(tmp, "quarantine"), load) for _ in range(repeat)]
+        traced = run_pipeline(data_dir, os.path.join(tmp, "quarantine"), load, trace=True)
+
+    results = []
+    for index, memory in enumerate(traced):
+        seconds = statistics.median(run[index]["seconds"] for run in passes)
+        results.append({
+            "scale": operations,
+            "stage": memory["stage"],
+            "rows": memory["rows"],
+            "seconds": seconds,
+            "rows_per_second": memory["rows"] / seconds if seconds else None,
+            "peak_mb": memory["peak_mb"],
+            "arrow_mb": memory["arrow_mb"],
+        })
+    return results
+
+def compare(results: list, baseline: dict, threshold: float) -> list:
+    """Régressions : étapes plus lentes ou plus gourmandes que la référence au-delà du seuil."""
+    reference = {(r["scale"], r["stage"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        ref = reference.get((result["scale"], result["stage"]))
+        if ref is None:
+            continue
+        if (result["seconds"] > ref["seconds"] * (1 + threshold)
+                and result["seconds"] - ref["seconds"] >= MIN_SECONDS_DELTA):
+            regressions.append(f"{result['stage']} ({result['scale']:,} op.) : {result['seconds']:.3f} s "
+                               f"contre {ref['seconds']:.3f} s ({result['seconds'] / ref['seconds'] - 1:+.0%})")
+        if (ref.get("peak_mb") and result["peak_mb"] > ref["peak_mb"] * (1 + threshold)
+                and result["peak_mb"] - ref["peak_mb"] >= MIN_MB_DELTA):
+            regressions.append(f"{result['stage']} ({result['scale']:,} op.) : pic {result['peak_mb']:.0f} Mo "
+                               f"contre {ref['peak_mb']:.0f} Mo ({result['peak_mb'] / ref['peak_mb'] - 1:+.0%})")
+    return regressions
+
+def print_results(results: list, baseline=None):
+    reference = {(r["scale"], r["stage"]): r for r in baseline["results"]} if baseline else {}
+    print(f"{'échelle':>10}  {'étape':<20}{'lignes':>11}{'durée (s)':>11}{'lignes/s':>12}"
+          f"{'pic (Mo)':>10}{'Arrow (Mo)':>12}{'vs réf.':>9}")
+    for result in results:
+        ref = reference.get((result["scale"], result["stage"]))
+        delta = f"{result['seconds'] / ref['seconds'] - 1:+.0%}" if ref and ref["seconds"] else "-"
+        rate = f"{result['rows_per_second']:,.0f}" if result["rows_per_second"] else "-"
+        print(f"{result['scale']:>10,}  {result['stage']:<20}{result['rows']:>11,}{result['seconds']:>11.3f}"
+              f"{rate:>12}{result['peak_mb']:>10.1f}{result['arrow_mb']:>12.1f}{delta:>9}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Étapes du pipeline ETL sur données synthétiques")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES),
+                        help="Nombres d'opérations (défaut : 10000 100000)")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes chronométrées par échelle (défaut : 1)")
+    parser.add_argument("--workers", type=int, default=None, help="Processus de génération (défaut : nombre de CPU)")
+    parser.add_argument("--no-load", action="store_true", help="Ne pas mesurer le chargement PostgreSQL")
+    parser.add_argument("--json", help="Fichier où écrire les résultats")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Référence (défaut : benchmarks/etl_baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Enregistrer les résultats comme référence")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Dégradation tolérée par étape (défaut : 0.25, soit +25 %%)")
+    args = parser.parse_args()
+
+    # Import de pandera hors mesure : la première validation ne doit pas le compter
+    import validation.schemas  # noqa: E402,F401
+
+    results = []
+    for scale in args.scales:
+        print(f"Échelle {scale:,} opérations...")
+        results.extend(bench_scale(scale, args.repeat, not args.no_load, args.workers))
+
+    output = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+        print(f"Résultats écrits dans {args.json}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+        print(f"[OK] Référence enregistrée dans {args.baseline}")
+    elif baseline is None:
+        print(f"[WARN] Pas de référence ({args.baseline}) : lancer avec --save-baseline pour en créer une")
+    else:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n[ERREUR] {len(regressions)} régression(s) au-delà de {args.threshold:.0%} :")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"\n[OK] Aucune régression au-delà de {args.threshold:.0%} par rapport à {args.baseline}")
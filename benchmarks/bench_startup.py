@@ -0,0 +1,105 @@
+# benchmarks/bench_startup.py
+"""
+Benchmark : démarrage à froid et coût d'une relance de l'interface Streamlit.
+
+Chaque page (accueil, opérations, analyses, historique) est mesurée dans un processus
+neuf, avec streamlit.testing (AppTest) :
+- import : import des modules de la page (caching et module de la page)
+- premier rendu : première exécution du script (caches vides, requêtes)
+- relance : médiane de N relances sans interaction (caches chauds)
+ainsi que les modules lourds chargés à l'issue du premier rendu (pandera, duckdb, openpyxl).
+
+Nécessite une base accessible (fichier .env). À lancer depuis src/ :
+
+    python ../benchmarks/bench_startup.py --reruns 20
+"""
+
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+APP_SCRIPT = os.path.join(SRC_DIR, "app", "streamlit_app.py")
+
+# Page (st.session_state.page) -> modules importés par son rendu
+PAGES = {
+    "home": ["caching"],
+    "operations": ["caching", "operations"],
+    "analytics": ["caching", "analytics"],
+    "audit_log": ["caching", "audit"],
+}
+HEAVY_MODULES = ("pandera", "duckdb", "openpyxl")
+
+def measure_page(page: str, reruns: int) -> dict:
+    """Mesures d'une page, dans le processus courant (à appeler dans un processus neuf)."""
+    sys.path[:0] = [SRC_DIR, os.path.dirname(APP_SCRIPT)]
+    from streamlit.testing.v1 import AppTest
+
+    start = time.perf_counter()
+    for module in PAGES[page]:
+        importlib.import_module(module)
+    import_seconds = time.perf_counter() - start
+
+    app = AppTest.from_file(APP_SCRIPT, default_timeout=120)
+    app.session_state["page"] = page
+    start = time.perf_counter()
+    app.run()
+    first_run_seconds = time.perf_counter() - start
+    if app.exception:
+        raise SystemExit(f"Erreur sur la page {page} : {app.exception[0].value}")
+
+    rerun_seconds = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        rerun_seconds.append(time.perf_counter() - start)
+
+    return {
+        "page": page,
+        "import_seconds": import_seconds,
+        "first_run_seconds": first_run_seconds,
+        "rerun_seconds": statistics.median(rerun_seconds) if rerun_seconds else None,
+        "heavy_modules": [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+
+def run_isolated(page: str, reruns: int) -> dict:
+    """Mesure une page dans un processus Python neuf (démarrage à froid)."""
+    env = {**os.environ, "DISABLE_PANDERA_IMPORT_WARNING": "True"}
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--page", page, "--reruns", str(reruns), "--child"],
+        capture_output=True, text=True, env=env,
+    )
+    if completed.returncode != 0:
+        raise SystemExit(completed.stderr.strip() or completed.stdout.strip())
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Démarrage à froid et relances de l'interface Streamlit")
+    parser.add_argument("--page", choices=list(PAGES), action="append",
+                        help="Page à mesurer (répétable, défaut : toutes)")
+    parser.add_argument("--reruns", type=int, default=10, help="Relances mesurées par page (défaut : 10)")
+    parser.add_argument("--json", help="Fichier où écrire les résultats")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_page(args.page[0], args.reruns)))
+        sys.exit(0)
+
+    results = [run_isolated(page, args.reruns) for page in args.page or PAGES]
+
+    print(f"{'page':<12}{'import (s)':>12}{'1er rendu (s)':>15}{'relance (ms)':>14}  modules lourds")
+    for result in results:
+        rerun = f"{result['rerun_seconds'] * 1000:.0f}" if result["rerun_seconds"] is not None else "-"
+        print(f"{result['page']:<12}{result['import_seconds']:>12.2f}{result['first_run_seconds']:>15.2f}"
+              f"{rerun:>14}  {', '.join(result['heavy_modules']) or '-'}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Résultats écrits dans {args.json}")
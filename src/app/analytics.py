@@ -0,0 +1,137 @@
+# src/app/analytics.py
+"""
+Tableau de bord analytique des opérations.
+
+Chaque graphique est calculé par la base : GROUP BY / date_trunc via
+`database.query.aggregate_operations`, ou lecture des tables d'agrégats de la couche Or
+(`database.aggregates`). Seuls les groupes transitent vers l'interface, jamais les lignes
+brutes ; les résultats sont mis en cache par combinaison de filtres (`caching`) et
+effacés après une écriture.
+
+Les agrégats, dont la taille ne dépend pas de la profondeur de l'historique, servent
+la série temporelle au mois, au trimestre ou à l'année tant que seuls CROSS et type
+d'opération sont filtrés, et le bilan humain en l'absence de filtre.
+"""
+
+import pandas as pd
+import streamlit as st
+
+from caching import aggregate_operations, count_operations, get_aggregate
+from database.query import period_filters
+from grid import TYPE_OPERATIONS
+
+TIME_BUCKET_LABELS = {"day": "Jour", "week": "Semaine", "month": "Mois", "quarter": "Trimestre", "year": "Année"}
+# Granularités calculables depuis agg_operations_mensuelles (mois et au-delà)
+MONTHLY_BUCKETS = {"month": "M", "quarter": "Q", "year": "Y"}
+# Filtres couverts par les clés de agg_operations_mensuelles
+MONTHLY_FILTERS = {"cross_name", "type_operation"}
+BREAKDOWNS = {
+    "phase_journee": "Phase de la journée",
+    "vent_force": "Force du vent (Beaufort)",
+    "mer_force": "État de la mer (Douglas)",
+    "maree_categorie": "Marée",
+}
+PERSON_METRICS = {"nb_personnes": ("sum", "nombre"), "nb_blesses": ("sum", "dont_nombre_blesse")}
+
+def _as_list(value) -> list:
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+def _filters_form() -> tuple:
+    """Filtres de la page et granularité de la série temporelle."""
+    crosses = get_aggregate("agg_operations_mensuelles", ["cross_name"])["cross_name"].dropna().tolist()
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        cross_names = st.multiselect("CROSS", crosses, key="analytics_cross")
+    with col2:
+        types = st.multiselect("Type d'opération", TYPE_OPERATIONS, key="analytics_types")
+    with col3:
+        dates = st.date_input("Période", value=(), key="analytics_dates")
+    with col4:
+        bucket = st.selectbox("Granularité", list(TIME_BUCKET_LABELS), index=2,
+                              format_func=TIME_BUCKET_LABELS.get, key="analytics_bucket")
+
+    filters = {}
+    if cross_names:
+        filters["cross_name"] = cross_names
+    if types:
+        filters["type_operation"] = types
+    if len(dates) == 2:
+        filters.update(period_filters(*dates))
+    return filters, bucket
+
+def operations_over_time(filters: dict, bucket: str) -> pd.DataFrame:
+    """Opérations par période et type_operation (une colonne par type)."""
+    if set(filters) <= MONTHLY_FILTERS and bucket in MONTHLY_BUCKETS:
+        # Agrégat mensuel : CROSS x mois x type, regroupé à la granularité demandée
+        grouped = get_aggregate("agg_operations_mensuelles")
+        for column in MONTHLY_FILTERS & set(filters):
+            grouped = grouped[grouped[column].isin(_as_list(filters[column]))]
+        periods = pd.to_datetime(grouped["mois"]).dt.to_period(MONTHLY_BUCKETS[bucket])
+        grouped = grouped.assign(periode=periods.dt.start_time)
+        grouped = grouped.groupby(["periode", "type_operation"], dropna=False, as_index=False)["nb_operations"].sum()
+    else:
+        grouped = aggregate_operations(filters, ["periode", "type_operation"], time_bucket=bucket)
+    if grouped.empty:
+        return grouped
+    return grouped.fillna({"type_operation": "inconnu"}).pivot_table(
+        index="periode", columns="type_operation", values="nb_operations", aggfunc="sum", fill_value=0
+    )
+
+def breakdown(filters: dict, column: str) -> pd.DataFrame:
+    """Nombre d'opérations par valeur de `column`."""
+    grouped = aggregate_operations(filters, [column])
+    return grouped.fillna({column: "inconnu"}).set_index(column)
+
+def persons_by_result(filters: dict) -> pd.DataFrame:
+    """Personnes par resultat_humain (une colonne par categorie_personne)."""
+    if filters:
+        grouped = aggregate_operations(filters, ["resultat_humain", "categorie_personne"],
+                                       metrics=PERSON_METRICS, join="resultats_humain")
+    else:
+        grouped = get_aggregate("agg_resultats_humain", ["resultat_humain", "categorie_personne"])
+    if grouped.empty:
+        return grouped
+    return grouped.fillna({"resultat_humain": "inconnu", "categorie_personne": "inconnu"}).pivot_table(
+        index="resultat_humain", columns="categorie_personne", values="nb_personnes", aggfunc="sum", fill_value=0
+    )
+
+def main():
+    st.title("📊 Analyses des opérations")
+    filters, bucket = _filters_form()
+
+    persons = persons_by_result(filters)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Opérations", f"{count_operations(filters):,}")
+    with col2:
+        st.metric("Personnes impliquées", f"{int(persons.to_numpy().sum()) if not persons.empty else 0:,}")
+    with col3:
+        st.metric("CROSS", len(breakdown(filters, "cross_name")))
+
+    st.subheader(f"📈 Opérations par {TIME_BUCKET_LABELS[bucket].lower()}")
+    over_time = operations_over_time(filters, bucket)
+    if over_time.empty:
+        st.info("Aucune opération pour ces filtres")
+    else:
+        st.bar_chart(over_time)
+
+    st.subheader("🗼 Opérations par CROSS")
+    st.bar_chart(breakdown(filters, "cross_name")["nb_operations"])
+
+    st.subheader("🌦️ Conditions")
+    columns = st.columns(2)
+    for index, (column, label) in enumerate(BREAKDOWNS.items()):
+        with columns[index % 2]:
+            st.caption(label)
+            st.bar_chart(breakdown(filters, column)["nb_operations"])
+
+    st.subheader("👥 Bilan humain")
+    if persons.empty:
+        st.info("Aucun résultat humain pour ces filtres")
+    else:
+        st.bar_chart(persons)
+
+    if st.button("🏠 Retour à l'accueil", key="analytics_home"):
+        st.session_state.page = "home"
+        st.rerun()
@@ -0,0 +1,88 @@
+# src/app/audit.py
+"""
+Explorateur du journal d'audit.
+
+Filtres (auteur, opération, table, type de modification, colonne, période) et
+pagination par clé sont exécutés par PostgreSQL (`database.query.page_audit_log`) :
+seule la page affichée est lue. Les indicateurs portent sur l'ensemble des lignes
+filtrées et sont calculés en SQL (`database.query.summarize_audit_log`).
+"""
+
+import streamlit as st
+
+from caching import page_audit_log, summarize_audit_log
+from database.query import period_filters
+from pagination import cursor_stack, page_buttons
+
+PAGE_SIZES = (50, 100, 250, 500)
+AUDIT_TABLES = ["operations", "flotteurs", "resultats_humain"]
+AUDIT_OPERATIONS = ["INSERT", "UPDATE", "DELETE"]
+
+def _filters_form(key: str) -> dict:
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        changed_by = st.text_input("Modifié par", key=f"{key}_changed_by")
+    with col2:
+        operation_id = st.number_input("ID opération", value=None, step=1, key=f"{key}_operation_id")
+    with col3:
+        dates = st.date_input("Période", value=(), key=f"{key}_dates")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        tables = st.multiselect("Table", AUDIT_TABLES, key=f"{key}_tables")
+    with col2:
+        operations = st.multiselect("Modification", AUDIT_OPERATIONS, key=f"{key}_operations")
+    with col3:
+        column_name = st.text_input("Colonne", key=f"{key}_column")
+
+    filters = {}
+    if changed_by:
+        filters["changed_by"] = changed_by.strip()
+    if operation_id is not None:
+        filters["operation_id"] = int(operation_id)
+    if tables:
+        filters["table_name"] = tables
+    if operations:
+        filters["operation"] = operations
+    if column_name:
+        filters["column_name"] = column_name.strip()
+    if len(dates) == 2:
+        filters.update(period_filters(*dates))
+    return filters
+
+def main(key: str = "audit"):
+    st.title("📋 Historique des modifications")
+    filters = _filters_form(key)
+
+    summary = summarize_audit_log(filters)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Modifications", f"{summary['modifications']:,}")
+    with col2:
+        st.metric("Utilisateurs actifs", summary["utilisateurs"])
+    with col3:
+        st.metric("Tables modifiées", summary["tables"])
+    with col4:
+        st.metric("Opérations concernées", f"{summary['operations']:,}")
+    if summary["modifications"]:
+        st.caption(
+            f"{summary['insertions']:,} insertions · {summary['mises_a_jour']:,} mises à jour · "
+            f"{summary['suppressions']:,} suppressions · du {summary['premiere']:%d/%m/%Y %H:%M} "
+            f"au {summary['derniere']:%d/%m/%Y %H:%M}"
+        )
+
+    page_size = st.selectbox("Lignes / page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+
+    # Nouveaux filtres : retour à la première page
+    cursors = cursor_stack(key, repr((sorted(filters.items()), page_size)))
+    page, next_cursor = page_audit_log(filters, cursors[-1], page_size)
+
+    if page.empty:
+        st.info("Aucun historique disponible")
+    else:
+        first_row = (len(cursors) - 1) * page_size
+        st.caption(f"Page {len(cursors)} · entrées {first_row + 1}–{first_row + len(page)} "
+                   f"sur {summary['modifications']:,}")
+        st.dataframe(page, use_container_width=True, hide_index=True)
+
+    page_buttons(key, cursors, next_cursor)
@@ -0,0 +1,165 @@
+# src/app/caching.py
+"""
+Cache Streamlit de l'interface.
+
+Chaque clic relance le script : sans cache, chaque relance relit la base et recrée
+le validateur. Ce module conserve entre les relances (et entre les sessions) :
+- st.cache_resource : l'engine SQLAlchemy et le validateur, créés une seule fois
+- st.cache_data : les résultats des lectures, avec une durée de vie (TTL)
+
+Les pages appellent les fonctions de ce module à la place de database.read, puis
+`invalidate_operation` / `invalidate_quarantine` après une écriture réussie : seules
+les entrées touchées sont effacées, les autres restent servies sans requête.
+
+Durées de vie (secondes) : APP_CACHE_TTL (lectures, 300), APP_COUNT_TTL (compteurs, 60),
+APP_QUARANTINE_TTL (liste des fichiers de quarantaine, 60). Un fichier de quarantaine
+n'est jamais réécrit : son contenu et ses pages suivent APP_CACHE_TTL.
+"""
+
+import os
+
+import streamlit as st
+
+from database import query, read
+from database.aggregates import get_aggregate as _get_aggregate
+from database.connection import get_engine as _get_engine
+from database.stats import get_table_stats as _get_table_stats
+
+READ_TTL = int(os.getenv("APP_CACHE_TTL", "300"))
+COUNT_TTL = int(os.getenv("APP_COUNT_TTL", "60"))
+QUARANTINE_TTL = int(os.getenv("APP_QUARANTINE_TTL", "60"))
+
+# === Ressources ===
+
+@st.cache_resource
+def get_engine():
+    """Engine SQLAlchemy (et son pool), partagé par toutes les sessions."""
+    return _get_engine()
+
+@st.cache_resource
+def get_validator():
+    """Validateur Pandera, créé une seule fois (pandera n'est chargé qu'à la première validation)."""
+    from validation.validator import DataValidator
+
+    return DataValidator()
+
+# === Lectures ===
+
+@st.cache_data(ttl=READ_TTL, show_spinner=False)
+def get_operations(limit=100):
+    return read.get_operations(limit)
+
+@st.cache_data(ttl=READ_TTL, show_spinner=False)
+def get_operation_by_id(operation_id: int):
+    return read.get_operation_by_id(operation_id)
+
+@st.cache_data(ttl=READ_TTL, show_spinner=False)
+def get_operations_by_id_range(min_id: int, max_id: int):
+    return read.get_operations_by_id_range(min_id, max_id)
+
+@st.cache_data(ttl=READ_TTL, show_spinner=False)
+def query_operations(filters=None, columns=None):
+    return query.query_operations(filters, columns)
+
+@st.cache_data(ttl=READ_TTL, show_spinner=False)
+def aggregate_operations(filters=None, group_by=None, metrics=None, time_bucket=None, join=None):
+    return query.aggregate_operations(filters, group_by, metrics, time_bucket, join)
+
+@st.cache_data(ttl=READ_TTL, show_spinner=False)
+def get_aggregate(name: str, group_by=None):
+    return _get_aggregate(name, group_by)
+
+@st.cache_data(ttl=COUNT_TTL, show_spinner=False)
+def count_operations(filters=None) -> int:
+    if not any(value is not None for value in (filters or {}).values()):
+        # Sans filtre : compteur maintenu par triggers (database.stats), sans parcours de table
+        return int(read.get_operations_count())
+    return int(query.aggregate_operations(filters)["nb_operations"].sum())
+
+@st.cache_data(ttl=COUNT_TTL, show_spinner=False)
+def get_operation_id_range():
+    return read.get_operation_id_range()
+
+@st.cache_data(ttl=COUNT_TTL, show_spinner=False)
+def get_operations_count():
+    return read.get_operations_count()
+
+@st.cache_data(ttl=COUNT_TTL, show_spinner=False)
+def get_table_stats():
+    return _get_table_stats()
+
+@st.cache_data(ttl=READ_TTL, show_spinner=False)
+def get_audit_log(limit=100):
+    return read.get_audit_log(limit)
+
+@st.cache_data(ttl=READ_TTL, show_spinner=False)
+def page_audit_log(filters=None, cursor=None, limit=100):
+    return query.page_audit_log(filters, cursor, limit)
+
+@st.cache_data(ttl=COUNT_TTL, show_spinner=False)
+def summarize_audit_log(filters=None):
+    return query.summarize_audit_log(filters)
+
+@st.cache_data(ttl=QUARANTINE_TTL, show_spinner=False)
+def get_quarantine_files():
+    return get_validator().get_quarantine_files()
+
+@st.cache_data(ttl=READ_TTL, show_spinner=False)
+def load_quarantine_file(filename: str):
+    return get_validator().load_quarantine_file(filename)
+
+@st.cache_data(ttl=READ_TTL, show_spinner=False)
+def quarantine_error_groups(filename: str):
+    return get_validator().quarantine_error_groups(load_quarantine_file(filename))
+
+@st.cache_data(ttl=READ_TTL, show_spinner=False)
+def load_quarantine_page(filename: str, offset: int = 0, limit: int = 100, columns=None, check=None):
+    return get_validator().load_quarantine_page(filename, offset, limit, columns, check)
+
+# === Invalidation ===
+
+_generation = 0
+
+def data_generation() -> int:
+    """Compteur d'écritures de l'interface, pour les caches tenus hors de st.cache_data."""
+    return _generation
+
+def _clear(func, *args):
+    """Efface l'entrée de ces arguments (toutes les entrées avant Streamlit 1.37)."""
+    try:
+        func.clear(*args)
+    except TypeError:
+        func.clear()
+
+def invalidate_operation(operation_id=None, cardinality_changed: bool = False):
+    """
+    Efface les lectures touchées par une écriture validée sur des opérations.
+
+    Args:
+        operation_id: ID de l'opération écrite (None : plusieurs opérations, toutes effacées)
+        cardinality_changed: True pour INSERT/DELETE (compteurs et bornes d'IDs changent)
+    """
+    global _generation
+    _generation += 1
+    if operation_id is None:
+        get_operation_by_id.clear()
+    else:
+        _clear(get_operation_by_id, int(operation_id))
+    get_operations.clear()
+    get_operations_by_id_range.clear()
+    query_operations.clear()
+    get_audit_log.clear()
+    page_audit_log.clear()
+    summarize_audit_log.clear()
+    # Les groupes et les compteurs filtrés dépendent aussi des valeurs modifiées
+    aggregate_operations.clear()
+    get_aggregate.clear()
+    count_operations.clear()
+    if cardinality_changed:
+        get_operation_id_range.clear()
+        get_operations_count.clear()
+        get_table_stats.clear()
+
+def invalidate_quarantine():
+    """Efface la liste des fichiers de quarantaine (après une ingestion)."""
+    get_quarantine_files.clear()
@@ -0,0 +1,109 @@
+# src/app/grid.py
+"""
+Grille paginée des opérations.
+
+Une page à la fois est lue dans la base (`database.query.page_operations`, pagination
+par clé) : colonnes, tri et filtres sont appliqués en SQL, le navigateur ne reçoit
+jamais plus d'une page. La page suivante est préchargée en arrière-plan pendant
+l'affichage de la page courante.
+
+Les pages lues sont conservées dans la session et réutilisées tant qu'aucune écriture
+n'a eu lieu (`caching.data_generation`) et que leur âge reste inférieur à APP_CACHE_TTL.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from caching import READ_TTL, count_operations, data_generation
+from database.query import OPERATIONS_COLUMNS, page_operations, period_filters
+from pagination import cursor_stack, page_buttons
+
+PAGE_SIZES = (50, 100, 250, 500)
+DEFAULT_COLUMNS = [
+    "operation_id", "date_heure_reception_alerte", "type_operation", "evenement",
+    "cross_name", "departement", "pourquoi_alerte",
+]
+TYPE_OPERATIONS = ["SAR", "MAS", "DIV", "SUR"]
+# Pages conservées par grille (page courante, précédentes, préchargée)
+MAX_CACHED_PAGES = 10
+
+@st.cache_resource
+def _prefetch_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="grid-prefetch")
+
+def _request_page(key: str, query: dict, cursor):
+    """Page (future) de la requête et du curseur donnés, lancée si absente ou périmée."""
+    pages = st.session_state.setdefault(f"{key}_pages", {})
+    page_key = (repr(sorted(query.items())), cursor)
+    entry = pages.get(page_key)
+    if entry is None or entry["generation"] != data_generation() or time.time() - entry["started"] > READ_TTL:
+        future = _prefetch_executor().submit(page_operations, cursor=cursor, **query)
+        entry = {"future": future, "generation": data_generation(), "started": time.time()}
+        pages.pop(page_key, None)
+        pages[page_key] = entry
+        while len(pages) > MAX_CACHED_PAGES:
+            pages.pop(next(iter(pages)))
+    return page_key, entry["future"]
+
+def _filters_form(key: str) -> dict:
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        cross_name = st.text_input("CROSS", key=f"{key}_cross")
+    with col2:
+        departement = st.text_input("Département", key=f"{key}_departement")
+    with col3:
+        types = st.multiselect("Type d'opération", TYPE_OPERATIONS, key=f"{key}_types")
+    with col4:
+        dates = st.date_input("Période", value=(), key=f"{key}_dates")
+
+    filters = {}
+    if cross_name:
+        filters["cross_name"] = cross_name
+    if departement:
+        filters["departement"] = departement
+    if types:
+        filters["type_operation"] = types
+    if len(dates) == 2:
+        filters.update(period_filters(*dates))
+    return filters
+
+def operations_grid(key: str = "operations_grid"):
+    """Affiche la grille paginée des opérations (filtres, colonnes, tri, navigation)."""
+    filters = _filters_form(key)
+
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        columns = st.multiselect("Colonnes", OPERATIONS_COLUMNS, default=DEFAULT_COLUMNS, key=f"{key}_columns")
+    with col2:
+        sort_by = st.selectbox("Trier par", OPERATIONS_COLUMNS, key=f"{key}_sort")
+    with col3:
+        descending = st.checkbox("Décroissant", key=f"{key}_desc")
+    with col4:
+        page_size = st.selectbox("Lignes / page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+
+    query = {"filters": filters, "columns": columns or ["operation_id"], "sort_by": sort_by,
+             "descending": descending, "limit": page_size}
+
+    # Nouvelle requête : retour à la première page
+    cursors = cursor_stack(key, repr(sorted(query.items())))
+
+    _, future = _request_page(key, query, cursors[-1])
+    try:
+        page, next_cursor = future.result()
+    except Exception as e:
+        st.session_state[f"{key}_pages"].clear()
+        st.error(f"❌ Erreur lors de la lecture des opérations : {str(e)}")
+        return
+
+    # Préchargement de la page suivante pendant l'affichage
+    if next_cursor is not None:
+        _request_page(key, query, next_cursor)
+
+    total = count_operations(filters)
+    first_row = (len(cursors) - 1) * page_size
+    st.caption(f"Page {len(cursors)} · lignes {first_row + 1 if len(page) else 0}–{first_row + len(page)} sur {total}")
+    st.dataframe(page, use_container_width=True, hide_index=True)
+
+    page_buttons(key, cursors, next_cursor)
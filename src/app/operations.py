@@ -1,9 +1,92 @@
+import io
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from database.read import get_operations, get_operation_by_id, get_operations_count, get_operations_by_id_range
-from database.update import update_operation, delete_operation, insert_operation
-from ingestion.data_ingestion import ingest_operations_data
+from caching import (
+    count_operations, get_operation_by_id, get_operations_by_id_range, get_operations_count,
+    invalidate_operation, invalidate_quarantine
+)
+from database.update import VersionConflictError, update_operation, delete_operation, delete_operations, insert_operation
+from database.export import EXPORT_FORMATS, EXPORTABLE_TABLES, export_table
+from database.query import page_operations, period_filters
+from grid import operations_grid
+from ingestion.data_ingestion import CSV_CHUNK_SIZE, ingest_operations_data, ingest_operations_stream, read_csv_chunks
+from ingestion.readers import (
+    COLUMNAR_EXTENSIONS, UPLOAD_EXTENSIONS, columnar_row_count, file_extension,
+    iter_columnar_chunks, read_table_file
+)
+
+# Au-delà de cette taille, un fichier est importé en flux par défaut
+STREAMING_THRESHOLD_BYTES = 20 * 1024 * 1024
+# IDs affichés dans l'aperçu d'une suppression en masse
+BULK_PREVIEW_SIZE = 20
+
+def stream_upload(uploaded_file):
+    """Import en flux (CSV ou colonnaire) : morceaux validés, mis en quarantaine et insérés au fil de la lecture."""
+    fmt = file_extension(uploaded_file.name)
+    if fmt in COLUMNAR_EXTENSIONS:
+        preview = next(iter_columnar_chunks(uploaded_file, fmt, 5), pd.DataFrame())
+        total_rows = columnar_row_count(uploaded_file, fmt)
+    else:
+        preview = pd.read_csv(uploaded_file, nrows=5)
+        total_rows = None
+    uploaded_file.seek(0)
+    st.subheader("👀 Aperçu des données")
+    st.dataframe(preview, use_container_width=True)
+    st.caption(f"Fichier de {uploaded_file.size / 1e6:.1f} Mo, lu par morceaux de {CSV_CHUNK_SIZE} lignes")
+
+    if not st.button("🔍 Valider et importer en flux", key="validate_import_stream"):
+        return
+
+    progress = st.progress(0.0, text="Import en cours...")
+    throughput = st.empty()
+
+    def on_chunk(report):
+        if fmt in COLUMNAR_EXTENSIONS:
+            # Fichier colonnaire lu depuis son buffer : la progression vient du nombre de lignes
+            position = min(report["total_rows"] / total_rows, 1.0) if total_rows else 0.0
+        else:
+            position = min(uploaded_file.tell() / max(uploaded_file.size, 1), 1.0)
+        progress.progress(position, text=f"Morceau {report['chunks']} : {report['total_rows']} lignes lues")
+        throughput.caption(
+            f"⚡ {report['rows_per_second']:,.0f} lignes/s · {report['inserted_rows']} insérées · "
+            f"{report['invalid_rows']} en quarantaine"
+        )
+
+    if fmt in COLUMNAR_EXTENSIONS:
+        chunks = iter_columnar_chunks(uploaded_file, fmt, CSV_CHUNK_SIZE)
+    else:
+        chunks = read_csv_chunks(uploaded_file)
+    report = ingest_operations_stream(
+        chunks, source=f"upload_{uploaded_file.name}", on_chunk=on_chunk
+    )
+    progress.progress(1.0, text=f"Import terminé en {report['seconds']:.1f} s")
+    if report["inserted_rows"]:
+        invalidate_operation(cardinality_changed=True)
+    if report["quarantine_files"]:
+        invalidate_quarantine()
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total lignes", report["total_rows"])
+    with col2:
+        st.metric("Valides", report["valid_rows"])
+    with col3:
+        st.metric("Invalides", report["invalid_rows"])
+    with col4:
+        st.metric("Insérées", report["inserted_rows"])
+
+    if report["status"] == "success":
+        st.success(f"✅ {report['inserted_rows']} opérations insérées ({report['rows_per_second']:,.0f} lignes/s)")
+        if report["duplicate_rows"]:
+            st.warning(f"⚠️ {report['duplicate_rows']} lignes ignorées (operation_id déjà présent)")
+        if report["quarantine_files"]:
+            st.warning(f"⚠️ {report['invalid_rows']} lignes invalides mises en quarantaine "
+                       f"({len(report['quarantine_files'])} fichier(s))")
+    else:
+        st.error("❌ Erreur lors de l'ingestion")
+    for error in report["errors"]:
+        st.error(error)
 
 def main():
     # Informations générales
@@ -14,18 +97,28 @@ def main():
     st.header("📤 Importer des données (avec validation)")
 
     uploaded_file = st.file_uploader(
-        "Choisir un fichier CSV ou Excel",
-        type=['csv', 'xlsx', 'xls'],
-        help="Le fichier sera validé avec Pandera avant insertion"
+        "Choisir un fichier CSV, Parquet, Feather/Arrow ou Excel",
+        type=UPLOAD_EXTENSIONS,
+        help="Le fichier sera validé avec Pandera avant insertion. "
+             "Les formats colonnaires (Parquet, Feather, Arrow) sont lus sans conversion texte"
     )
 
-    if uploaded_file is not None:
+    # Gros fichiers : lecture, validation et insertion par morceaux (mémoire bornée)
+    streaming = False
+    if uploaded_file is not None and file_extension(uploaded_file.name) in ("csv", *COLUMNAR_EXTENSIONS):
+        streaming = st.checkbox(
+            "📦 Import en flux (gros fichiers)",
+            value=uploaded_file.size > STREAMING_THRESHOLD_BYTES,
+            key="upload_streaming",
+            help="Le fichier est lu, validé et inséré par morceaux, avec progression en direct"
+        )
+
+    if uploaded_file is not None and streaming:
+        stream_upload(uploaded_file)
+    elif uploaded_file is not None:
         try:
             # Lire le fichier
-            if uploaded_file.name.endswith('.csv'):
-                df_upload = pd.read_csv(uploaded_file)
-            else:
-                df_upload = pd.read_excel(uploaded_file)
+            df_upload = read_table_file(uploaded_file, name=uploaded_file.name)
 
             st.success(f"✅ Fichier chargé : {len(df_upload)} lignes")
 
@@ -69,6 +162,11 @@ def main():
                         # Validation normale
                         ingestion_report = ingest_operations_data(df_upload, source=f"upload_{uploaded_file.name}")
 
+                if ingestion_report["inserted_rows"]:
+                    invalidate_operation(cardinality_changed=True)
+                if ingestion_report.get("quarantine_file"):
+                    invalidate_quarantine()
+
                 # Afficher le rapport
                 st.subheader("📊 Rapport d'ingestion")
 
@@ -107,14 +205,9 @@ def main():
 
     st.divider()
 
-    # Option d'affichage de tous les enregistrements
+    # Grille paginée : une page à la fois, tri et filtres exécutés par la base
     st.header("📋 Vue d'ensemble")
-    if st.button("🔍 Afficher toutes les opérations", key="show_all"):
-        st.warning(f"⚠️ Chargement de {total_operations} opérations - cela peut prendre du temps...")
-        df_all = get_operations(limit=None)  # Pas de limite
-        st.success(f"✅ {len(df_all)} opérations affichées")
-        st.dataframe(df_all, use_container_width=True, hide_index=True)
-        st.info("💡 Utilisez la section ci-dessous pour filtrer par intervalle d'IDs")
+    operations_grid()
 
     # === Section Affichage par intervalle ===
     st.header("📊 Afficher des opérations (intervalle ID)")
@@ -135,6 +228,34 @@ def main():
             st.success(f"✅ {len(df_range)} opérations trouvées")
             st.dataframe(df_range, use_container_width=True, hide_index=True)
 
+    # === Section Export ===
+    st.header("📥 Exporter")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        export_table_name = st.selectbox("Table", EXPORTABLE_TABLES, key="export_table")
+    with col2:
+        export_format = st.selectbox("Format", EXPORT_FORMATS, key="export_format")
+    with col3:
+        export_dates = st.date_input("Période (optionnelle)", value=(), key="export_dates")
+
+    if st.button("📦 Préparer l'export", key="export_ok"):
+        filters = {}
+        if len(export_dates) == 2:
+            filters = period_filters(*export_dates)
+        buffer = io.BytesIO()
+        try:
+            report = export_table(export_table_name, buffer, export_format, filters)
+            st.success(f"✅ {report['rows']} lignes exportées en {report['seconds']:.2f} s")
+            st.download_button(
+                "💾 Télécharger",
+                data=buffer.getvalue(),
+                file_name=f"{export_table_name}.{export_format}",
+                key="export_download",
+            )
+        except Exception as e:
+            st.error(f"❌ Erreur lors de l'export : {str(e)}")
+
     # === Section Mise à jour ===
     st.header("✏️ Mettre à jour une opération")
 
@@ -206,13 +327,21 @@ def main():
                         if not updates:
                             st.info("ℹ️ Aucune modification détectée")
                         else:
-                            success = update_operation(
-                                operation_id=int(update_id),
-                                updates=updates,
-                                changed_by=changed_by
-                            )
+                            # Version lue à l'affichage : refus si un autre utilisateur a modifié l'opération depuis
+                            expected_version = int(current_row["version"].iloc[0]) if "version" in current_row.columns else None
+                            try:
+                                success = update_operation(
+                                    operation_id=int(update_id),
+                                    updates=updates,
+                                    changed_by=changed_by,
+                                    expected_version=expected_version
+                                )
+                            except VersionConflictError as e:
+                                st.error(f"❌ {e}. Rechargez l'opération avant de la modifier.")
+                                success = None
 
                             if success:
+                                invalidate_operation(update_id)
                                 st.success("✅ Opération mise à jour avec succès !")
                                 st.balloons()
                                 # Clear the form after a short delay to show the message
@@ -220,7 +349,7 @@ def main():
                                 time.sleep(2)
                                 st.session_state.update_id = 0
                                 st.rerun()
-                            else:
+                            elif success is False:
                                 st.error("❌ Erreur lors de la mise à jour")
 
     # === Section Suppression ===
@@ -253,6 +382,7 @@ def main():
                         changed_by="utilisateur_streamlit"
                     )
                     if success:
+                        invalidate_operation(delete_id, cardinality_changed=True)
                         st.success("✅ Opération supprimée avec succès !")
                         st.info(f"ℹ️ L'opération #{delete_id} a été définitivement supprimée de la base de données.")
                         st.session_state.delete_id = 0
@@ -264,6 +394,66 @@ def main():
                     st.info("Suppression annulée")
                     st.session_state.delete_id = 0
 
+    # === Section Suppression en masse ===
+    st.header("🧹 Suppression en masse")
+
+    bulk_mode = st.radio("Critère", ["Liste d'IDs", "Intervalle d'IDs", "Filtres"],
+                         horizontal=True, key="bulk_mode")
+    bulk_filters = {}
+    if bulk_mode == "Liste d'IDs":
+        ids_text = st.text_area("IDs (séparés par des virgules, espaces ou retours à la ligne)", key="bulk_ids")
+        tokens = ids_text.replace(",", " ").split()
+        if tokens:
+            try:
+                bulk_filters["operation_id"] = [int(token) for token in tokens]
+            except ValueError:
+                st.error("❌ Les IDs doivent être des entiers")
+    elif bulk_mode == "Intervalle d'IDs":
+        col1, col2 = st.columns(2)
+        with col1:
+            bulk_min = st.number_input("ID minimum", step=1, value=0, key="bulk_min")
+        with col2:
+            bulk_max = st.number_input("ID maximum", step=1, value=0, key="bulk_max")
+        if bulk_min <= bulk_max and (bulk_min, bulk_max) != (0, 0):
+            bulk_filters = {"id_min": int(bulk_min), "id_max": int(bulk_max)}
+    else:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            bulk_cross = st.text_input("CROSS", key="bulk_cross")
+        with col2:
+            bulk_type = st.selectbox("Type d'opération", ["", "SAR", "MAS", "DIV", "SUR"], key="bulk_type")
+        with col3:
+            bulk_dates = st.date_input("Période", value=(), key="bulk_dates")
+        if bulk_cross:
+            bulk_filters["cross_name"] = bulk_cross
+        if bulk_type:
+            bulk_filters["type_operation"] = bulk_type
+        if len(bulk_dates) == 2:
+            bulk_filters.update(period_filters(*bulk_dates))
+
+    if bulk_filters:
+        # Aperçu : COUNT côté serveur et premiers IDs seulement
+        bulk_count = count_operations(bulk_filters)
+        st.warning(f"⚠️ {bulk_count} opération(s) concernée(s), avec leurs flotteurs et résultats humains")
+        if bulk_count:
+            sample, _ = page_operations(bulk_filters, columns=["operation_id"], limit=BULK_PREVIEW_SIZE)
+            more = " ..." if bulk_count > len(sample) else ""
+            st.caption("IDs : " + ", ".join(str(op_id) for op_id in sample["operation_id"]) + more)
+        bulk_confirm = st.checkbox(f"Je confirme la suppression définitive de {bulk_count} opération(s)",
+                                   key="bulk_confirm")
+        if st.button("🗑️ Supprimer la sélection", key="bulk_delete_ok", disabled=not (bulk_confirm and bulk_count)):
+            with st.spinner("Suppression en cours..."):
+                report = delete_operations(filters=bulk_filters, changed_by="utilisateur_streamlit")
+            if report["operations"]:
+                invalidate_operation(cardinality_changed=True)
+            if report["error"]:
+                st.error(f"❌ Suppression interrompue : {report['error']}")
+            st.success(
+                f"✅ {report['operations']} opérations supprimées "
+                f"({report['flotteurs']} flotteurs, {report['resultats_humain']} résultats humains, "
+                f"{report['chunks']} transaction(s))"
+            )
+
     # === Section Ajout ===
     st.header("➕ Ajouter une nouvelle opération")
 
@@ -400,6 +590,7 @@ def main():
 
                 success = insert_operation(operation_data, changed_by)
                 if success:
+                    invalidate_operation(new_id, cardinality_changed=True)
                     st.success(f"✅ Nouvelle opération créée avec ID {new_id} !")
                     st.info(f"ℹ️ L'opération #{new_id} a été ajoutée à la base de données avec succès.")
                     st.rerun()
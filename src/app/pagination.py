@@ -0,0 +1,43 @@
+# src/app/pagination.py
+"""
+Pagination par clé (keyset) partagée par les pages de l'interface.
+
+La page courante est repérée par une pile de curseurs dans st.session_state
+(`{key}_cursors`) : le dernier est celui de la page affichée (None pour la première),
+`{key}_next` celui de la page suivante renvoyé par la requête.
+"""
+
+import streamlit as st
+
+def cursor_stack(key: str, signature: str) -> list:
+    """
+    Pile des curseurs de la pagination `key`, remise à la première page quand la
+    requête (`signature`) change.
+    """
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[f"{key}_cursors"] = [None]
+    return st.session_state[f"{key}_cursors"]
+
+def _go(key: str, step: str):
+    cursors = st.session_state[f"{key}_cursors"]
+    if step == "first":
+        del cursors[1:]
+    elif step == "previous" and len(cursors) > 1:
+        cursors.pop()
+    elif step == "next" and st.session_state.get(f"{key}_next") is not None:
+        cursors.append(st.session_state[f"{key}_next"])
+
+def page_buttons(key: str, cursors: list, next_cursor):
+    """Boutons Début / Précédente / Suivante ; `next_cursor` vaut None sur la dernière page."""
+    st.session_state[f"{key}_next"] = next_cursor
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.button("⏮️ Début", key=f"{key}_first", on_click=_go, args=(key, "first"),
+                  disabled=len(cursors) == 1, use_container_width=True)
+    with col2:
+        st.button("◀️ Précédente", key=f"{key}_previous", on_click=_go, args=(key, "previous"),
+                  disabled=len(cursors) == 1, use_container_width=True)
+    with col3:
+        st.button("Suivante ▶️", key=f"{key}_following", on_click=_go, args=(key, "next"),
+                  disabled=next_cursor is None, use_container_width=True)
@@ -0,0 +1,80 @@
+# src/app/quarantine.py
+"""
+Visualisation des fichiers de quarantaine.
+
+Le manifeste d'un fichier (source, contrôles en échec et leur nombre de lignes) est lu
+seul ; les lignes invalides sont lues page par page, limitées aux colonnes choisies et,
+au besoin, aux lignes en échec sur un contrôle (`DataValidator.load_quarantine_page`).
+"""
+
+import streamlit as st
+
+from caching import get_quarantine_files, load_quarantine_file, load_quarantine_page, quarantine_error_groups
+
+PAGE_SIZES = (50, 100, 250, 500)
+# Colonnes affichées par défaut : celles des contrôles en échec, à défaut les premières
+DEFAULT_COLUMN_COUNT = 8
+
+def _first_line(message) -> str:
+    return str(message).splitlines()[0] if message else ""
+
+def quarantine_viewer(key: str = "quarantine"):
+    """Section de la page d'accueil : erreurs regroupées et lignes paginées d'un fichier de quarantaine."""
+    quarantine_files = get_quarantine_files()
+    if not quarantine_files:
+        st.success("✅ Aucune donnée en quarantaine")
+        return
+
+    st.warning(f"⚠️ {len(quarantine_files)} fichier(s) en quarantaine détecté(s)")
+    selected_file = st.selectbox("Sélectionner un fichier de quarantaine", sorted(quarantine_files, reverse=True),
+                                 key=f"{key}_select")
+    if not selected_file:
+        return
+
+    record = load_quarantine_file(selected_file)
+    groups = quarantine_error_groups(selected_file)
+
+    st.subheader(f"📄 Détails de {selected_file}")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Lignes invalides", f"{record['total_invalid_rows']:,}")
+    with col2:
+        st.metric("Erreurs de validation", record["validation_report"].get("total_errors", len(groups)))
+    with col3:
+        st.metric("Source", record["source"])
+
+    # Une ligne par (colonne, contrôle) plutôt qu'un message par erreur
+    st.subheader("❌ Erreurs par colonne et contrôle")
+    st.dataframe(groups.assign(message=groups["message"].map(_first_line)),
+                 use_container_width=True, hide_index=True)
+
+    checks = {check["key"]: check for check in record.get("checks", [])}
+    columns = record.get("columns", [])
+    failing_columns = [c["column"] for c in checks.values() if c["column"] in columns]
+    default_columns = list(dict.fromkeys(failing_columns))[:DEFAULT_COLUMN_COUNT] or columns[:DEFAULT_COLUMN_COUNT]
+
+    st.subheader("📊 Données invalides")
+    col1, col2, col3 = st.columns([2, 3, 1])
+    with col1:
+        check = st.selectbox(
+            "Contrôle en échec", [None, *checks], key=f"{key}_check",
+            format_func=lambda k: "Tous" if k is None else f"{k} ({checks[k]['rows']:,} lignes)",
+        )
+    with col2:
+        selected_columns = st.multiselect("Colonnes", columns, default=default_columns, key=f"{key}_columns")
+    with col3:
+        page_size = st.selectbox("Lignes / page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+
+    total = checks[check]["rows"] if check is not None else record["total_invalid_rows"]
+    page_count = max((total - 1) // page_size + 1, 1)
+    page_number = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1, key=f"{key}_page")
+
+    page, total = load_quarantine_page(selected_file, (page_number - 1) * page_size, page_size,
+                                       selected_columns or None, check)
+    first_row = (page_number - 1) * page_size
+    st.caption(f"Page {page_number}/{page_count} · lignes {first_row + 1 if len(page) else 0}–"
+               f"{first_row + len(page)} sur {total:,}")
+    st.dataframe(page, use_container_width=True, hide_index=True)
+
+    # Option de correction (placeholder)
+    st.info("💡 Fonctionnalité de correction à venir")
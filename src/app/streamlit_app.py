@@ -1,6 +1,6 @@
 import streamlit as st
-from validation.validator import validator
-import pandas as pd
+
+from caching import get_table_stats
 
 # Gestion de la navigation
 if "page" not in st.session_state:
@@ -9,6 +9,9 @@ if "page" not in st.session_state:
 if st.session_state.page == "operations":
     import operations
     operations.main()
+elif st.session_state.page == "analytics":
+    import analytics
+    analytics.main()
 elif st.session_state.page == "flotteurs":
     st.title("⛵ Flotteurs - Bientôt disponible")
     st.info("Fonctionnalité en développement...")
@@ -22,26 +25,8 @@ elif st.session_state.page == "resultats_humain":
         st.session_state.page = "home"
         st.rerun()
 elif st.session_state.page == "audit_log":
-    st.title("📋 Historique des modifications")
-
-    from database.read import get_audit_log
-
-    # Afficher les dernières entrées du journal d'audit
-    df_audit = get_audit_log(limit=100)
-    if df_audit.empty:
-        st.info("Aucun historique disponible")
-    else:
-        st.success(f"✅ {len(df_audit)} entrées dans l'historique")
-        st.dataframe(df_audit, use_container_width=True, hide_index=True)
-
-        # Statistiques
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Modifications", len(df_audit))
-        with col2:
-            st.metric("Utilisateurs actifs", df_audit['changed_by'].nunique())
-        with col3:
-            st.metric("Tables modifiées", df_audit['table_name'].nunique())
+    import audit
+    audit.main()
 
     if st.button("🏠 Retour à l'accueil"):
         st.session_state.page = "home"
@@ -57,7 +42,7 @@ else:
     """)
 
     # Options de navigation
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5 = st.columns(5)
 
     with col1:
         if st.button("🚢 Opérations", key="nav_operations", use_container_width=True):
@@ -79,28 +64,35 @@ else:
             st.session_state.page = "audit_log"
             st.rerun()
 
+    with col5:
+        if st.button("📊 Analyses", key="nav_analytics", use_container_width=True):
+            st.session_state.page = "analytics"
+            st.rerun()
+
     # Informations générales
     st.divider()
     st.subheader("📈 Statistiques générales")
 
-    from database.read import get_operations_count, get_audit_log
+    # Compteurs maintenus par triggers : temps constant quelle que soit la taille des tables
+    table_stats = get_table_stats()
 
-    total_operations = get_operations_count()
-    total_audit_entries = len(get_audit_log(limit=None))
+    def format_count(table):
+        prefix = "" if table_stats[table]["exact"] else "≈ "
+        return f"{prefix}{table_stats[table]['rows']:,}"
 
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        st.metric("Opérations", f"{total_operations:,}")
+        st.metric("Opérations", format_count("operations"))
 
     with col2:
-        st.metric("Flotteurs", "à venir")
+        st.metric("Flotteurs", format_count("flotteurs"))
 
     with col3:
-        st.metric("Résultats Humains", "à venir")
+        st.metric("Résultats Humains", format_count("resultats_humain"))
 
     with col4:
-        st.metric("Historique", f"{total_audit_entries:,}")
+        st.metric("Historique", format_count("audit_log"))
 
     st.info("💡 Cliquez sur une table ci-dessus pour accéder aux opérations CRUD")
 
@@ -108,48 +100,5 @@ else:
     st.divider()
     st.subheader("🛡️ Quarantaine des données")
 
-    quarantine_files = validator.get_quarantine_files()
-    if quarantine_files:
-        st.warning(f"⚠️ {len(quarantine_files)} fichier(s) en quarantaine détecté(s)")
-
-        selected_file = st.selectbox(
-            "Sélectionner un fichier de quarantaine",
-            quarantine_files,
-            key="quarantine_select"
-        )
-
-        if selected_file:
-            if st.button("📋 Examiner la quarantaine", key="view_quarantine"):
-                quarantine_data = validator.load_quarantine_file(selected_file)
-
-                st.subheader(f"📄 Détails de {selected_file}")
-
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Lignes invalides", quarantine_data["total_invalid_rows"])
-                with col2:
-                    st.metric("Erreurs de validation", quarantine_data["validation_report"]["total_errors"])
-                with col3:
-                    st.metric("Source", quarantine_data["source"])
-
-                # Afficher les erreurs
-                if quarantine_data["validation_report"]["schema_errors"]:
-                    st.subheader("❌ Erreurs de schéma")
-                    for error in quarantine_data["validation_report"]["schema_errors"]:
-                        st.error(f"**{error['column']}**: {error['error_message']}")
-
-                if quarantine_data["validation_report"]["dataframe_errors"]:
-                    st.subheader("❌ Erreurs de dataframe")
-                    for error in quarantine_data["validation_report"]["dataframe_errors"]:
-                        st.error(f"**{error['check']}**: {error['error_message']}")
-
-                # Afficher les données invalides
-                if quarantine_data["invalid_data"]:
-                    st.subheader("📊 Données invalides")
-                    invalid_df = pd.DataFrame(quarantine_data["invalid_data"])
-                    st.dataframe(invalid_df, use_container_width=True)
-
-                    # Option de correction (placeholder)
-                    st.info("💡 Fonctionnalité de correction à venir")
-    else:
-        st.success("✅ Aucune donnée en quarantaine")
\ No newline at end of file
+    from quarantine import quarantine_viewer
+    quarantine_viewer()
@@ -0,0 +1,231 @@
+# src/database/aggregates.py
+"""
+Couche "Or" : tables d'agrégats maintenues incrémentalement.
+
+- agg_operations_mensuelles : opérations par CROSS, mois et type_operation
+- agg_resultats_humain      : personnes par resultat_humain et categorie_personne
+- agg_flotteurs_type        : flotteurs par type_flotteur
+
+Chaque écriture applique un delta (+1 / -1 par ligne source) dans la même transaction
+que l'écriture elle-même, via INSERT ... ON CONFLICT DO UPDATE sur un index unique des
+clés (les clés NULL y sont ramenées à une valeur sentinelle). `rebuild_aggregates()`
+recalcule tout depuis les tables sources.
+"""
+
+import argparse
+import json
+from typing import Iterable, List, Optional
+
+import pandas as pd
+from sqlalchemy import text
+
+from .cache import cached_query
+from .connection import get_engine
+
+# Définition des agrégats :
+# - source : table source et colonnes (typées) nécessaires au calcul
+# - keys   : colonne de l'agrégat -> expression sur la ligne source `s`
+# - values : colonne de l'agrégat -> expression sommée (s.w vaut +1 ou -1)
+AGGREGATES = {
+    "agg_operations_mensuelles": {
+        "source": "operations",
+        "source_columns": {
+            "cross_name": "TEXT",
+            "date_heure_reception_alerte": "TIMESTAMPTZ",
+            "type_operation": "TEXT",
+        },
+        "keys": {
+            "cross_name": ("TEXT", "s.cross_name"),
+            "mois": ("DATE", "date_trunc('month', s.date_heure_reception_alerte)::date"),
+            "type_operation": ("TEXT", "s.type_operation"),
+        },
+        "values": {
+            "nb_operations": "s.w",
+        },
+    },
+    "agg_resultats_humain": {
+        "source": "resultats_humain",
+        "source_columns": {
+            "resultat_humain": "TEXT",
+            "categorie_personne": "TEXT",
+            "nombre": "INTEGER",
+            "dont_nombre_blesse": "INTEGER",
+        },
+        "keys": {
+            "resultat_humain": ("TEXT", "s.resultat_humain"),
+            "categorie_personne": ("TEXT", "s.categorie_personne"),
+        },
+        "values": {
+            "nb_personnes": "s.w * COALESCE(s.nombre, 0)",
+            "nb_blesses": "s.w * COALESCE(s.dont_nombre_blesse, 0)",
+            "nb_lignes": "s.w",
+        },
+    },
+    "agg_flotteurs_type": {
+        "source": "flotteurs",
+        "source_columns": {
+            "type_flotteur": "TEXT",
+        },
+        "keys": {
+            "type_flotteur": ("TEXT", "s.type_flotteur"),
+        },
+        "values": {
+            "nb_flotteurs": "s.w",
+        },
+    },
+}
+
+# Valeur de remplacement des clés NULL dans l'index unique (NULL serait toujours distinct)
+NULL_SENTINELS = {"TEXT": "''", "DATE": "DATE '0001-01-01'"}
+
+# Colonnes d'operations dont la modification déplace une opération d'un groupe à l'autre
+OPERATIONS_KEY_COLUMNS = set(AGGREGATES["agg_operations_mensuelles"]["source_columns"])
+
+def _conflict_target(name: str) -> str:
+    """Expressions de l'index unique des clés (cible du ON CONFLICT)."""
+    keys = AGGREGATES[name]["keys"]
+    return ", ".join(f"(COALESCE({col}, {NULL_SENTINELS[sql_type]}))" for col, (sql_type, _) in keys.items())
+
+def install_aggregates(conn):
+    """Crée les tables d'agrégats si elles n'existent pas."""
+    for name, spec in AGGREGATES.items():
+        columns = [f"{col} {sql_type}" for col, (sql_type, _) in spec["keys"].items()]
+        columns += [f"{col} BIGINT NOT NULL DEFAULT 0" for col in spec["values"]]
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} ({', '.join(columns)})"))
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{name}_keys ON {name} ({_conflict_target(name)})"
+        ))
+
+def _merge_sql(name: str, source_sql: str) -> str:
+    """
+    Construit la requête qui agrège un delta (`source_sql`, lignes source avec une
+    colonne de poids `w`) puis l'ajoute à la table d'agrégats.
+    """
+    spec = AGGREGATES[name]
+    keys = list(spec["keys"])
+    values = list(spec["values"])
+    key_exprs = [f"{expr} AS {col}" for col, (_, expr) in spec["keys"].items()]
+    value_exprs = [f"SUM({expr}) AS {col}" for col, expr in spec["values"].items()]
+    group_by = ", ".join(str(i + 1) for i in range(len(keys)))
+
+    return f"""
+        INSERT INTO {name} ({', '.join(keys + values)})
+        SELECT {', '.join(key_exprs + value_exprs)}
+        FROM ({source_sql}) s
+        GROUP BY {group_by}
+        ON CONFLICT ({_conflict_target(name)})
+        DO UPDATE SET {', '.join(f"{v} = {name}.{v} + EXCLUDED.{v}" for v in values)}
+    """
+
+def _purge_empty(conn, name: str):
+    """Supprime les groupes revenus à zéro."""
+    values = AGGREGATES[name]["values"]
+    conn.execute(text(f"DELETE FROM {name} WHERE {' AND '.join(f'{v} = 0' for v in values)}"))
+
+def apply_rows(conn, name: str, rows: Iterable[Optional[dict]], sign: int):
+    """
+    Applique un delta à partir de lignes source fournies par l'appelant.
+
+    Args:
+        conn: connexion dans la transaction de l'écriture
+        name: nom de l'agrégat
+        rows: dicts contenant (au moins) les colonnes source de l'agrégat
+        sign: +1 pour des lignes ajoutées, -1 pour des lignes retirées
+    """
+    spec = AGGREGATES[name]
+    columns = spec["source_columns"]
+    payload = [
+        {**{col: row.get(col) for col in columns}, "w": sign}
+        for row in rows if row is not None
+    ]
+    if not payload:
+        return
+
+    record_type = ", ".join([f"{col} {sql_type}" for col, sql_type in columns.items()] + ["w INTEGER"])
+    source_sql = f"SELECT * FROM json_to_recordset(CAST(:rows AS JSON)) AS r({record_type})"
+    conn.execute(text(_merge_sql(name, source_sql)), {"rows": json.dumps(payload, default=str)})
+    _purge_empty(conn, name)
+
+def apply_operations(conn, operation_ids: Iterable[int], sign: int):
+    """
+    Applique un delta pour des opérations et leurs lignes filles, lues dans la base.
+
+    À appeler après l'insertion (sign=+1) ou avant la suppression (sign=-1).
+    """
+    ids = [int(i) for i in operation_ids]
+    if not ids:
+        return
+    for name, spec in AGGREGATES.items():
+        source_sql = (
+            f"SELECT t.*, CAST(:sign AS INTEGER) AS w FROM {spec['source']} t "
+            f"WHERE t.operation_id = ANY(:ids)"
+        )
+        conn.execute(text(_merge_sql(name, source_sql)), {"ids": ids, "sign": sign})
+        _purge_empty(conn, name)
+
+def apply_operation_update(conn, old_row: dict, updates: dict):
+    """
+    Déplace une opération modifiée d'un groupe à l'autre si une colonne de regroupement change.
+
+    Args:
+        old_row: valeurs avant modification (au moins les colonnes de regroupement)
+        updates: dict {colonne: nouvelle_valeur}
+    """
+    if not OPERATIONS_KEY_COLUMNS & set(updates):
+        return
+    new_row = {**old_row, **updates}
+    apply_rows(conn, "agg_operations_mensuelles", [old_row], -1)
+    apply_rows(conn, "agg_operations_mensuelles", [new_row], +1)
+
+def rebuild_aggregates(conn=None):
+    """Recalcule entièrement les agrégats depuis les tables sources."""
+    if conn is None:
+        with get_engine().begin() as conn:
+            return rebuild_aggregates(conn)
+
+    install_aggregates(conn)
+    for name, spec in AGGREGATES.items():
+        conn.execute(text(f"TRUNCATE {name}"))
+        source_sql = f"SELECT t.*, 1 AS w FROM {spec['source']} t"
+        conn.execute(text(_merge_sql(name, source_sql)))
+        print(f"[OK] {name} reconstruit")
+
+@cached_query(tags=lambda name, group_by=None: ("agg", name))
+def get_aggregate(name: str, group_by: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Lit un agrégat, éventuellement regroupé sur une partie de ses clés.
+
+    Args:
+        name: nom de l'agrégat (clé de AGGREGATES)
+        group_by: sous-ensemble des clés pour un regroupement plus grossier
+
+    Returns:
+        DataFrame des clés et des valeurs sommées
+    """
+    spec = AGGREGATES[name]
+    keys = list(group_by) if group_by else list(spec["keys"])
+    unknown = set(keys) - set(spec["keys"])
+    if unknown:
+        raise ValueError(f"Clés inconnues pour {name}: {unknown}")
+
+    sums = [f"SUM({v})::BIGINT AS {v}" for v in spec["values"]]
+    query = f"""
+        SELECT {', '.join(keys + sums)}
+        FROM {name}
+        GROUP BY {', '.join(keys)}
+        ORDER BY {', '.join(keys)}
+    """
+    with get_engine().connect() as conn:
+        return pd.read_sql(text(query), conn)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tables d'agrégats (couche Or)")
+    parser.add_argument("--rebuild", action="store_true", help="Recalculer tous les agrégats")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        rebuild_aggregates()
+    else:
+        for name in AGGREGATES:
+            print(name)
+            print(get_aggregate(name).to_string(index=False))
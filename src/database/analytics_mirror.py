@@ -0,0 +1,329 @@
+# src/database/analytics_mirror.py
+"""
+Miroir analytique local (optionnel) : instantanés Parquet des tables interrogés avec DuckDB.
+
+Les agrégations lourdes (`query.aggregate_operations`) sont exécutées sur ce miroir au
+lieu de PostgreSQL, qui reste dédié aux écritures CRUD de l'interface.
+
+- Instantané complet : export COPY -> Parquet de operations, flotteurs et resultats_humain
+  (un fichier de base par table)
+- Rafraîchissement incrémental : les opérations citées dans audit_log depuis le dernier
+  rafraîchissement sont relues dans PostgreSQL et écrites dans des fichiers delta ;
+  les fichiers existants ne sont pas réécrits. La vue DuckDB de chaque table retient,
+  pour chaque opération, les lignes du fichier le plus récent qui la cite
+- Compactage : au-delà de ANALYTICS_MIRROR_MAX_DELTAS deltas, DuckDB fusionne base et
+  deltas dans une nouvelle base
+- Rafraîchissement hors du chemin des requêtes : un thread d'arrière-plan (démarré à la
+  première requête) rafraîchit le miroir toutes les ANALYTICS_MIRROR_MAX_LAG secondes ;
+  les requêtes lisent l'instantané courant sans attendre. `python -m database.analytics_mirror`
+  rafraîchit à la demande (ex: tâche planifiée)
+
+Les fichiers remplacés (compactage, instantané complet) sont supprimés au rafraîchissement
+suivant, pour ne pas disparaître sous une requête en cours.
+
+Activation : ANALYTICS_MIRROR=1 (nécessite le paquet `duckdb`). En cas d'indisponibilité
+(ou avant le premier instantané), les requêtes retombent sur PostgreSQL.
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import text
+
+from .connection import get_engine
+from .export import export_table
+from .stats import get_table_stats
+
+MIRROR_TABLES = ("operations", "flotteurs", "resultats_humain")
+MIRROR_DIR = os.getenv("ANALYTICS_MIRROR_DIR", "data/analytics_mirror")
+MIRROR_ENABLED = os.getenv("ANALYTICS_MIRROR", "0").lower() in ("1", "true", "yes")
+MIRROR_MAX_LAG = float(os.getenv("ANALYTICS_MIRROR_MAX_LAG", "60"))
+MIRROR_MAX_DELTAS = int(os.getenv("ANALYTICS_MIRROR_MAX_DELTAS", "20"))
+# Marge de relecture du journal : une transaction peut valider ses lignes d'audit
+# (id déjà attribué) après un rafraîchissement ayant lu des id plus grands
+AUDIT_LOOKBACK = timedelta(minutes=5)
+MANIFEST = "manifest.json"
+MANIFEST_FORMAT = 2
+
+_refresh_lock = threading.Lock()
+_refresher_lock = threading.Lock()
+_refresher = {"thread": None}
+
+def _path(name: str) -> str:
+    return os.path.join(MIRROR_DIR, name)
+
+def _sql_path(name: str) -> str:
+    return _path(name).replace("'", "''")
+
+def _read_manifest() -> Optional[Dict[str, Any]]:
+    try:
+        with open(_path(MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    # Manifeste d'un ancien format (fichier unique par table) : instantané à refaire
+    return manifest if manifest.get("format") == MANIFEST_FORMAT else None
+
+def _write_manifest(manifest: Dict[str, Any]):
+    tmp_path = _path(MANIFEST + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, _path(MANIFEST))
+
+def _mirror_files(manifest: Dict[str, Any]) -> List[str]:
+    files = list(manifest["base"].values())
+    for delta in manifest["deltas"]:
+        files.append(delta["changes"])
+        files.extend(delta["files"].values())
+    return files
+
+def _retire(previous: Optional[Dict[str, Any]], manifest: Dict[str, Any], *intermediate: Dict[str, Any]):
+    """
+    Supprime les fichiers retirés au rafraîchissement précédent, et note ceux que
+    `manifest` ne référence plus (supprimés au prochain rafraîchissement).
+    """
+    for name in (previous or {}).get("obsolete", []):
+        try:
+            os.remove(_path(name))
+        except FileNotFoundError:
+            pass
+    kept = set(_mirror_files(manifest))
+    replaced = [name for m in (previous, *intermediate) if m for name in _mirror_files(m)]
+    manifest["obsolete"] = sorted(set(replaced) - kept)
+
+def _watermark(conn) -> Dict[str, Any]:
+    """Position courante du journal d'audit, relevée avant la lecture des tables."""
+    row = conn.execute(text(
+        "SELECT COALESCE(MAX(id), 0), LOCALTIMESTAMP, current_setting('TimeZone') FROM audit_log"
+    )).fetchone()
+    return {"last_audit_id": int(row[0]), "audit_timestamp": row[1].isoformat(), "timezone": row[2]}
+
+def _create_views(con, manifest: Dict[str, Any]):
+    """
+    Vues DuckDB des tables du miroir : lignes de la base, sauf pour les opérations
+    reprises par un delta, dont seules les lignes du delta le plus récent sont retenues.
+    """
+    # Même fuseau que PostgreSQL pour date_trunc sur les horodatages
+    con.execute(f"SET TimeZone = '{manifest['timezone']}'")
+    deltas = manifest["deltas"]
+    if deltas:
+        changes = ", ".join(f"'{_sql_path(d['changes'])}'" for d in deltas)
+        con.execute(f"""
+            CREATE TEMP VIEW mirror_latest AS
+            SELECT operation_id, MAX(seq) AS seq FROM read_parquet([{changes}]) GROUP BY operation_id
+        """)
+    for table in MIRROR_TABLES:
+        parts = [f"SELECT *, 0 AS _seq FROM read_parquet('{_sql_path(manifest['base'][table])}')"]
+        parts += [
+            f"SELECT *, {d['seq']} AS _seq FROM read_parquet('{_sql_path(d['files'][table])}')"
+            for d in deltas if table in d["files"]
+        ]
+        if not deltas:
+            con.execute(f"CREATE TEMP VIEW {table} AS SELECT * EXCLUDE (_seq) FROM ({parts[0]})")
+            continue
+        con.execute(f"""
+            CREATE TEMP VIEW {table} AS
+            SELECT t.* EXCLUDE (_seq)
+            FROM ({' UNION ALL BY NAME '.join(parts)}) t
+            LEFT JOIN mirror_latest l ON l.operation_id = t.operation_id
+            WHERE t._seq = COALESCE(l.seq, 0)
+        """)
+
+def _full_refresh(previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    os.makedirs(MIRROR_DIR, exist_ok=True)
+    with get_engine().connect() as conn:
+        manifest = _watermark(conn)
+
+    seq = previous["seq"] + 1 if previous else 1
+    manifest.update({"format": MANIFEST_FORMAT, "seq": seq, "base": {}, "deltas": [], "rows": {}})
+    for table in MIRROR_TABLES:
+        name = f"{table}-{seq}.parquet"
+        report = export_table(table, _path(name), "parquet")
+        manifest["base"][table] = name
+        manifest["rows"][table] = report["rows"]
+
+    manifest.update({"mode": "full", "refreshed_at": time.time(), "operations_refreshed": None})
+    _retire(previous, manifest)
+    _write_manifest(manifest)
+    return manifest
+
+def _compact(manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """Fusionne base et deltas dans une nouvelle base (sans relire PostgreSQL)."""
+    import duckdb
+
+    seq = manifest["seq"] + 1
+    compacted = {**manifest, "seq": seq, "base": {}, "deltas": []}
+    con = duckdb.connect()
+    try:
+        _create_views(con, manifest)
+        for table in MIRROR_TABLES:
+            name = f"{table}-{seq}.parquet"
+            con.execute(f"COPY {table} TO '{_sql_path(name)}' (FORMAT parquet, COMPRESSION zstd)")
+            compacted["base"][table] = name
+    finally:
+        con.close()
+    return compacted
+
+def _incremental_refresh(manifest: Dict[str, Any]) -> Dict[str, Any]:
+    import duckdb
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    since = datetime.fromisoformat(manifest["audit_timestamp"]) - AUDIT_LOOKBACK
+    with get_engine().connect() as conn:
+        new_manifest = _watermark(conn)
+        if new_manifest["last_audit_id"] < manifest["last_audit_id"]:
+            # Journal réinitialisé (init_db) : l'historique ne permet plus de rattraper
+            return _full_refresh(manifest)
+        ids = [int(i) for i in conn.execute(text("""
+            SELECT DISTINCT operation_id FROM audit_log
+            WHERE table_name = 'operations' AND operation_id IS NOT NULL
+              AND (id > :last_id OR timestamp >= :since)
+        """), {"last_id": manifest["last_audit_id"], "since": since}).scalars()]
+
+    new_manifest = {**manifest, **new_manifest, "rows": dict(manifest["rows"]), "deltas": list(manifest["deltas"])}
+    if ids:
+        seq = manifest["seq"] + 1
+        delta = {"seq": seq, "changes": f"changes-{seq}.parquet", "files": {}}
+        con = duckdb.connect()
+        try:
+            _create_views(con, manifest)
+            for table in MIRROR_TABLES:
+                buffer = io.BytesIO()
+                export_table(table, buffer, "parquet", {"operation_id": ids})
+                buffer.seek(0)
+                fresh = pq.read_table(buffer)
+                if fresh.schema.names != pq.read_schema(_path(manifest["base"][table])).names:
+                    # Schéma modifié (migration) : l'instantané doit être refait
+                    return _full_refresh(manifest)
+
+                # Lignes remplacées, comptées sur la seule colonne operation_id
+                replaced = con.execute(
+                    f"SELECT count(*) FROM {table} WHERE operation_id IN (SELECT UNNEST($ids))", {"ids": ids}
+                ).fetchone()[0]
+                if fresh.num_rows:
+                    name = f"{table}-{seq}.parquet"
+                    pq.write_table(fresh, _path(name), compression="zstd")
+                    delta["files"][table] = name
+                new_manifest["rows"][table] += fresh.num_rows - replaced
+        finally:
+            con.close()
+
+    # Écritures non journalisées (chargement en masse) : rattrapage complet
+    stats = get_table_stats.uncached(MIRROR_TABLES)
+    for table in MIRROR_TABLES:
+        if stats[table]["exact"] and stats[table]["rows"] != new_manifest["rows"][table]:
+            print(f"[WARN] Miroir analytique désynchronisé sur {table}, reconstruction complète")
+            # Les fichiers du delta portent les noms de la nouvelle base et seront écrasés
+            return _full_refresh(manifest)
+
+    if ids:
+        # Écrit en dernier : un delta sans ses fichiers n'est jamais référencé
+        pq.write_table(pa.table({"operation_id": pa.array(ids, type=pa.int64()),
+                                 "seq": pa.array([seq] * len(ids), type=pa.int64())}),
+                       _path(delta["changes"]))
+        new_manifest["seq"] = seq
+        new_manifest["deltas"].append(delta)
+
+    uncompacted = new_manifest
+    if len(new_manifest["deltas"]) > MIRROR_MAX_DELTAS:
+        new_manifest = _compact(new_manifest)
+    new_manifest.update({"mode": "incremental", "refreshed_at": time.time(), "operations_refreshed": len(ids)})
+    _retire(manifest, new_manifest, uncompacted)
+    _write_manifest(new_manifest)
+    return new_manifest
+
+def refresh_mirror(full: bool = False) -> Dict[str, Any]:
+    """
+    Rafraîchit le miroir analytique.
+
+    Args:
+        full: force un instantané complet (sinon incrémental depuis audit_log)
+
+    Returns:
+        Manifeste du miroir (position dans audit_log, fichiers et lignes par table, mode)
+    """
+    with _refresh_lock:
+        manifest = _read_manifest()
+        if full or manifest is None:
+            manifest = _full_refresh(manifest)
+        else:
+            manifest = _incremental_refresh(manifest)
+    print(f"[OK] Miroir analytique rafraîchi ({manifest['mode']}) : {manifest['rows']}")
+    return manifest
+
+def _refresh_loop():
+    while True:
+        manifest = _read_manifest()
+        wait = MIRROR_MAX_LAG - (time.time() - manifest["refreshed_at"]) if manifest else 0
+        if wait > 0:
+            time.sleep(wait)
+            continue
+        try:
+            refresh_mirror()
+        except Exception as e:
+            print(f"[WARN] Rafraîchissement du miroir analytique impossible : {e}")
+            time.sleep(MIRROR_MAX_LAG)
+
+def start_background_refresh():
+    """Démarre (une fois par processus) le thread de rafraîchissement périodique."""
+    with _refresher_lock:
+        if _refresher["thread"] is None:
+            _refresher["thread"] = threading.Thread(target=_refresh_loop, name="analytics-mirror", daemon=True)
+            _refresher["thread"].start()
+
+def mirror_available() -> bool:
+    """Le routage vers le miroir est-il activé et possible ?"""
+    if not MIRROR_ENABLED:
+        return False
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def query_mirror(query: str, params: Optional[Dict[str, Any]] = None) -> Optional[pd.DataFrame]:
+    """
+    Exécute une requête SQL (syntaxe de database.query, paramètres `:nom`) sur le miroir.
+
+    La requête lit l'instantané courant, sans rafraîchissement préalable (voir
+    start_background_refresh).
+
+    Returns:
+        DataFrame du résultat, ou None si le miroir est indisponible ou pas encore
+        construit (l'appelant exécute alors la requête sur PostgreSQL)
+    """
+    if not mirror_available():
+        return None
+    import duckdb
+
+    start_background_refresh()
+    manifest = _read_manifest()
+    if manifest is None:
+        return None
+    try:
+        con = duckdb.connect()
+        try:
+            _create_views(con, manifest)
+            duck_query = re.sub(r"(?<!:):(\w+)", r"$\1", query)
+            return con.execute(duck_query, params or {}).df()
+        finally:
+            con.close()
+    except Exception as e:
+        print(f"[WARN] Miroir analytique indisponible, repli sur PostgreSQL : {e}")
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Miroir analytique Parquet/DuckDB")
+    parser.add_argument("--full", action="store_true", help="Reconstruire l'instantané complet")
+    args = parser.parse_args()
+
+    print(json.dumps(refresh_mirror(full=args.full), indent=2))
@@ -0,0 +1,210 @@
+# src/database/async_api.py
+"""
+Accès asynchrone à la base (SQLAlchemy asyncio + asyncpg).
+
+Même interface et mêmes types de retour que read.py et update.py, sous forme de
+coroutines : un service ou un script peut ainsi lancer des centaines de lectures
+concurrentes (`asyncio.gather`) sur un pool de connexions dédié, sans un thread par
+requête.
+
+- Pool : ASYNC_POOL_SIZE connexions (+ ASYNC_MAX_OVERFLOW), un engine par boucle
+  d'événements (les connexions asyncpg ne sont pas partageables entre boucles)
+- Lectures : non mises en cache (le cache de cache.py est synchrone) ; les écritures
+  invalident en revanche ce cache comme leurs équivalents synchrones
+- Écritures : mêmes corps de transaction que update.py (exécutés via `run_sync`),
+  donc mêmes agrégats, même journal d'audit et même verrou optimiste
+
+asyncpg type strictement les paramètres : les valeurs doivent être des objets Python
+(datetime, int, bool...), pas des chaînes à convertir par PostgreSQL.
+"""
+
+import asyncio
+import os
+import weakref
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from .cache import invalidate_operation_write
+from .connection import APP_AUDIT_SETTING, DB_URL
+from .stats import get_row_count
+from .statements import check_columns
+from .update import (
+    VersionConflictError,
+    _delete_operation_tx,
+    _insert_operation_tx,
+    _prepare_batch,
+    _submit_deferred,
+    _update_operation_tx,
+    _update_operations_tx,
+    _write_context,
+)
+
+ASYNC_DB_URL = DB_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+ASYNC_POOL_SIZE = int(os.getenv("ASYNC_POOL_SIZE", "10"))
+ASYNC_MAX_OVERFLOW = int(os.getenv("ASYNC_MAX_OVERFLOW", "10"))
+
+_engines = weakref.WeakKeyDictionary()
+
+def get_async_engine():
+    """Retourne l'engine asynchrone de la boucle d'événements courante."""
+    loop = asyncio.get_running_loop()
+    engine = _engines.get(loop)
+    if engine is None:
+        engine = create_async_engine(ASYNC_DB_URL, pool_size=ASYNC_POOL_SIZE,
+                                     max_overflow=ASYNC_MAX_OVERFLOW, pool_pre_ping=True,
+                                     connect_args={"server_settings": {APP_AUDIT_SETTING: "on"}})
+        _engines[loop] = engine
+    return engine
+
+async def dispose_async_engine():
+    """Ferme les connexions du pool de la boucle courante (fin de script)."""
+    engine = _engines.pop(asyncio.get_running_loop(), None)
+    if engine is not None:
+        await engine.dispose()
+
+async def _read_frame(query, params: Optional[dict] = None) -> pd.DataFrame:
+    async with get_async_engine().connect() as conn:
+        result = await conn.execute(text(query) if isinstance(query, str) else query, params or {})
+        return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+# === Lectures (équivalents de read.py) ===
+
+async def get_operations(limit=100) -> pd.DataFrame:
+    if limit is None:
+        return await _read_frame("SELECT * FROM operations")
+    return await _read_frame("SELECT * FROM operations LIMIT :limit", {"limit": int(limit)})
+
+async def get_operation_by_id(operation_id: int) -> Optional[pd.DataFrame]:
+    """Récupère une opération par son ID (None si absente)."""
+    df = await _read_frame("SELECT * FROM operations WHERE operation_id = :operation_id",
+                           {"operation_id": int(operation_id)})
+    return df if not df.empty else None
+
+async def get_operation_id_range() -> Tuple:
+    """Récupère le min et max des operation_id dans la base."""
+    result = await _read_frame("SELECT MIN(operation_id) as min_id, MAX(operation_id) as max_id FROM operations")
+    return result.iloc[0]['min_id'], result.iloc[0]['max_id']
+
+async def get_operations_count() -> int:
+    """Nombre total d'opérations (compteur maintenu, lu hors de la boucle)."""
+    return await asyncio.to_thread(get_row_count, "operations")
+
+async def get_operations_by_id_range(min_id: int, max_id: int) -> pd.DataFrame:
+    """Récupère les opérations dans un intervalle d'IDs."""
+    return await _read_frame(
+        "SELECT * FROM operations WHERE operation_id BETWEEN :min_id AND :max_id ORDER BY operation_id",
+        {"min_id": int(min_id), "max_id": int(max_id)},
+    )
+
+async def get_audit_log(limit=100) -> pd.DataFrame:
+    """Récupère les entrées du journal d'audit."""
+    if limit is None:
+        return await _read_frame("SELECT * FROM audit_log ORDER BY timestamp DESC")
+    return await _read_frame("SELECT * FROM audit_log ORDER BY timestamp DESC LIMIT :limit",
+                             {"limit": int(limit)})
+
+async def fetch_operations(operation_ids: Iterable[int],
+                           concurrency: int = None) -> Dict[int, Optional[pd.DataFrame]]:
+    """
+    Lit des opérations une par une, en concurrence.
+
+    Args:
+        operation_ids: IDs à lire
+        concurrency: requêtes simultanées (défaut : taille maximale du pool)
+
+    Returns:
+        dict {operation_id: DataFrame ou None}, comme get_operation_by_id
+    """
+    operation_ids = list(operation_ids)
+    semaphore = asyncio.Semaphore(concurrency or ASYNC_POOL_SIZE + ASYNC_MAX_OVERFLOW)
+
+    async def fetch(operation_id):
+        async with semaphore:
+            return await get_operation_by_id(operation_id)
+
+    results = await asyncio.gather(*(fetch(op_id) for op_id in operation_ids))
+    return dict(zip(operation_ids, results))
+
+# === Écritures (équivalents de update.py) ===
+
+async def update_operation(operation_id: int, updates: dict, changed_by: str = "operator",
+                           expected_version: int = None) -> bool:
+    """
+    Met à jour une opération et logue chaque changement (voir update.update_operation).
+
+    Raises:
+        UnknownColumnError: colonne absente de la table operations
+        VersionConflictError: l'opération a changé depuis `expected_version`
+    """
+    if not updates:
+        return True
+
+    check_columns("operations", updates.keys(), writable=True)
+
+    try:
+        deferred = await asyncio.to_thread(_write_context)
+        async with get_async_engine().begin() as conn:
+            await conn.run_sync(_update_operation_tx, operation_id, updates, changed_by,
+                                expected_version, deferred)
+        invalidate_operation_write(operation_id, cardinality_changed=False)
+    except VersionConflictError as e:
+        print(f"Conflit de version : {e}")
+        raise
+    except Exception as e:
+        print(f"Erreur lors de la mise à jour : {e}")
+        return False
+    _submit_deferred(deferred)
+    return True
+
+async def update_operations(updates: Dict[int, dict], changed_by: str = "operator") -> Dict[int, str]:
+    """Met à jour un lot d'opérations (voir update.update_operations)."""
+    outcomes, pending = _prepare_batch(updates)
+    if not pending:
+        return outcomes
+
+    try:
+        deferred = await asyncio.to_thread(_write_context)
+        async with get_async_engine().begin() as conn:
+            await conn.run_sync(_update_operations_tx, pending, changed_by, outcomes, deferred)
+    except Exception as e:
+        print(f"Erreur lors de la mise à jour par lot : {e}")
+        return {**outcomes, **{op_id: "failed" for op_id in pending}}
+
+    invalidate_operation_write([op_id for op_id, outcome in outcomes.items() if outcome == "updated"],
+                               cardinality_changed=False)
+    _submit_deferred(deferred)
+    return outcomes
+
+async def delete_operation(operation_id: int, changed_by: str = "operator") -> bool:
+    """Supprime une opération et logue l'action."""
+    try:
+        deferred = await asyncio.to_thread(_write_context)
+        async with get_async_engine().begin() as conn:
+            await conn.run_sync(_delete_operation_tx, operation_id, changed_by, deferred)
+        invalidate_operation_write(operation_id, cardinality_changed=True)
+    except Exception as e:
+        print(f"Erreur lors de la suppression : {e}")
+        return False
+    _submit_deferred(deferred)
+    return True
+
+async def insert_operation(operation_data: dict, changed_by: str = "operator") -> bool:
+    """Insère une nouvelle opération et logue l'action."""
+    if 'operation_id' not in operation_data:
+        raise ValueError("operation_id est requis pour l'insertion")
+
+    check_columns("operations", operation_data.keys())
+
+    try:
+        deferred = await asyncio.to_thread(_write_context)
+        async with get_async_engine().begin() as conn:
+            await conn.run_sync(_insert_operation_tx, operation_data, changed_by, deferred)
+        invalidate_operation_write(operation_data['operation_id'], cardinality_changed=True)
+    except Exception as e:
+        print(f"Erreur lors de l'insertion : {e}")
+        return False
+    _submit_deferred(deferred)
+    return True
@@ -0,0 +1,259 @@
+# src/database/audit_partitions.py
+"""
+Partitionnement mensuel et archivage du journal d'audit.
+
+`audit_log` est partitionnée par mois sur `timestamp` (partitions `audit_log_AAAA_MM`)
+avec une partition par défaut qui recueille les lignes hors plage. Les partitions sont
+créées à l'avance par la fonction PL/pgSQL `audit_log_ensure_partition()` ; les
+partitions plus anciennes que la fenêtre de rétention sont exportées en Parquet
+compressé puis détachées de la table.
+"""
+
+import argparse
+import os
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import text
+
+from .connection import get_engine
+from .stats import adjust_row_count
+
+PARTITION_PATTERN = re.compile(r"^audit_log_(\d{4})_(\d{2})$")
+DEFAULT_MONTHS_AHEAD = 2
+DEFAULT_RETENTION_MONTHS = 12
+DEFAULT_ARCHIVE_DIR = "data/archive/audit_log"
+EXPORT_CHUNK_SIZE = 50_000
+
+# Crée la partition d'un mois si elle n'existe pas. Les lignes de ce mois tombées entre-temps
+# dans la partition par défaut y sont déplacées (sinon PostgreSQL refuse la création).
+PARTITION_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION audit_log_ensure_partition(p_month DATE) RETURNS TEXT AS $$
+DECLARE
+    v_start DATE := date_trunc('month', p_month)::date;
+    v_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::date;
+    v_name TEXT := 'audit_log_' || to_char(v_start, 'YYYY_MM');
+    v_moved BIGINT;
+BEGIN
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN v_name;
+    END IF;
+
+    -- Sérialise les créations concurrentes
+    PERFORM pg_advisory_xact_lock(hashtext('audit_log_partitions'));
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN v_name;
+    END IF;
+
+    CREATE TEMP TABLE IF NOT EXISTS audit_log_moved (LIKE audit_log) ON COMMIT DROP;
+    TRUNCATE audit_log_moved;
+    -- Suppression via la table parente pour que les triggers d'instruction la voient
+    WITH moved AS (
+        DELETE FROM audit_log
+        WHERE tableoid = 'audit_log_default'::regclass
+          AND timestamp >= v_start AND timestamp < v_end
+        RETURNING *
+    )
+    INSERT INTO audit_log_moved SELECT * FROM moved;
+    GET DIAGNOSTICS v_moved = ROW_COUNT;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF audit_log FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_start, v_end
+    );
+
+    IF v_moved > 0 THEN
+        INSERT INTO audit_log SELECT * FROM audit_log_moved;
+    END IF;
+
+    RETURN v_name;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+_ensured_month = None
+
+def _add_months(month: date, n: int) -> date:
+    """Premier jour du mois décalé de n mois."""
+    index = month.year * 12 + (month.month - 1) + n
+    return date(index // 12, index % 12 + 1, 1)
+
+def install_partition_function(conn):
+    """Installe (ou remplace) la fonction de création de partitions."""
+    conn.execute(text(PARTITION_FUNCTION_SQL))
+
+def ensure_partitions(conn=None, months_ahead: int = DEFAULT_MONTHS_AHEAD) -> List[str]:
+    """
+    Crée les partitions du mois courant et des `months_ahead` mois suivants.
+
+    Args:
+        conn: connexion dans une transaction ouverte (sinon une transaction est créée)
+        months_ahead: nombre de mois créés à l'avance
+
+    Returns:
+        list: noms des partitions garanties
+    """
+    if conn is None:
+        with get_engine().begin() as conn:
+            return ensure_partitions(conn, months_ahead)
+
+    current = date.today().replace(day=1)
+    return [
+        conn.execute(
+            text("SELECT audit_log_ensure_partition(:month)"),
+            {"month": _add_months(current, offset)}
+        ).scalar()
+        for offset in range(months_ahead + 1)
+    ]
+
+def ensure_current_partitions():
+    """
+    Garantit les partitions du mois courant, au plus une fois par mois et par processus.
+    Appelé par les chemins d'écriture avant de journaliser.
+    """
+    global _ensured_month
+    current = date.today().replace(day=1)
+    if _ensured_month != current:
+        ensure_partitions()
+        _ensured_month = current
+
+def list_partitions(conn) -> List[Dict[str, Any]]:
+    """Liste les partitions mensuelles attachées à audit_log, de la plus ancienne à la plus récente."""
+    rows = conn.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'audit_log'::regclass
+    """)).fetchall()
+
+    partitions = []
+    for (name,) in rows:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            partitions.append({"name": name, "month": date(int(match.group(1)), int(match.group(2)), 1)})
+    return sorted(partitions, key=lambda p: p["month"])
+
+def _export_partition(conn, name: str, path: str) -> int:
+    """Exporte une partition en Parquet (zstd) par blocs. Retourne le nombre de lignes écrites."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("table_name", pa.string()),
+        ("operation", pa.string()),
+        ("changed_by", pa.string()),
+        ("operation_id", pa.int64()),
+        ("column_name", pa.string()),
+        ("old_value", pa.string()),
+        ("new_value", pa.string()),
+        ("timestamp", pa.timestamp("us")),
+    ])
+
+    tmp_path = f"{path}.tmp"
+    written = 0
+    with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+        query = text(f"SELECT {', '.join(schema.names)} FROM {name} ORDER BY id")
+        for chunk in pd.read_sql(query, conn, chunksize=EXPORT_CHUNK_SIZE):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            written += len(chunk)
+    os.replace(tmp_path, path)
+    return written
+
+def _archive_names(conn, archive_dir: str, name: str):
+    """
+    Fichier Parquet et table d'archive d'une partition, jamais déjà utilisés : une
+    partition recréée pour des lignes tardives du même mois est archivée à part
+    (`<partition>_2.parquet`, `<partition>_archive_2`, ...) sans écraser l'archive précédente.
+    """
+    sequence = 1
+    while True:
+        suffix = "" if sequence == 1 else f"_{sequence}"
+        path = os.path.join(archive_dir, f"{name}{suffix}.parquet")
+        table = f"{name}_archive{suffix}"
+        taken = os.path.exists(path) or conn.execute(
+            text("SELECT to_regclass(:table) IS NOT NULL"), {"table": table}
+        ).scalar()
+        if not taken:
+            return path, table
+        sequence += 1
+
+def archive_old_partitions(retention_months: int = DEFAULT_RETENTION_MONTHS,
+                           archive_dir: str = DEFAULT_ARCHIVE_DIR,
+                           drop: bool = False,
+                           today: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Exporte en Parquet puis détache les partitions plus anciennes que la rétention.
+
+    Args:
+        retention_months: nombre de mois conservés dans audit_log (mois courant inclus)
+        archive_dir: répertoire des fichiers Parquet
+        drop: supprimer la table détachée au lieu de la renommer en `<partition>_archive`
+              (suffixée `_2`, `_3`... si le mois a déjà été archivé, comme le fichier)
+        today: date de référence (aujourd'hui par défaut)
+
+    Returns:
+        list: un rapport par partition archivée {partition, file, rows}
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    cutoff = _add_months((today or date.today()).replace(day=1), -(retention_months - 1))
+    engine = get_engine()
+    reports = []
+
+    with engine.connect() as conn:
+        with conn.begin():
+            # Les lignes anciennes restées dans la partition par défaut reçoivent leur
+            # partition mensuelle pour être archivées avec les autres
+            stray_months = conn.execute(text("""
+                SELECT DISTINCT date_trunc('month', timestamp)::date
+                FROM audit_log_default
+                WHERE timestamp < :cutoff
+            """), {"cutoff": cutoff}).scalars().all()
+            for month in stray_months:
+                conn.execute(text("SELECT audit_log_ensure_partition(:month)"), {"month": month})
+
+        partitions = [p for p in list_partitions(conn) if p["month"] < cutoff]
+
+    for partition in partitions:
+        name = partition["name"]
+
+        with engine.connect() as conn:
+            with conn.begin():
+                path, archive_table = _archive_names(conn, archive_dir, name)
+                # Verrou : plus aucune écriture dans la partition pendant l'export
+                conn.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+                rows = _export_partition(conn, name, path)
+
+        with engine.connect() as conn:
+            with conn.begin():
+                conn.execute(text(f"ALTER TABLE audit_log DETACH PARTITION {name}"))
+                adjust_row_count(conn, "audit_log", -rows)
+                if drop:
+                    conn.execute(text(f"DROP TABLE {name}"))
+                else:
+                    conn.execute(text(f"ALTER TABLE {name} RENAME TO {archive_table}"))
+
+        print(f"[OK] {name} : {rows} lignes archivées dans {path}")
+        reports.append({"partition": name, "file": path, "rows": rows})
+
+    return reports
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintenance des partitions de audit_log")
+    parser.add_argument("--months-ahead", type=int, default=DEFAULT_MONTHS_AHEAD,
+                        help="Nombre de mois de partitions créés à l'avance")
+    parser.add_argument("--retention-months", type=int, default=DEFAULT_RETENTION_MONTHS,
+                        help="Nombre de mois conservés dans audit_log")
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR,
+                        help="Répertoire des archives Parquet")
+    parser.add_argument("--drop", action="store_true",
+                        help="Supprimer les partitions détachées après export")
+    parser.add_argument("--ensure-only", action="store_true",
+                        help="Créer les partitions à venir sans archiver")
+    args = parser.parse_args()
+
+    print(f"Partitions garanties : {ensure_partitions(months_ahead=args.months_ahead)}")
+    if not args.ensure_only:
+        archive_old_partitions(args.retention_months, args.archive_dir, args.drop)
@@ -0,0 +1,194 @@
+# src/database/audit_triggers.py
+"""
+Journalisation côté base : triggers PL/pgSQL alimentant audit_log.
+
+Des triggers de niveau instruction (tables de transition, comme les compteurs de
+stats.py) écrivent une ligne par opération insérée ou supprimée et une ligne par
+colonne réellement modifiée lors d'un UPDATE (comparaison OLD/NEW). Tous les chemins
+d'écriture sont ainsi journalisés, y compris les chargements en masse, sans requête
+supplémentaire depuis Python.
+
+L'auteur de la modification est lu dans le paramètre de session `secmar.changed_by`
+(positionné par `set_changed_by` dans la transaction), à défaut l'utilisateur PostgreSQL.
+Les valeurs sont stockées sous leur forme texte JSON (ex. `true`, `2024-01-01T10:00:00+00:00`).
+
+Les connexions de l'application sont ouvertes avec `secmar.app_audit = on` : les triggers
+ignorent leurs écritures, que database.update journalise lui-même. Quand les triggers
+sont installés (mode mémorisé par processus, `AUDIT_MODE_TTL` secondes), database.update
+appelle `audit_log_begin` : en un seul aller-retour, la fonction verrouille operations,
+transmet l'auteur, réactive les triggers pour la transaction et confirme leur présence.
+Installer ou supprimer les triggers depuis un autre processus ne double ni ne perd
+donc aucune ligne, sans requête sur le catalogue à chaque écriture.
+"""
+
+import argparse
+import os
+import time
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+
+from .connection import APP_AUDIT_SETTING, get_engine
+
+AUDITED_TABLES = ("operations",)
+# Colonnes techniques dont la modification n'est pas journalisée
+AUDIT_SKIP_COLUMNS = ("version",)
+CHANGED_BY_SETTING = "secmar.changed_by"
+AUDIT_MODE_TTL = float(os.getenv("AUDIT_MODE_TTL", "60"))
+
+AUDIT_TRIGGER_SQL = f"""
+CREATE OR REPLACE FUNCTION audit_log_capture() RETURNS trigger AS $$
+DECLARE
+    actor TEXT := COALESCE(NULLIF(current_setting('{CHANGED_BY_SETTING}', true), ''), session_user);
+BEGIN
+    -- Écriture déjà journalisée par l'application
+    IF current_setting('{APP_AUDIT_SETTING}', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO audit_log (table_name, operation, changed_by, operation_id)
+        SELECT TG_TABLE_NAME, 'INSERT', actor, n.operation_id FROM new_rows n;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO audit_log (table_name, operation, changed_by, operation_id)
+        SELECT TG_TABLE_NAME, 'DELETE', actor, o.operation_id FROM old_rows o;
+    ELSE
+        -- Une ligne par colonne modifiée ; les colonnes passées en argument sont ignorées
+        INSERT INTO audit_log (table_name, operation, changed_by, operation_id, column_name, old_value, new_value)
+        SELECT TG_TABLE_NAME, 'UPDATE', actor, n.operation_id, d.column_name, d.old_value, d.new_value
+        FROM new_rows n
+        JOIN old_rows o ON o.operation_id = n.operation_id
+        CROSS JOIN LATERAL (
+            SELECT nv.key AS column_name, ov.value AS old_value, nv.value AS new_value
+            FROM jsonb_each_text(to_jsonb(n)) nv
+            JOIN jsonb_each_text(to_jsonb(o)) ov ON ov.key = nv.key
+            WHERE nv.value IS DISTINCT FROM ov.value
+              AND nv.key <> ALL (COALESCE(TG_ARGV, '{{}}'))
+        ) d;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Début d'une écriture journalisée par trigger (un aller-retour). Le verrou est celui
+-- que prend de toute façon l'écriture : il bloque CREATE/DROP TRIGGER jusqu'à la fin
+-- de la transaction, la réponse vaut donc pour toute la transaction.
+CREATE OR REPLACE FUNCTION audit_log_begin(actor TEXT) RETURNS boolean AS $$
+BEGIN
+    LOCK TABLE operations IN ROW EXCLUSIVE MODE;
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgrelid = 'operations'::regclass AND tgname = 'operations_audit_update'
+    ) THEN
+        RETURN false;
+    END IF;
+    PERFORM set_config('{CHANGED_BY_SETTING}', COALESCE(actor, ''), true);
+    PERFORM set_config('{APP_AUDIT_SETTING}', 'off', true);
+    RETURN true;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+_installed = {"value": None, "checked_at": 0.0}
+
+def install_audit_triggers(conn=None, tables: Iterable[str] = AUDITED_TABLES,
+                           skip_columns: Iterable[str] = AUDIT_SKIP_COLUMNS):
+    """
+    Installe (ou remplace) les triggers d'audit.
+
+    Args:
+        tables: tables journalisées (identifiées par operation_id)
+        skip_columns: colonnes dont la modification n'est pas journalisée
+    """
+    if conn is None:
+        with get_engine().begin() as conn:
+            return install_audit_triggers(conn, tables, skip_columns)
+
+    conn.execute(text(AUDIT_TRIGGER_SQL))
+    skip_args = ", ".join(f"'{c}'" for c in skip_columns)
+    for table in tables:
+        conn.execute(text(f"""
+            DROP TRIGGER IF EXISTS {table}_audit_insert ON {table};
+            DROP TRIGGER IF EXISTS {table}_audit_update ON {table};
+            DROP TRIGGER IF EXISTS {table}_audit_delete ON {table};
+            CREATE TRIGGER {table}_audit_insert AFTER INSERT ON {table}
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION audit_log_capture();
+            CREATE TRIGGER {table}_audit_update AFTER UPDATE ON {table}
+                REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION audit_log_capture({skip_args});
+            CREATE TRIGGER {table}_audit_delete AFTER DELETE ON {table}
+                REFERENCING OLD TABLE AS old_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION audit_log_capture();
+        """))
+        print(f"[OK] Triggers d'audit installés sur {table}")
+    forget_audit_mode()
+
+def drop_audit_triggers(conn=None, tables: Iterable[str] = AUDITED_TABLES):
+    """Supprime les triggers d'audit (la journalisation repasse par Python)."""
+    if conn is None:
+        with get_engine().begin() as conn:
+            return drop_audit_triggers(conn, tables)
+
+    for table in tables:
+        conn.execute(text(f"""
+            DROP TRIGGER IF EXISTS {table}_audit_insert ON {table};
+            DROP TRIGGER IF EXISTS {table}_audit_update ON {table};
+            DROP TRIGGER IF EXISTS {table}_audit_delete ON {table};
+        """))
+        print(f"[OK] Triggers d'audit supprimés de {table}")
+    forget_audit_mode()
+
+def audit_triggers_installed() -> bool:
+    """
+    Les triggers d'audit sont-ils installés ? Mémorisé par processus pendant
+    AUDIT_MODE_TTL secondes : les écritures ne consultent pas le catalogue.
+
+    Une valeur périmée reste sans risque : sans triggers mémorisés, l'application
+    journalise elle-même (les triggers l'ignorent) ; avec, `begin_trigger_audit`
+    vérifie leur présence dans la transaction.
+    """
+    now = time.monotonic()
+    if _installed["value"] is None or now - _installed["checked_at"] > AUDIT_MODE_TTL:
+        with get_engine().connect() as conn:
+            _installed["value"] = bool(conn.execute(text("""
+                SELECT EXISTS (
+                    SELECT 1 FROM pg_trigger
+                    WHERE tgrelid = to_regclass('operations') AND tgname = 'operations_audit_update'
+                ) AND to_regprocedure('audit_log_begin(text)') IS NOT NULL
+            """)).scalar())
+        _installed["checked_at"] = now
+    return _installed["value"]
+
+def forget_audit_mode():
+    """Oublie le mode mémorisé (triggers installés ou supprimés)."""
+    _installed["value"] = None
+
+def begin_trigger_audit(conn, changed_by: Optional[str]) -> bool:
+    """
+    Confie la journalisation de la transaction en cours aux triggers (voir
+    audit_log_begin). Retourne False si les triggers ont été supprimés entre-temps :
+    l'appelant journalise alors lui-même.
+    """
+    if conn.execute(text("SELECT audit_log_begin(:changed_by)"), {"changed_by": changed_by}).scalar():
+        return True
+    forget_audit_mode()
+    return False
+
+def set_changed_by(conn, changed_by: Optional[str]):
+    """
+    Transmet l'auteur des modifications aux triggers, pour la transaction en cours,
+    et les réactive (chargements en masse hors database.update).
+    """
+    conn.execute(text("SELECT set_config(:setting, :changed_by, true), set_config(:app_setting, 'off', true)"),
+                 {"setting": CHANGED_BY_SETTING, "changed_by": changed_by or "",
+                  "app_setting": APP_AUDIT_SETTING})
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Triggers d'audit PL/pgSQL")
+    parser.add_argument("--drop", action="store_true", help="Supprimer les triggers au lieu de les installer")
+    args = parser.parse_args()
+
+    if args.drop:
+        drop_audit_triggers()
+    else:
+        install_audit_triggers()
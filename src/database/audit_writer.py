@@ -0,0 +1,365 @@
+# src/database/audit_writer.py
+"""
+Écriture asynchrone et bufferisée du journal d'audit (optionnelle, AUDIT_ASYNC=1).
+
+Les chemins d'écriture déposent leurs lignes d'audit après validation de leur
+transaction et rendent la main immédiatement ; un thread les insère ensuite dans
+audit_log par lots, via COPY.
+
+- Durabilité : chaque ligne est d'abord ajoutée à un fichier segment (JSON lines) du
+  répertoire AUDIT_SPILL_DIR. Un segment n'est supprimé qu'une fois inséré en base ; les
+  segments restants (base indisponible, arrêt brutal) sont rejoués au lot suivant ou au
+  démarrage suivant.
+- Répertoire partagé entre processus (serveur Streamlit, scripts) : chacun ne rejoue que
+  ses segments et ceux des processus arrêtés, après les avoir réservés par un renommage
+  atomique (`<segment>.claimed_<pid>`) : un segment n'est inséré qu'une fois.
+- Déclenchement : AUDIT_BATCH_SIZE lignes en attente, ou toutes les AUDIT_FLUSH_INTERVAL
+  secondes, ou à l'arrêt du processus (atexit).
+- Contre-pression : au-delà de AUDIT_MAX_PENDING lignes en attente, `submit` patiente
+  (au plus AUDIT_SUBMIT_TIMEOUT secondes) que le thread rattrape son retard.
+- Métriques : `get_audit_writer().metrics()` (profondeur de file, latence des lots).
+
+L'horodatage de chaque ligne est celui de l'événement, pas celui de l'insertion.
+L'audit n'est plus atomique avec l'écriture : une ligne validée peut être journalisée
+quelques instants plus tard.
+"""
+
+import atexit
+import glob
+import io
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+
+from .audit_partitions import ensure_current_partitions
+from .cache import count_tag, query_cache
+from .connection import get_engine
+
+AUDIT_ASYNC = os.getenv("AUDIT_ASYNC", "0").lower() in ("1", "true", "yes")
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+AUDIT_MAX_PENDING = int(os.getenv("AUDIT_MAX_PENDING", "10000"))
+AUDIT_SUBMIT_TIMEOUT = float(os.getenv("AUDIT_SUBMIT_TIMEOUT", "5"))
+AUDIT_SPILL_DIR = os.getenv("AUDIT_SPILL_DIR", "data/audit_spill")
+# fsync de chaque ajout : survit aussi à une coupure de la machine, au prix d'une écriture disque
+AUDIT_FSYNC = os.getenv("AUDIT_FSYNC", "0").lower() in ("1", "true", "yes")
+
+AUDIT_COLUMNS = ("table_name", "operation", "changed_by", "operation_id",
+                 "column_name", "old_value", "new_value", "timestamp")
+
+def _copy_field(value) -> str:
+    """Champ au format texte de COPY (\\N pour NULL, caractères spéciaux échappés)."""
+    if value is None:
+        return "\\N"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class AuditWriter:
+    """Tampon d'audit adossé à des segments sur disque, vidé par un thread via COPY."""
+
+    def __init__(self, spill_dir: str = AUDIT_SPILL_DIR, batch_size: int = AUDIT_BATCH_SIZE,
+                 flush_interval: float = AUDIT_FLUSH_INTERVAL, max_pending: int = AUDIT_MAX_PENDING,
+                 submit_timeout: float = AUDIT_SUBMIT_TIMEOUT, fsync: bool = AUDIT_FSYNC):
+        self.spill_dir = spill_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.submit_timeout = submit_timeout
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._segment = None
+        self._segment_path = None
+        self._segment_rows = 0
+        self._metrics = {
+            "submitted": 0, "flushed": 0, "flushes": 0, "flush_errors": 0,
+            "backpressure_waits": 0, "backpressure_timeouts": 0,
+            "last_flush_seconds": None, "max_flush_seconds": 0.0, "total_flush_seconds": 0.0,
+            "last_error": None,
+        }
+
+        os.makedirs(spill_dir, exist_ok=True)
+        self._seal_orphan_segments()
+        # Segments orphelins comptés dans la file (segment -> lignes) : leur rejeu la décrémente
+        self._adopted = {self._unclaimed_path(p): self._count_rows(p) for p in self._replayable_segments()}
+        self._pending = sum(self._adopted.values())
+        self._open_segment()
+
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    # === Segments ===
+
+    def _open_segment(self):
+        self._segment_path = os.path.join(self.spill_dir, f"{time.time_ns()}_{os.getpid()}.open")
+        self._segment = open(self._segment_path, "a", encoding="utf-8")
+        self._segment_rows = 0
+
+    def _seal_segment(self) -> Optional[str]:
+        """Ferme le segment courant et le rend rejouable ; à appeler sous verrou."""
+        self._segment.close()
+        if self._segment_rows == 0:
+            os.remove(self._segment_path)
+            sealed = None
+        else:
+            sealed = self._segment_path[:-len(".open")] + ".jsonl"
+            os.replace(self._segment_path, sealed)
+        self._open_segment()
+        return sealed
+
+    def _seal_orphan_segments(self):
+        """Scelle les segments ouverts par des processus arrêtés brutalement."""
+        for path in glob.glob(os.path.join(self.spill_dir, "*.open")):
+            pid = int(os.path.basename(path).split("_")[1].split(".")[0])
+            if pid == os.getpid() or not _pid_alive(pid):
+                os.replace(path, path[:-len(".open")] + ".jsonl")
+
+    def _sealed_segments(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.spill_dir, "*.jsonl")))
+
+    @staticmethod
+    def _segment_pid(path: str) -> int:
+        """Processus responsable d'un segment : celui qui l'a réservé, sinon celui qui l'a écrit."""
+        name = os.path.basename(path)
+        if ".claimed_" in name:
+            return int(name.rsplit("_", 1)[1])
+        return int(name.split("_")[1].split(".")[0])
+
+    @staticmethod
+    def _unclaimed_path(path: str) -> str:
+        return path.split(".claimed_")[0]
+
+    def _replayable_segments(self) -> List[str]:
+        """
+        Segments que ce processus peut rejouer : les siens, et ceux (scellés ou réservés)
+        de processus arrêtés. Les segments d'un autre processus actif lui sont laissés.
+        """
+        paths = self._sealed_segments() + glob.glob(os.path.join(self.spill_dir, "*.jsonl.claimed_*"))
+        replayable = []
+        for path in paths:
+            pid = self._segment_pid(path)
+            if pid == os.getpid() or not _pid_alive(pid):
+                replayable.append(path)
+        return sorted(replayable, key=self._unclaimed_path)
+
+    def _claim(self, path: str) -> Optional[str]:
+        """Réserve un segment par renommage atomique ; None s'il a déjà été pris par un autre processus."""
+        claimed = f"{self._unclaimed_path(path)}.claimed_{os.getpid()}"
+        try:
+            os.replace(path, claimed)
+        except FileNotFoundError:
+            return None
+        return claimed
+
+    @staticmethod
+    def _count_rows(path: str) -> int:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return sum(1 for line in f if line.strip())
+        except FileNotFoundError:
+            # Rejoué entre-temps par un autre processus
+            return 0
+
+    def _forget_vanished_segments(self):
+        """Retire de la file les segments orphelins rejoués par un autre processus ; sous verrou."""
+        for segment, rows in list(self._adopted.items()):
+            if not os.path.exists(segment) and not glob.glob(f"{glob.escape(segment)}.claimed_*"):
+                del self._adopted[segment]
+                self._pending -= rows
+                self._drained.notify_all()
+
+    # === Production ===
+
+    def submit(self, rows: Iterable[Dict[str, Any]]):
+        """
+        Met en file des lignes d'audit (clés : colonnes d'audit_log, sans id ni timestamp).
+
+        Bloque au plus `submit_timeout` secondes si la file est pleine ; au-delà, les
+        lignes sont acceptées quand même (elles sont déjà sur disque).
+        """
+        stamp = datetime.now(timezone.utc).isoformat()
+        lines = [
+            json.dumps({**{c: row.get(c) for c in AUDIT_COLUMNS}, "timestamp": stamp}, default=str)
+            for row in rows
+        ]
+        if not lines:
+            return
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("AuditWriter fermé")
+            if self._pending >= self.max_pending:
+                self._metrics["backpressure_waits"] += 1
+                self._wakeup.set()
+                if not self._drained.wait_for(lambda: self._pending < self.max_pending,
+                                              timeout=self.submit_timeout):
+                    self._metrics["backpressure_timeouts"] += 1
+
+            self._segment.write("\n".join(lines) + "\n")
+            self._segment.flush()
+            if self.fsync:
+                os.fsync(self._segment.fileno())
+            self._segment_rows += len(lines)
+            self._pending += len(lines)
+            self._metrics["submitted"] += len(lines)
+            if self._segment_rows >= self.batch_size:
+                self._wakeup.set()
+
+    # === Consommation ===
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            # Un lot en échec ne doit pas arrêter le thread : les lignes restent sur disque
+            try:
+                self.flush()
+            except Exception as e:
+                with self._lock:
+                    self._metrics["flush_errors"] += 1
+                    self._metrics["last_error"] = str(e)
+                print(f"[WARN] Échec du vidage du journal d'audit : {e}")
+
+    def _insert(self, rows: List[Dict[str, Any]]):
+        """Insère un lot via COPY dans une table temporaire puis INSERT ... SELECT."""
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_field(row.get(c)) for c in AUDIT_COLUMNS) + "\n")
+        buffer.seek(0)
+
+        ensure_current_partitions()
+        with get_engine().begin() as conn:
+            conn.execute(text("""
+                CREATE TEMP TABLE audit_log_staging (
+                    table_name TEXT, operation TEXT, changed_by TEXT, operation_id BIGINT,
+                    column_name TEXT, old_value TEXT, new_value TEXT, timestamp TIMESTAMPTZ
+                ) ON COMMIT DROP
+            """))
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                cursor.copy_expert(f"COPY audit_log_staging ({', '.join(AUDIT_COLUMNS)}) FROM STDIN", buffer)
+            finally:
+                cursor.close()
+            # Conversion vers le fuseau de la session, comme le DEFAULT CURRENT_TIMESTAMP
+            conn.execute(text(f"""
+                INSERT INTO audit_log ({', '.join(AUDIT_COLUMNS)})
+                SELECT {', '.join(AUDIT_COLUMNS[:-1])}, timestamp::timestamp FROM audit_log_staging
+            """))
+
+    def flush(self) -> int:
+        """
+        Insère toutes les lignes en attente (segment courant et segments non rejoués
+        de ce processus ou de processus arrêtés).
+
+        Returns:
+            Nombre de lignes insérées
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._seal_segment()
+            flushed = 0
+            for path in self._replayable_segments():
+                claimed = self._claim(path)
+                if claimed is None:
+                    continue
+                segment = self._unclaimed_path(path)
+                rows = []
+                start = time.perf_counter()
+                try:
+                    with open(claimed, encoding="utf-8") as f:
+                        rows = [json.loads(line) for line in f if line.strip()]
+                    if rows:
+                        self._insert(rows)
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    # Segment rendu : il sera rejoué au prochain lot
+                    os.replace(claimed, segment)
+                    with self._lock:
+                        self._metrics["flush_errors"] += 1
+                        self._metrics["last_error"] = str(e)
+                    print(f"[WARN] Échec d'écriture du journal d'audit ({len(rows)} lignes en attente) : {e}")
+                    break
+                try:
+                    os.remove(claimed)
+                except FileNotFoundError:
+                    pass
+                elapsed = time.perf_counter() - start
+                flushed += len(rows)
+                # Seules les lignes comptées dans la file de ce processus la décrémentent
+                counted = self._segment_pid(segment) == os.getpid() or segment in self._adopted
+
+                with self._lock:
+                    self._adopted.pop(segment, None)
+                    if counted:
+                        self._pending -= len(rows)
+                    self._metrics["flushed"] += len(rows)
+                    self._metrics["flushes"] += 1
+                    self._metrics["last_flush_seconds"] = elapsed
+                    self._metrics["max_flush_seconds"] = max(self._metrics["max_flush_seconds"], elapsed)
+                    self._metrics["total_flush_seconds"] += elapsed
+                    self._drained.notify_all()
+
+            with self._lock:
+                self._forget_vanished_segments()
+            if flushed:
+                query_cache.invalidate("audit_log", count_tag("audit_log"))
+            return flushed
+
+    def close(self):
+        """Arrête le thread et insère les lignes restantes (appelé à la sortie du processus)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+        with self._lock:
+            self._segment.close()
+            if self._segment_rows == 0:
+                os.remove(self._segment_path)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Profondeur de file, volumes et latences des lots."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["queue_depth"] = self._pending
+        flushes = metrics["flushes"]
+        metrics["avg_flush_seconds"] = metrics["total_flush_seconds"] / flushes if flushes else None
+        metrics["spill_segments"] = len(self._sealed_segments())
+        return metrics
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def audit_writer_enabled() -> bool:
+    """L'écriture asynchrone du journal est-elle activée (AUDIT_ASYNC=1) ?"""
+    return AUDIT_ASYNC
+
+def get_audit_writer() -> AuditWriter:
+    """Écrivain d'audit du processus, créé au premier appel et vidé à la sortie."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AuditWriter()
+            atexit.register(_writer.close)
+        return _writer
@@ -0,0 +1,209 @@
+# src/database/cache.py
+"""
+Cache des résultats de requêtes de lecture, invalidé par les écritures.
+
+Chaque entrée est associée à des étiquettes (tags) décrivant ce dont elle dépend :
+- "operations"          : le contenu des lignes (listes, intervalles d'IDs)
+- "operations:count"    : la cardinalité de la table (COUNT, MIN/MAX des IDs)
+- "operations#<id>"     : une ligne précise
+- "audit_log"           : le journal d'audit
+- "agg"                 : les tables d'agrégats (couche Or)
+
+Une écriture invalide uniquement les étiquettes qu'elle touche : la mise à jour de
+l'opération 42 vide "operations#42" et "operations", mais conserve le comptage et
+les autres opérations déjà lues.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import pandas as pd
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_TTL = float(os.getenv("QUERY_CACHE_TTL", "300"))
+DEFAULT_MAXSIZE = int(os.getenv("QUERY_CACHE_MAXSIZE", "256"))
+CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "1") != "0"
+
+
+def row_tag(table: str, key: Any) -> str:
+    """Étiquette d'une ligne précise (ex: 'operations#42')."""
+    return f"{table}#{key}"
+
+
+def count_tag(table: str) -> str:
+    """Étiquette de la cardinalité d'une table (ex: 'operations:count')."""
+    return f"{table}:count"
+
+
+class QueryCache:
+    """Cache LRU borné en taille et en durée de vie, invalidable par étiquettes."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL, enabled: bool = True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries = OrderedDict()  # clé -> (expiration, valeur, tags)
+        self._tags = {}  # tag -> set(clés)
+        self._generations = {}  # tag -> nombre d'invalidations
+        self._lock = threading.RLock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def get(self, key):
+        """Retourne (True, valeur) si la clé est présente et valide, sinon (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return False, None
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return True, value
+
+    def generations(self, tags: Iterable[str]) -> Dict[str, int]:
+        """Relevé des générations des étiquettes, à prendre avant d'exécuter la requête."""
+        with self._lock:
+            return {tag: self._generations.get(tag, 0) for tag in tags}
+
+    def set(self, key, value, tags: Iterable[str] = (), ttl: Optional[float] = None,
+            generations: Optional[Dict[str, int]] = None):
+        """
+        Stocke une valeur associée à ses étiquettes de dépendance.
+
+        Si `generations` est fourni et qu'une des étiquettes a été invalidée depuis
+        ce relevé, la valeur (potentiellement périmée) n'est pas stockée.
+        """
+        if not self.enabled:
+            return
+        tags = frozenset(tags)
+        with self._lock:
+            if generations is not None and any(
+                self._generations.get(tag, 0) != gen for tag, gen in generations.items()
+            ):
+                return
+            if key in self._entries:
+                self._remove(key)
+            expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+            self._entries[key] = (expires_at, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, *tags: str) -> int:
+        """Supprime toutes les entrées portant au moins une des étiquettes. Retourne le nombre supprimé."""
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in list(self._tags.get(tag, ())):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+            self._stats["invalidations"] += removed
+        return removed
+
+    def clear(self):
+        """Vide complètement le cache (les compteurs sont conservés)."""
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs de succès/échecs du cache."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+            stats["maxsize"] = self.maxsize
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            return stats
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+def _copy(value):
+    """Évite que l'appelant modifie la valeur partagée dans le cache."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    return value
+
+
+def _freeze(value):
+    """Rend une valeur d'argument hachable pour servir de clé (listes, dicts, ensembles)."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_freeze(v) for v in value))
+    return value
+
+
+def cached_query(tags: Callable[..., Iterable[str]], ttl: Optional[float] = None):
+    """
+    Décorateur plaçant une fonction de lecture derrière le cache global.
+
+    Args:
+        tags: fonction recevant les mêmes arguments que la fonction décorée et
+              retournant les étiquettes dont dépend le résultat
+        ttl: durée de vie spécifique (secondes), sinon celle du cache
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__module__, func.__qualname__, _freeze(args), _freeze(kwargs))
+            found, value = query_cache.get(key)
+            if found:
+                return _copy(value)
+            entry_tags = tuple(tags(*args, **kwargs))
+            generations = query_cache.generations(entry_tags)
+            value = func(*args, **kwargs)
+            query_cache.set(key, value, entry_tags, ttl=ttl, generations=generations)
+            return _copy(value)
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def invalidate_operation_write(operation_id, cardinality_changed: bool) -> int:
+    """
+    Invalide les entrées touchées par une écriture validée sur une opération.
+
+    Args:
+        operation_id: ID de l'opération écrite, ou liste d'IDs (écriture par lot)
+        cardinality_changed: True pour INSERT/DELETE (le nombre de lignes change)
+    """
+    operation_ids = operation_id if isinstance(operation_id, (list, tuple, set)) else [operation_id]
+    tags = [row_tag("operations", op_id) for op_id in operation_ids]
+    tags.extend(["operations", "agg", "audit_log", count_tag("audit_log")])
+    if cardinality_changed:
+        # Une suppression cascade sur les tables filles
+        tags.extend(count_tag(t) for t in ("operations", "flotteurs", "resultats_humain"))
+    return query_cache.invalidate(*tags)
+
+
+# Global cache instance
+query_cache = QueryCache(enabled=CACHE_ENABLED)
@@ -0,0 +1,25 @@
+# src/database/connection.py
+"""
+Connexion partagée à PostgreSQL.
+
+L'engine (et donc son pool de connexions) est créé au premier appel de
+`get_engine()` puis réutilisé par tous les modules qui l'importent.
+"""
+
+import os
+from functools import lru_cache
+from sqlalchemy import create_engine
+from dotenv import load_dotenv
+
+load_dotenv()
+DB_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+
+# Paramètre de session des connexions de l'application : elles journalisent elles-mêmes
+# leurs écritures, les triggers d'audit les ignorent (voir database.audit_triggers)
+APP_AUDIT_SETTING = "secmar.app_audit"
+
+@lru_cache(maxsize=1)
+def get_engine():
+    """Retourne l'engine SQLAlchemy partagé."""
+    return create_engine(DB_URL, pool_pre_ping=True,
+                         connect_args={"options": f"-c {APP_AUDIT_SETTING}=on"})
@@ -0,0 +1,192 @@
+# src/database/export.py
+"""
+Export des tables via COPY (SELECT ...) TO STDOUT.
+
+Le flux CSV produit par PostgreSQL est écrit directement dans le fichier de sortie
+(éventuellement compressé en gzip) par blocs, sans passer par pandas : la mémoire
+reste constante quelle que soit la taille de l'export. Pour le Parquet, le CSV est
+d'abord écrit dans un fichier temporaire puis converti par lots Arrow.
+"""
+
+import argparse
+import gzip
+import re
+import tempfile
+import time
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, Integer
+
+from .connection import get_engine
+from .query import build_audit_where, build_where
+from .tables import TABLES
+
+EXPORT_FORMATS = ("csv", "csv.gz", "parquet")
+EXPORTABLE_TABLES = ("operations", "flotteurs", "resultats_humain", "audit_log")
+COPY_BLOCK_SIZE = 1 << 20
+PARQUET_BLOCK_SIZE = 16 << 20
+
+def build_export_query(table: str, filters: Optional[Dict[str, Any]] = None,
+                       columns: Optional[List[str]] = None):
+    """
+    Construit le SELECT d'export d'une table.
+
+    Les tables filles sont filtrées par les filtres de leurs opérations ; audit_log
+    utilise les filtres du journal d'audit (voir database.query).
+
+    Returns:
+        Tuple de (requête_sql, paramètres, colonnes)
+    """
+    if table not in EXPORTABLE_TABLES:
+        raise ValueError(f"Table non exportable : {table}")
+
+    available = list(TABLES[table].columns.keys())
+    columns = list(columns or available)
+    unknown = set(columns) - set(available)
+    if unknown:
+        raise ValueError(f"Colonnes inconnues dans {table} : {sorted(unknown)}")
+    select = ", ".join(f"t.{c}" for c in columns)
+
+    if table == "audit_log":
+        where, params = build_audit_where(filters, alias="t")
+        order = "t.timestamp, t.id"
+    elif table == "operations":
+        where, params = build_where(filters, alias="t")
+        order = "t.operation_id"
+    else:
+        where, params = build_where(filters, alias="o")
+        if where != "TRUE":
+            where = f"t.operation_id IN (SELECT o.operation_id FROM operations o WHERE {where})"
+        order = "t.operation_id"
+
+    return f"SELECT {select} FROM {table} t WHERE {where} ORDER BY {order}", params, columns
+
+def _literal_sql(cursor, query: str, params: Dict[str, Any]) -> str:
+    """COPY n'accepte pas de paramètres : ils sont interpolés (échappés) par psycopg2."""
+    pyformat = re.sub(r"(?<!:):(\w+)", r"%(\1)s", query)
+    return cursor.mogrify(pyformat, params).decode()
+
+def _arrow_schema(table: str, columns: List[str]):
+    """Schéma Arrow déduit des métadonnées de la table."""
+    import pyarrow as pa
+
+    fields = []
+    for name in columns:
+        column_type = TABLES[table].columns[name].type
+        if isinstance(column_type, BigInteger):
+            arrow_type = pa.int64()
+        elif isinstance(column_type, Integer):
+            arrow_type = pa.int32()
+        elif isinstance(column_type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column_type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column_type, DateTime):
+            arrow_type = pa.timestamp("us", tz="UTC" if column_type.timezone else None)
+        else:
+            arrow_type = pa.string()
+        fields.append((name, arrow_type))
+    return pa.schema(fields)
+
+def _csv_to_parquet(csv_file: BinaryIO, output, schema) -> int:
+    """Convertit un CSV (format COPY) en Parquet par lots. Retourne le nombre de lignes."""
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    reader = pa_csv.open_csv(
+        csv_file,
+        read_options=pa_csv.ReadOptions(block_size=PARQUET_BLOCK_SIZE),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=schema,
+            strings_can_be_null=True,  # NULL = champ vide non quoté, '' = champ quoté
+            quoted_strings_can_be_null=False,
+            true_values=["t"],
+            false_values=["f"],
+        ),
+    )
+    rows = 0
+    with pq.ParquetWriter(output, schema, compression="zstd") as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+def export_table(table: str, output: Union[str, BinaryIO], fmt: str = "csv",
+                 filters: Optional[Dict[str, Any]] = None,
+                 columns: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Exporte une table (ou un sous-ensemble filtré) à la vitesse de COPY.
+
+    Args:
+        table: operations, flotteurs, resultats_humain ou audit_log
+        output: chemin du fichier ou objet fichier binaire
+        fmt: csv, csv.gz ou parquet
+        filters: filtres (voir database.query)
+        columns: colonnes exportées (toutes si None)
+
+    Returns:
+        Rapport d'export {table, format, rows, seconds}
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format non supporté : {fmt} (attendu : {EXPORT_FORMATS})")
+
+    query, params, columns = build_export_query(table, filters, columns)
+    start = time.perf_counter()
+
+    with get_engine().connect() as conn:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            if fmt == "parquet":
+                # Horodatages en UTC pour une conversion Arrow sans ambiguïté
+                cursor.execute("SET TIME ZONE 'UTC'")
+            copy_sql = f"COPY ({_literal_sql(cursor, query, params)}) TO STDOUT WITH (FORMAT CSV, HEADER)"
+
+            if fmt == "parquet":
+                with tempfile.TemporaryFile() as csv_file:
+                    cursor.copy_expert(copy_sql, csv_file, size=COPY_BLOCK_SIZE)
+                    csv_file.seek(0)
+                    rows = _csv_to_parquet(csv_file, output, _arrow_schema(table, columns))
+            else:
+                target = open(output, "wb") if isinstance(output, str) else output
+                try:
+                    if fmt == "csv.gz":
+                        with gzip.GzipFile(fileobj=target, mode="wb") as gz:
+                            cursor.copy_expert(copy_sql, gz, size=COPY_BLOCK_SIZE)
+                    else:
+                        cursor.copy_expert(copy_sql, target, size=COPY_BLOCK_SIZE)
+                    rows = cursor.rowcount
+                finally:
+                    if isinstance(output, str):
+                        target.close()
+        finally:
+            cursor.close()
+            conn.rollback()
+
+    report = {"table": table, "format": fmt, "rows": rows, "seconds": time.perf_counter() - start}
+    print(f"[OK] {table} : {rows} lignes exportées ({fmt}) en {report['seconds']:.2f} s")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export de tables SEC MAR via COPY")
+    parser.add_argument("table", choices=EXPORTABLE_TABLES)
+    parser.add_argument("--output", "-o", required=True, help="Fichier de sortie")
+    parser.add_argument("--format", "-f", dest="fmt", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--columns", nargs="+", help="Colonnes exportées")
+    parser.add_argument("--date-debut", help="Date de début (incluse)")
+    parser.add_argument("--date-fin", help="Date de fin (exclue)")
+    parser.add_argument("--cross-name", nargs="+", help="CROSS (operations et tables filles)")
+    parser.add_argument("--departement", nargs="+", help="Départements (operations et tables filles)")
+    parser.add_argument("--type-operation", nargs="+", help="Types d'opération (operations et tables filles)")
+    parser.add_argument("--changed-by", nargs="+", help="Auteurs des modifications (audit_log)")
+    args = parser.parse_args()
+
+    filters = {"date_debut": args.date_debut, "date_fin": args.date_fin}
+    if args.table == "audit_log":
+        filters["changed_by"] = args.changed_by
+    else:
+        filters.update({
+            "cross_name": args.cross_name,
+            "departement": args.departement,
+            "type_operation": args.type_operation,
+        })
+    export_table(args.table, args.output, args.fmt, filters, args.columns)
@@ -1,16 +1,117 @@
 # src/database/init_db.py
 """
 Crée les tables dans PostgreSQL selon le dictionnaire des données final.
+
+Les index secondaires ne sont pas créés avec les tables : ils sont construits par
+`create_indexes()` après le chargement en masse (plus rapide qu'une mise à jour
+d'index ligne par ligne), puis `check_index_usage()` vérifie via EXPLAIN que les
+requêtes fréquentes les utilisent.
 """
 
+import argparse
+import json
 import os
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 
+from .aggregates import rebuild_aggregates
+from .audit_partitions import install_partition_function, ensure_partitions
+from .audit_triggers import install_audit_triggers
+from .stats import install_row_counters
+
 load_dotenv()
 DB_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
 
-def init_tables():
+# Plan d'index : (nom, table, définition)
+# - clés étrangères des tables filles : évite un parcours séquentiel à chaque ON DELETE CASCADE
+# - audit_log : tri par timestamp, recherche par opération et modifications d'un utilisateur
+#   (changed_by puis timestamp : filtre et tri du plus récent servis par le même index)
+# - operations : filtres fréquents (période, CROSS, département). La date est indexée en
+#   B-tree plutôt qu'en BRIN car l'ordre physique de chargement ne suit pas la chronologie
+#   et l'index sert aussi au tri.
+INDEX_PLAN = [
+    ("idx_flotteurs_operation_id", "flotteurs", "USING btree (operation_id)"),
+    ("idx_resultats_humain_operation_id", "resultats_humain", "USING btree (operation_id)"),
+    ("idx_audit_log_timestamp", "audit_log", "USING btree (timestamp)"),
+    ("idx_audit_log_operation_id", "audit_log", "USING btree (operation_id)"),
+    ("idx_audit_log_changed_by_timestamp", "audit_log", "USING btree (changed_by, timestamp)"),
+    ("idx_operations_date_reception", "operations", "USING btree (date_heure_reception_alerte)"),
+    ("idx_operations_cross_name", "operations", "USING btree (cross_name)"),
+    ("idx_operations_departement", "operations", "USING btree (departement)"),
+]
+
+# Requêtes fréquentes et index attendu dans leur plan d'exécution
+HOT_QUERIES = [
+    {
+        "name": "cascade_flotteurs",
+        "sql": "SELECT 1 FROM flotteurs WHERE operation_id = :operation_id",
+        "params": {"operation_id": 0},
+        "expected_index": "idx_flotteurs_operation_id",
+    },
+    {
+        "name": "cascade_resultats_humain",
+        "sql": "SELECT 1 FROM resultats_humain WHERE operation_id = :operation_id",
+        "params": {"operation_id": 0},
+        "expected_index": "idx_resultats_humain_operation_id",
+    },
+    {
+        "name": "audit_log_recent",
+        "sql": "SELECT * FROM audit_log ORDER BY timestamp DESC LIMIT 100",
+        "params": {},
+        "expected_index": "idx_audit_log_timestamp",
+    },
+    {
+        "name": "audit_log_par_operation",
+        "sql": "SELECT * FROM audit_log WHERE operation_id = :operation_id",
+        "params": {"operation_id": 0},
+        "expected_index": "idx_audit_log_operation_id",
+    },
+    {
+        "name": "audit_log_par_utilisateur",
+        "sql": "SELECT * FROM audit_log WHERE changed_by = :changed_by ORDER BY timestamp DESC LIMIT 100",
+        "params": {"changed_by": "operator"},
+        "expected_index": "idx_audit_log_changed_by_timestamp",
+    },
+    {
+        "name": "operations_par_periode",
+        "sql": (
+            "SELECT * FROM operations "
+            "WHERE date_heure_reception_alerte >= :debut AND date_heure_reception_alerte < :fin"
+        ),
+        "params": {"debut": "2020-01-01", "fin": "2020-02-01"},
+        "expected_index": "idx_operations_date_reception",
+    },
+    {
+        "name": "operations_par_cross",
+        "sql": "SELECT * FROM operations WHERE cross_name = :cross_name",
+        "params": {"cross_name": "Étel"},
+        "expected_index": "idx_operations_cross_name",
+    },
+    {
+        "name": "operations_par_departement",
+        "sql": "SELECT * FROM operations WHERE departement = :departement",
+        "params": {"departement": "Morbihan"},
+        "expected_index": "idx_operations_departement",
+    },
+]
+
+AUDIT_LOG_SQL = """
+CREATE TABLE audit_log (
+    id BIGSERIAL,
+    table_name TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    changed_by TEXT NOT NULL,
+    operation_id BIGINT,
+    column_name TEXT,
+    old_value TEXT,
+    new_value TEXT,
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+CREATE TABLE audit_log_default PARTITION OF audit_log DEFAULT;
+"""
+
+def init_tables(audit_triggers: bool = False):
     engine = create_engine(DB_URL)
     
     with engine.connect() as conn:
@@ -56,7 +157,8 @@ def init_tables():
                     distance_cote_metres FLOAT,
                     distance_cote_milles_nautiques FLOAT,
                     est_vacances_scolaires BOOLEAN,
-                    donnees_meteo_imputees BOOLEAN
+                    donnees_meteo_imputees BOOLEAN,
+                    version INTEGER NOT NULL DEFAULT 1  -- verrou optimiste, incrémenté à chaque mise à jour
                 );
             """))
 
@@ -86,23 +188,205 @@ def init_tables():
                 );
             """))
 
-            # === TABLE audit_log ===
-            conn.execute(text("""
-                DROP TABLE IF EXISTS audit_log;
-                CREATE TABLE IF NOT EXISTS audit_log (
-                    id SERIAL PRIMARY KEY,
-                    table_name TEXT NOT NULL,
-                    operation TEXT NOT NULL,
-                    changed_by TEXT NOT NULL,
-                    operation_id BIGINT,
-                    column_name TEXT,
-                    old_value TEXT,
-                    new_value TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            """))
+            # === TABLE audit_log (partitionnée par mois) ===
+            conn.execute(text("DROP TABLE IF EXISTS audit_log CASCADE;" + AUDIT_LOG_SQL))
+            install_partition_function(conn)
+            ensure_partitions(conn)
+
+            # === Compteurs de lignes (statistiques à coût constant) ===
+            install_row_counters(conn)
+
+            # === Agrégats (couche Or), vides comme les tables sources ===
+            rebuild_aggregates(conn)
+
+            # === Journalisation par triggers (optionnelle) ===
+            if audit_triggers:
+                install_audit_triggers(conn)
 
     print("Tables créées selon le dictionnaire des données final.")
 
+# Migrations idempotentes pour une base créée par une version antérieure de init_tables
+MIGRATIONS = [
+    "ALTER TABLE operations ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+]
+AUDIT_LOG_COLUMNS = "id, table_name, operation, changed_by, operation_id, column_name, old_value, new_value, timestamp"
+
+def _partition_audit_log(conn) -> bool:
+    """
+    Convertit un audit_log non partitionné (versions antérieures) en table partitionnée
+    par mois : partitions des mois présents, lignes et identifiants conservés, index
+    du plan recréés. Retourne True si la table a été convertie.
+    """
+    if conn.execute(text("SELECT to_regclass('audit_log') IS NULL")).scalar():
+        conn.execute(text(AUDIT_LOG_SQL))
+        return True
+    if conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'audit_log'::regclass)"
+    )).scalar():
+        return False
+
+    # L'ancienne table et ses objets nommés libèrent leurs noms pour la nouvelle
+    conn.execute(text("ALTER TABLE audit_log RENAME TO audit_log_legacy"))
+    conn.execute(text("ALTER SEQUENCE IF EXISTS audit_log_id_seq RENAME TO audit_log_legacy_id_seq"))
+    for (index,) in conn.execute(text("""
+        SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = 'audit_log_legacy'::regclass
+    """)).fetchall():
+        conn.execute(text(f"ALTER INDEX {index} RENAME TO {index}_legacy"))
+
+    conn.execute(text(AUDIT_LOG_SQL))
+    install_partition_function(conn)
+    for month in conn.execute(text("""
+        SELECT DISTINCT date_trunc('month', timestamp)::date FROM audit_log_legacy WHERE timestamp IS NOT NULL
+    """)).scalars():
+        conn.execute(text("SELECT audit_log_ensure_partition(:month)"), {"month": month})
+    moved = conn.execute(text(f"""
+        INSERT INTO audit_log ({AUDIT_LOG_COLUMNS})
+        SELECT {AUDIT_LOG_COLUMNS.replace("timestamp", "COALESCE(timestamp, CURRENT_TIMESTAMP)")}
+        FROM audit_log_legacy
+    """)).rowcount
+    conn.execute(text("""
+        SELECT setval(pg_get_serial_sequence('audit_log', 'id'), COALESCE((SELECT max(id) FROM audit_log), 0) + 1, false)
+    """))
+    conn.execute(text("DROP TABLE audit_log_legacy"))
+    for name, table, definition in INDEX_PLAN:
+        if table == "audit_log":
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {definition}"))
+    print(f"[OK] audit_log partitionnée par mois ({moved} lignes reprises)")
+    return True
+
+def migrate(engine=None):
+    """
+    Met à niveau le schéma d'une base existante sans recréer les tables ni perdre de
+    données. Idempotent : chaque étape peut être rejouée.
+
+    - colonne operations.version (verrou optimiste)
+    - audit_log partitionnée par mois, fonction et partitions à venir
+    - compteurs de lignes (table_row_counts et triggers), recalculés
+    - tables d'agrégats, reconstruites depuis les tables sources
+    - triggers d'audit, remplacés par la version courante s'ils sont installés
+    """
+    engine = engine or create_engine(DB_URL)
+
+    with engine.begin() as conn:
+        for statement in MIGRATIONS:
+            conn.execute(text(statement))
+            print(f"[OK] {statement}")
+
+        _partition_audit_log(conn)
+        install_partition_function(conn)
+        ensure_partitions(conn)
+        print("[OK] partitions d'audit")
+
+        install_row_counters(conn)
+        print("[OK] compteurs de lignes")
+
+        rebuild_aggregates(conn)
+
+        if conn.execute(text("""
+            SELECT EXISTS (
+                SELECT 1 FROM pg_trigger
+                WHERE tgrelid = 'operations'::regclass AND tgname = 'operations_audit_update'
+            )
+        """)).scalar():
+            install_audit_triggers(conn)
+
+def create_indexes(engine=None):
+    """
+    Construit le plan d'index (à lancer après le chargement en masse) puis met à jour
+    les statistiques du planificateur.
+    """
+    engine = engine or create_engine(DB_URL)
+
+    with engine.connect() as conn:
+        with conn.begin():
+            for name, table, definition in INDEX_PLAN:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {definition}"))
+                print(f"[OK] index {name} sur {table}")
+
+            for table in sorted({table for _, table, _ in INDEX_PLAN}):
+                conn.execute(text(f"ANALYZE {table}"))
+
+    print("Index créés et statistiques mises à jour.")
+
+def _collect_index_names(plan_node: dict) -> set:
+    """Parcourt un nœud de plan EXPLAIN (JSON) et retourne les index utilisés."""
+    names = set()
+    if "Index Name" in plan_node:
+        names.add(plan_node["Index Name"])
+    for child in plan_node.get("Plans", []):
+        names |= _collect_index_names(child)
+    return names
+
+def check_index_usage(engine=None, force_index: bool = False) -> list:
+    """
+    Vérifie via EXPLAIN que les requêtes fréquentes utilisent le plan d'index.
+
+    Args:
+        engine: engine SQLAlchemy (créé si absent)
+        force_index: désactive le parcours séquentiel pour vérifier que l'index est
+                     utilisable même sur une petite base où le planificateur le jugerait inutile
+
+    Returns:
+        list: un dict par requête {name, expected_index, indexes_used, ok}
+    """
+    engine = engine or create_engine(DB_URL)
+    results = []
+
+    with engine.connect() as conn:
+        with conn.begin():
+            if force_index:
+                conn.execute(text("SET LOCAL enable_seqscan = off"))
+
+            for query in HOT_QUERIES:
+                raw_plan = conn.execute(
+                    text(f"EXPLAIN (FORMAT JSON) {query['sql']}"), query["params"]
+                ).scalar()
+                plan = raw_plan if isinstance(raw_plan, list) else json.loads(raw_plan)
+                indexes_used = _collect_index_names(plan[0]["Plan"])
+
+                # Sur une table partitionnée, le plan cite les index des partitions
+                accepted = {query["expected_index"]} | set(conn.execute(text("""
+                    SELECT c.relname
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = to_regclass(:index_name)
+                """), {"index_name": query["expected_index"]}).scalars())
+
+                results.append({
+                    "name": query["name"],
+                    "expected_index": query["expected_index"],
+                    "indexes_used": sorted(indexes_used),
+                    "ok": bool(accepted & indexes_used),
+                })
+
+    for result in results:
+        status = "OK" if result["ok"] else "ABSENT"
+        print(f"[{status}] {result['name']} -> {result['expected_index']} (utilisés: {result['indexes_used']})")
+
+    return results
+
 if __name__ == "__main__":
-    init_tables()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Initialisation de la base SEC MAR")
+    parser.add_argument("--indexes", action="store_true",
+                        help="Construire le plan d'index (après chargement) au lieu de recréer les tables")
+    parser.add_argument("--explain", action="store_true",
+                        help="Vérifier via EXPLAIN que les requêtes fréquentes utilisent les index")
+    parser.add_argument("--force-index", action="store_true",
+                        help="Avec --explain : désactiver le parcours séquentiel (petites bases)")
+    parser.add_argument("--migrate", action="store_true",
+                        help="Mettre à niveau le schéma d'une base existante au lieu de recréer les tables")
+    parser.add_argument("--audit-triggers", action="store_true",
+                        help="Journaliser les écritures dans audit_log par triggers PL/pgSQL")
+    args = parser.parse_args()
+
+    if args.migrate:
+        migrate()
+    elif args.indexes or args.explain:
+        if args.indexes:
+            create_indexes()
+        if args.explain:
+            results = check_index_usage(force_index=args.force_index)
+            if not all(r["ok"] for r in results):
+                raise SystemExit(1)
+    else:
+        init_tables(audit_triggers=args.audit_triggers)
\ No newline at end of file
@@ -17,6 +17,9 @@ from ..ingestion.prepare_tables import (
     prepare_flotteurs,
     prepare_resultats_humain
 )
+from .aggregates import apply_operations
+from .audit_triggers import set_changed_by
+from .init_db import create_indexes
 
 load_dotenv()
 DB_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
@@ -30,6 +33,9 @@ def load_data():
     # Utiliser une transaction manuelle
     with engine.begin() as conn:
         try:
+            # Auteur des lignes d'audit si les triggers d'audit sont installés
+            set_changed_by(conn, "load_to_postgres")
+
             # === Charger operations ===
             df_ops = prepare_operations()
             
@@ -62,6 +68,10 @@ def load_data():
             df_rh = prepare_resultats_humain()
             df_rh.to_sql("resultats_humain", conn, if_exists="append", index=False)
             print(f"[OK] resultats_humain : {len(df_rh)} lignes chargees")
+
+            # === Agréger les opérations chargées et leurs lignes filles ===
+            apply_operations(conn, df_ops["operation_id"], +1)
+            print("[OK] agregats mis a jour")
             
             print("\n[SUCCES] Chargement termine avec succes.")
             
@@ -71,5 +81,8 @@ def load_data():
             traceback.print_exc()
             raise
 
+    # Index secondaires construits une fois les données chargées
+    create_indexes(engine)
+
 if __name__ == "__main__":
     load_data()
\ No newline at end of file
@@ -0,0 +1,408 @@
+# src/database/query.py
+"""
+API de requêtes analytiques filtrées sur `operations`.
+
+Les filtres sont traduits en clause WHERE à paramètres liés et exécutés par PostgreSQL :
+seules les lignes et colonnes demandées (ou les groupes déjà agrégés) transitent
+vers Python.
+
+Filtres acceptés (dict) :
+- date_debut / date_fin : intervalle [début, fin[ sur date_heure_reception_alerte
+- cross_name, departement, type_operation, phase_journee : valeur ou liste de valeurs
+- bbox : (longitude_min, latitude_min, longitude_max, latitude_max)
+- id_min / id_max : intervalle d'operation_id (bornes incluses)
+- operation_id : identifiant ou liste d'identifiants
+
+Le journal d'audit a ses propres filtres (`build_audit_where`) :
+- date_debut / date_fin : intervalle [début, fin[ sur timestamp
+- changed_by, table_name, operation, column_name : valeur ou liste de valeurs
+- operation_id : identifiant d'opération
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+
+from .cache import cached_query
+from .connection import get_engine
+from .tables import TABLES
+
+LIST_FILTERS = ("cross_name", "departement", "type_operation", "phase_journee", "operation_id")
+ALLOWED_FILTERS = set(LIST_FILTERS) | {"date_debut", "date_fin", "bbox", "id_min", "id_max"}
+AUDIT_LIST_FILTERS = ("changed_by", "table_name", "operation", "column_name")
+AUDIT_ALLOWED_FILTERS = set(AUDIT_LIST_FILTERS) | {"date_debut", "date_fin", "operation_id"}
+JOINABLE_TABLES = ("flotteurs", "resultats_humain")
+TIME_BUCKETS = ("day", "week", "month", "quarter", "year")
+METRIC_FUNCTIONS = {
+    "count": "COUNT(*)",
+    "count_operations": "COUNT(DISTINCT o.operation_id)",
+    "sum": "SUM({column})",
+    "avg": "AVG({column})",
+    "min": "MIN({column})",
+    "max": "MAX({column})",
+}
+DEFAULT_METRICS = {"nb_operations": ("count_operations", None)}
+
+OPERATIONS_COLUMNS = list(TABLES["operations"].columns.keys())
+AUDIT_COLUMNS = list(TABLES["audit_log"].columns.keys())
+
+def period_filters(start: date, end: date) -> Dict[str, str]:
+    """
+    Filtres date_debut / date_fin couvrant les jours `start` à `end` inclus
+    (date_fin étant exclue, elle est fixée au lendemain de `end`).
+    """
+    return {"date_debut": start.isoformat(), "date_fin": (end + timedelta(days=1)).isoformat()}
+
+def build_where(filters: Optional[Dict[str, Any]], alias: str = "o") -> Tuple[str, Dict[str, Any]]:
+    """
+    Traduit un dict de filtres en clause WHERE paramétrée.
+
+    Args:
+        filters: filtres (voir docstring du module)
+        alias: alias SQL de la table operations
+
+    Returns:
+        Tuple de (clause_sql, paramètres)
+    """
+    filters = {k: v for k, v in (filters or {}).items() if v is not None}
+    unknown = set(filters) - ALLOWED_FILTERS
+    if unknown:
+        raise ValueError(f"Filtres inconnus : {sorted(unknown)}")
+
+    clauses, params = [], {}
+
+    if "date_debut" in filters:
+        clauses.append(f"{alias}.date_heure_reception_alerte >= :date_debut")
+        params["date_debut"] = filters["date_debut"]
+    if "date_fin" in filters:
+        clauses.append(f"{alias}.date_heure_reception_alerte < :date_fin")
+        params["date_fin"] = filters["date_fin"]
+    if "id_min" in filters:
+        clauses.append(f"{alias}.operation_id >= :id_min")
+        params["id_min"] = int(filters["id_min"])
+    if "id_max" in filters:
+        clauses.append(f"{alias}.operation_id <= :id_max")
+        params["id_max"] = int(filters["id_max"])
+
+    for column in LIST_FILTERS:
+        values = filters.get(column)
+        if not isinstance(values, (list, tuple, set)):
+            values = [values] if values is not None else None
+        if values:
+            clauses.append(f"{alias}.{column} = ANY(:{column})")
+            params[column] = list(values)
+
+    if "bbox" in filters:
+        lon_min, lat_min, lon_max, lat_max = filters["bbox"]
+        clauses.append(f"{alias}.longitude BETWEEN :lon_min AND :lon_max")
+        clauses.append(f"{alias}.latitude BETWEEN :lat_min AND :lat_max")
+        params.update({"lon_min": lon_min, "lat_min": lat_min, "lon_max": lon_max, "lat_max": lat_max})
+
+    return (" AND ".join(clauses) or "TRUE"), params
+
+def build_audit_where(filters: Optional[Dict[str, Any]], alias: str = "a") -> Tuple[str, Dict[str, Any]]:
+    """
+    Traduit un dict de filtres du journal d'audit en clause WHERE paramétrée.
+
+    Args:
+        filters: filtres (voir docstring du module)
+        alias: alias SQL de la table audit_log
+
+    Returns:
+        Tuple de (clause_sql, paramètres)
+    """
+    filters = {k: v for k, v in (filters or {}).items() if v is not None}
+    unknown = set(filters) - AUDIT_ALLOWED_FILTERS
+    if unknown:
+        raise ValueError(f"Filtres inconnus : {sorted(unknown)}")
+
+    clauses, params = [], {}
+
+    if "date_debut" in filters:
+        clauses.append(f"{alias}.timestamp >= :date_debut")
+        params["date_debut"] = filters["date_debut"]
+    if "date_fin" in filters:
+        clauses.append(f"{alias}.timestamp < :date_fin")
+        params["date_fin"] = filters["date_fin"]
+    if "operation_id" in filters:
+        clauses.append(f"{alias}.operation_id = :operation_id")
+        params["operation_id"] = int(filters["operation_id"])
+
+    for column in AUDIT_LIST_FILTERS:
+        values = filters.get(column)
+        if isinstance(values, str):
+            values = [values]
+        if values and len(values) == 1:
+            # Égalité simple : l'index (changed_by, timestamp) sert aussi le tri par date
+            clauses.append(f"{alias}.{column} = :{column}")
+            params[column] = list(values)[0]
+        elif values:
+            clauses.append(f"{alias}.{column} = ANY(:{column})")
+            params[column] = list(values)
+
+    return (" AND ".join(clauses) or "TRUE"), params
+
+def _resolve_column(name: str, join: Optional[str]) -> str:
+    """Qualifie une colonne (o. pour operations, j. pour la table jointe) après vérification."""
+    if name in OPERATIONS_COLUMNS:
+        return f"o.{name}"
+    if join and name in TABLES[join].columns.keys():
+        return f"j.{name}"
+    raise ValueError(f"Colonne inconnue : {name}")
+
+def _from_clause(join: Optional[str]) -> str:
+    if join is None:
+        return "operations o"
+    if join not in JOINABLE_TABLES:
+        raise ValueError(f"Jointure non supportée : {join}")
+    return f"operations o JOIN {join} j ON j.operation_id = o.operation_id"
+
+def _query_tags(*args, **kwargs):
+    # Les tables filles ne sont écrites que par cascade depuis operations
+    return ("operations",)
+
+@cached_query(tags=_query_tags)
+def query_operations(filters: Optional[Dict[str, Any]] = None,
+                     columns: Optional[List[str]] = None,
+                     join: Optional[str] = None,
+                     join_columns: Optional[List[str]] = None,
+                     order_by: Optional[str] = "operation_id",
+                     descending: bool = False,
+                     limit: Optional[int] = None) -> pd.DataFrame:
+    """
+    Récupère les opérations filtrées, en ne transférant que les colonnes demandées.
+
+    Args:
+        filters: filtres (voir docstring du module)
+        columns: colonnes d'operations à retourner (toutes si None)
+        join: table fille à joindre ("flotteurs" ou "resultats_humain")
+        join_columns: colonnes de la table jointe (toutes sauf operation_id si None)
+        order_by: colonne de tri
+        descending: tri décroissant
+        limit: nombre maximum de lignes
+
+    Returns:
+        DataFrame des lignes correspondantes
+    """
+    from_clause = _from_clause(join)
+    columns = columns or OPERATIONS_COLUMNS
+    select = [_resolve_column(c, None) for c in columns]
+    if join:
+        available = [c for c in TABLES[join].columns.keys() if c != "operation_id"]
+        for column in join_columns or available:
+            if column not in available:
+                raise ValueError(f"Colonne inconnue dans {join} : {column}")
+            select.append(f"j.{column}")
+
+    where, params = build_where(filters)
+    query = f"SELECT {', '.join(select)} FROM {from_clause} WHERE {where}"
+    if order_by:
+        query += f" ORDER BY {_resolve_column(order_by, join)} {'DESC' if descending else 'ASC'}"
+    if limit is not None:
+        query += " LIMIT :limit"
+        params["limit"] = int(limit)
+
+    with get_engine().connect() as conn:
+        return pd.read_sql(text(query), conn, params=params)
+
+def _cursor_value(value):
+    """Valeur de curseur transmissible au pilote (types Python natifs, None pour NULL)."""
+    if pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value.item() if hasattr(value, "item") else value
+
+def page_operations(filters: Optional[Dict[str, Any]] = None,
+                    columns: Optional[List[str]] = None,
+                    sort_by: str = "operation_id",
+                    descending: bool = False,
+                    cursor: Optional[Tuple[Any, int]] = None,
+                    limit: int = 100) -> Tuple[pd.DataFrame, Optional[Tuple[Any, int]]]:
+    """
+    Une page d'opérations filtrées, paginée par clé (keyset) plutôt que par OFFSET.
+
+    Tri sur (sort_by, operation_id), valeurs NULL en dernier : chaque page reprend après
+    la dernière ligne de la précédente, en temps constant quelle que soit sa position.
+
+    Args:
+        filters: filtres (voir docstring du module)
+        columns: colonnes d'operations à retourner (toutes si None)
+        sort_by: colonne de tri
+        descending: tri décroissant
+        cursor: curseur retourné par la page précédente (None : première page)
+        limit: nombre de lignes par page
+
+    Returns:
+        Tuple de (page, curseur de la page suivante ou None s'il n'y en a pas)
+    """
+    columns = list(columns or OPERATIONS_COLUMNS)
+    fetched = list(dict.fromkeys(columns + ["operation_id", sort_by]))
+    select = ", ".join(_resolve_column(c, None) for c in fetched)
+    sort_column = _resolve_column(sort_by, None)
+    where, params = build_where(filters)
+    direction, comparison = ("DESC", "<") if descending else ("ASC", ">")
+
+    def fetch(condition: str, condition_params: Dict[str, Any], order: str, size: int) -> pd.DataFrame:
+        query = f"SELECT {select} FROM operations o WHERE {where} AND {condition} ORDER BY {order} LIMIT :limit"
+        with get_engine().connect() as conn:
+            return pd.read_sql(text(query), conn, params={**params, **condition_params, "limit": size})
+
+    if sort_by == "operation_id":
+        condition = f"o.operation_id {comparison} :after_id" if cursor else "TRUE"
+        page = fetch(condition, {"after_id": cursor[1]} if cursor else {}, f"o.operation_id {direction}", limit + 1)
+    else:
+        # Valeurs renseignées (comparaison de lignes, compatible avec un index), puis NULL
+        frames = []
+        in_nulls = cursor is not None and cursor[0] is None
+        if not in_nulls:
+            condition, condition_params = f"{sort_column} IS NOT NULL", {}
+            if cursor:
+                condition += f" AND ({sort_column}, o.operation_id) {comparison} (:after_value, :after_id)"
+                condition_params = {"after_value": cursor[0], "after_id": cursor[1]}
+            frames.append(fetch(condition, condition_params,
+                                f"{sort_column} {direction}, o.operation_id {direction}", limit + 1))
+        remaining = limit + 1 - sum(len(frame) for frame in frames)
+        if remaining > 0:
+            condition, condition_params = f"{sort_column} IS NULL", {}
+            if in_nulls:
+                condition += f" AND o.operation_id {comparison} :after_id"
+                condition_params = {"after_id": cursor[1]}
+            frames.append(fetch(condition, condition_params, f"o.operation_id {direction}", remaining))
+        frames = [frame for frame in frames if not frame.empty] or frames[:1]
+        page = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page.iloc[:limit]
+        last = page.iloc[-1]
+        next_cursor = (_cursor_value(last[sort_by]), int(last["operation_id"]))
+    return page[columns].reset_index(drop=True), next_cursor
+
+def page_audit_log(filters: Optional[Dict[str, Any]] = None,
+                   cursor: Optional[Tuple[Any, int]] = None,
+                   limit: int = 100) -> Tuple[pd.DataFrame, Optional[Tuple[Any, int]]]:
+    """
+    Une page du journal d'audit filtré, des entrées les plus récentes aux plus anciennes,
+    paginée par clé sur (timestamp, id).
+
+    Args:
+        filters: filtres du journal d'audit (voir docstring du module)
+        cursor: curseur retourné par la page précédente (None : première page)
+        limit: nombre de lignes par page
+
+    Returns:
+        Tuple de (page, curseur de la page suivante ou None s'il n'y en a pas)
+    """
+    where, params = build_audit_where(filters)
+    if cursor:
+        # La borne simple sur timestamp délimite le parcours d'index (et les partitions lues)
+        where += " AND a.timestamp <= :after_timestamp AND (a.timestamp, a.id) < (:after_timestamp, :after_id)"
+        params.update(after_timestamp=cursor[0], after_id=cursor[1])
+    query = f"""
+        SELECT {', '.join(f'a.{c}' for c in AUDIT_COLUMNS)}
+        FROM audit_log a
+        WHERE {where}
+        ORDER BY a.timestamp DESC, a.id DESC
+        LIMIT :limit
+    """
+    with get_engine().connect() as conn:
+        page = pd.read_sql(text(query), conn, params={**params, "limit": limit + 1})
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page.iloc[:limit]
+        last = page.iloc[-1]
+        next_cursor = (_cursor_value(last["timestamp"]), int(last["id"]))
+    return page, next_cursor
+
+@cached_query(tags=lambda filters=None: ("audit_log",))
+def summarize_audit_log(filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Indicateurs du journal d'audit filtré, calculés en SQL sur toutes les lignes retenues.
+
+    Returns:
+        dict: modifications, utilisateurs, tables, operations (distinctes), insertions,
+              mises_a_jour, suppressions, premiere et derniere (dates extrêmes)
+    """
+    where, params = build_audit_where(filters)
+    query = f"""
+        SELECT COUNT(*) AS modifications,
+               COUNT(DISTINCT a.changed_by) AS utilisateurs,
+               COUNT(DISTINCT a.table_name) AS tables,
+               COUNT(DISTINCT a.operation_id) AS operations,
+               COUNT(*) FILTER (WHERE a.operation = 'INSERT') AS insertions,
+               COUNT(*) FILTER (WHERE a.operation = 'UPDATE') AS mises_a_jour,
+               COUNT(*) FILTER (WHERE a.operation = 'DELETE') AS suppressions,
+               MIN(a.timestamp) AS premiere,
+               MAX(a.timestamp) AS derniere
+        FROM audit_log a
+        WHERE {where}
+    """
+    with get_engine().connect() as conn:
+        return dict(conn.execute(text(query), params).mappings().one())
+
+@cached_query(tags=_query_tags)
+def aggregate_operations(filters: Optional[Dict[str, Any]] = None,
+                         group_by: Optional[List[str]] = None,
+                         metrics: Optional[Dict[str, Tuple[str, Optional[str]]]] = None,
+                         time_bucket: Optional[str] = None,
+                         join: Optional[str] = None) -> pd.DataFrame:
+    """
+    Agrège les opérations filtrées côté serveur (GROUP BY / date_trunc).
+
+    Exécutée sur le miroir analytique DuckDB lorsqu'il est activé (voir analytics_mirror),
+    sinon sur PostgreSQL.
+
+    Args:
+        filters: filtres (voir docstring du module)
+        group_by: colonnes de regroupement ; "periode" désigne la date de réception
+                  tronquée selon `time_bucket`
+        metrics: {alias: (fonction, colonne)} avec fonction parmi count, count_operations,
+                 sum, avg, min, max (par défaut : nombre d'opérations distinctes)
+        time_bucket: granularité de "periode" (day, week, month, quarter, year)
+        join: table fille à joindre ("flotteurs" ou "resultats_humain")
+
+    Returns:
+        DataFrame d'une ligne par groupe
+    """
+    from_clause = _from_clause(join)
+    group_by = list(group_by or [])
+    metrics = metrics or DEFAULT_METRICS
+
+    group_exprs = []
+    for name in group_by:
+        if name == "periode":
+            if time_bucket not in TIME_BUCKETS:
+                raise ValueError(f"time_bucket doit être parmi {TIME_BUCKETS}")
+            group_exprs.append(f"date_trunc('{time_bucket}', o.date_heure_reception_alerte) AS periode")
+        else:
+            group_exprs.append(f"{_resolve_column(name, join)} AS {name}")
+
+    metric_exprs = []
+    for alias, (function, column) in metrics.items():
+        if function not in METRIC_FUNCTIONS:
+            raise ValueError(f"Fonction d'agrégat inconnue : {function}")
+        if not alias.isidentifier():
+            raise ValueError(f"Alias invalide : {alias}")
+        column_sql = _resolve_column(column, join) if column else None
+        # Sans jointure, une ligne par opération : COUNT(*) évite le tri du DISTINCT
+        function_sql = "COUNT(*)" if function == "count_operations" and join is None else METRIC_FUNCTIONS[function]
+        metric_exprs.append(f"{function_sql.format(column=column_sql)} AS {alias}")
+
+    where, params = build_where(filters)
+    query = f"SELECT {', '.join(group_exprs + metric_exprs)} FROM {from_clause} WHERE {where}"
+    if group_by:
+        positions = ", ".join(str(i + 1) for i in range(len(group_by)))
+        query += f" GROUP BY {positions} ORDER BY {positions}"
+
+    # Import local : analytics_mirror dépend de ce module (via export)
+    from .analytics_mirror import query_mirror
+    mirrored = query_mirror(query, params)
+    if mirrored is not None:
+        return mirrored
+
+    with get_engine().connect() as conn:
+        return pd.read_sql(text(query), conn, params=params)
@@ -1,14 +1,14 @@
 # src/database/read.py
 import pandas as pd
-from sqlalchemy import create_engine, text
-from dotenv import load_dotenv
-import os
+from sqlalchemy import text
 
-load_dotenv()
+from .cache import cached_query, count_tag, row_tag
+from .connection import get_engine
+from .stats import get_row_count
 
+@cached_query(tags=lambda limit=100: ("operations",))
 def get_operations(limit=100):
-    DB_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-    engine = create_engine(DB_URL)
+    engine = get_engine()
     if limit is None:
         query = "SELECT * FROM operations"
     else:
@@ -17,41 +17,37 @@ def get_operations(limit=100):
 
 # src/database/read.py
 
+@cached_query(tags=lambda operation_id: (row_tag("operations", operation_id),))
 def get_operation_by_id(operation_id: int):
     """Récupère une opération par son ID, directement depuis la base."""
-    DB_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-    engine = create_engine(DB_URL)
+    engine = get_engine()
     query = text("SELECT * FROM operations WHERE operation_id = :operation_id")
     df = pd.read_sql(query, engine, params={"operation_id": operation_id})
     return df if not df.empty else None
 
+@cached_query(tags=lambda: (count_tag("operations"),))
 def get_operation_id_range():
     """Récupère le min et max des operation_id dans la base."""
-    DB_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-    engine = create_engine(DB_URL)
+    engine = get_engine()
     query = text("SELECT MIN(operation_id) as min_id, MAX(operation_id) as max_id FROM operations")
     result = pd.read_sql(query, engine)
     return result.iloc[0]['min_id'], result.iloc[0]['max_id']
 
 def get_operations_count():
-    """Récupère le nombre total d'opérations dans la base."""
-    DB_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-    engine = create_engine(DB_URL)
-    query = text("SELECT COUNT(*) as count FROM operations")
-    result = pd.read_sql(query, engine)
-    return int(result.iloc[0]['count'])
+    """Récupère le nombre total d'opérations dans la base (compteur maintenu, sans COUNT(*))."""
+    return get_row_count("operations")
 
+@cached_query(tags=lambda min_id, max_id: ("operations",))
 def get_operations_by_id_range(min_id: int, max_id: int):
     """Récupère les opérations dans un intervalle d'IDs."""
-    DB_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-    engine = create_engine(DB_URL)
+    engine = get_engine()
     query = text("SELECT * FROM operations WHERE operation_id BETWEEN :min_id AND :max_id ORDER BY operation_id")
     return pd.read_sql(query, engine, params={"min_id": min_id, "max_id": max_id})
 
+@cached_query(tags=lambda limit=100: ("audit_log",))
 def get_audit_log(limit=100):
     """Récupère les entrées du journal d'audit."""
-    DB_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-    engine = create_engine(DB_URL)
+    engine = get_engine()
     if limit is None:
         query = "SELECT * FROM audit_log ORDER BY timestamp DESC"
     else:
@@ -0,0 +1,197 @@
+# src/database/statements.py
+"""
+Instructions SQL d'écriture construites à partir des métadonnées de tables.py.
+
+Les colonnes reçues (clés des dicts fournis par l'interface ou l'ingestion) sont
+vérifiées contre la définition des tables avant toute construction de SQL :
+une colonne inconnue lève `UnknownColumnError`. Les identifiants sont quotés par le
+dialecte PostgreSQL lorsque c'est nécessaire (mots réservés).
+
+Les instructions sont mémorisées (LRU) par table et jeu de colonnes : un même
+formulaire ou un même lot réutilise l'objet déjà construit, et SQLAlchemy sa forme
+compilée. Elles servent aussi bien à une ligne qu'à `conn.execute(stmt, [dict, ...])`.
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from .tables import TABLES
+
+STATEMENT_CACHE_SIZE = 256
+
+# Colonnes gérées par la base ou par la couche d'écriture, jamais modifiées directement
+READ_ONLY_COLUMNS = {"operations": {"operation_id", "version"}}
+
+_dialect = postgresql.dialect()
+_preparer = _dialect.identifier_preparer
+
+class UnknownColumnError(ValueError):
+    """Colonne absente de la définition de la table."""
+
+    def __init__(self, table: str, columns: Iterable[str]):
+        self.table = table
+        self.columns = sorted(columns)
+        super().__init__(f"Colonnes inconnues dans {table} : {self.columns}")
+
+def quote(name: str) -> str:
+    """Identifiant quoté si nécessaire (mot réservé, majuscules...)."""
+    return _preparer.quote(name)
+
+def sql_types(table: str) -> Dict[str, str]:
+    """Types SQL des colonnes d'une table (pour les CAST de valeurs non typées)."""
+    return {c.name: c.type.compile(dialect=_dialect) for c in TABLES[table].columns}
+
+def check_columns(table: str, columns: Iterable[str], writable: bool = False) -> Tuple[str, ...]:
+    """
+    Vérifie des noms de colonnes contre la définition de la table.
+
+    Args:
+        table: nom de la table
+        columns: colonnes à vérifier
+        writable: refuser aussi les colonnes en lecture seule (READ_ONLY_COLUMNS)
+
+    Returns:
+        Tuple trié des colonnes (clé de cache indépendante de l'ordre du dict)
+
+    Raises:
+        UnknownColumnError: colonne absente de la table
+        ValueError: colonne en lecture seule avec writable=True
+    """
+    columns = set(columns)
+    unknown = columns - set(TABLES[table].columns.keys())
+    if unknown:
+        raise UnknownColumnError(table, unknown)
+    if writable:
+        read_only = columns & READ_ONLY_COLUMNS.get(table, set())
+        if read_only:
+            raise ValueError(f"Colonnes non modifiables dans {table} : {sorted(read_only)}")
+    return tuple(sorted(columns))
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def _insert_statement(table: str, columns: Tuple[str, ...]):
+    return text(
+        f"INSERT INTO {quote(table)} ({', '.join(quote(c) for c in columns)}) "
+        f"VALUES ({', '.join(f':{c}' for c in columns)})"
+    )
+
+def insert_statement(table: str, columns: Iterable[str]):
+    """INSERT d'une ligne aux colonnes données (paramètres nommés d'après les colonnes)."""
+    return _insert_statement(table, check_columns(table, columns))
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def _bulk_insert_statement(table: str, key: str):
+    table_obj = TABLES[table]
+    return (postgresql.insert(table_obj)
+            .on_conflict_do_nothing(index_elements=[key])
+            .returning(table_obj.c[key]))
+
+def bulk_insert_statement(table: str, columns: Iterable[str], key: str = "operation_id"):
+    """
+    INSERT de plusieurs lignes via `conn.execute(stmt, [dict, ...])` : regroupées par
+    SQLAlchemy en INSERT multi-lignes. Les lignes dont la clé existe déjà sont ignorées ;
+    les clés réellement insérées sont retournées.
+
+    Args:
+        table: nom de la table
+        columns: colonnes des lignes (identiques pour toutes les lignes d'un appel)
+        key: colonne unique (conflits ignorés, valeurs retournées)
+    """
+    check_columns(table, list(columns) + [key])
+    return _bulk_insert_statement(table, key)
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def _operation_update_statement(columns: Tuple[str, ...], returned: Tuple[str, ...], version_check: bool):
+    old_columns = list(dict.fromkeys(columns + returned))
+    set_clause = ", ".join([f"{quote(c)} = :{c}" for c in columns] + ["version = o.version + 1"])
+    check = "AND old.version = :expected_version" if version_check else ""
+    return text(f"""
+        WITH old AS (
+            SELECT operation_id, version, {', '.join(quote(c) for c in old_columns)}
+            FROM operations
+            WHERE operation_id = :operation_id
+            FOR UPDATE
+        ), upd AS (
+            UPDATE operations o
+            SET {set_clause}
+            FROM old
+            WHERE o.operation_id = old.operation_id {check}
+            RETURNING o.version, {', '.join(f"o.{quote(c)}" for c in columns)}
+        )
+        SELECT old.version AS old_version, upd.version AS new_version,
+               {', '.join(f"old.{quote(c)} AS old_{c}" for c in old_columns)},
+               {', '.join(f"upd.{quote(c)} AS new_{c}, old.{quote(c)} IS DISTINCT FROM upd.{quote(c)} AS changed_{c}"
+                          for c in columns)}
+        FROM old LEFT JOIN upd ON TRUE
+    """)
+
+def operation_update_statement(columns: Iterable[str], returned: Iterable[str] = (),
+                               version_check: bool = False):
+    """
+    Mise à jour d'une opération en une requête : verrouille la ligne, la modifie,
+    incrémente `version` et retourne old_version, new_version, old_<col>, new_<col>
+    et changed_<col> (aucune ligne : opération absente ; new_version NULL : conflit).
+
+    Args:
+        columns: colonnes modifiées (paramètres :colonne, :operation_id)
+        returned: colonnes supplémentaires dont l'ancienne valeur est retournée
+        version_check: n'appliquer que si version = :expected_version
+    """
+    columns = check_columns("operations", columns, writable=True)
+    returned = check_columns("operations", returned)
+    return _operation_update_statement(columns, returned, version_check)
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def _select_for_update_statement(columns: Tuple[str, ...]):
+    return text(f"""
+        SELECT operation_id, {', '.join(quote(c) for c in columns)}
+        FROM operations
+        WHERE operation_id = ANY(:ids)
+        FOR UPDATE
+    """)
+
+def select_for_update_statement(columns: Iterable[str]):
+    """Anciennes valeurs (verrouillées) d'une liste d'opérations (paramètre :ids)."""
+    return _select_for_update_statement(check_columns("operations", columns))
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def _batch_update_statement(columns: Tuple[str, ...], rows: int):
+    types = sql_types("operations")
+    rows_sql = []
+    for i in range(rows):
+        cells = [f"CAST(:id_{i} AS BIGINT)"] + [
+            f"CAST(:v_{i}_{j} AS {types[c]})" for j, c in enumerate(columns)
+        ]
+        rows_sql.append(f"({', '.join(cells)})")
+    return text(f"""
+        UPDATE operations o
+        SET {', '.join([f"{quote(c)} = v.{quote(c)}" for c in columns] + ["version = o.version + 1"])}
+        FROM (VALUES {', '.join(rows_sql)}) AS v(operation_id, {', '.join(quote(c) for c in columns)}),
+             operations prev
+        WHERE o.operation_id = v.operation_id AND prev.operation_id = o.operation_id
+        RETURNING o.operation_id,
+                  {', '.join(f"o.{quote(c)} AS new_{c}, prev.{quote(c)} IS DISTINCT FROM o.{quote(c)} AS changed_{c}"
+                             for c in columns)}
+    """)
+
+def batch_update_statement(columns: Iterable[str], rows: int):
+    """
+    `UPDATE ... FROM (VALUES ...)` de `rows` opérations sur les mêmes colonnes.
+    Paramètres : :id_<i> et :v_<i>_<j> (j : rang de la colonne dans l'ordre trié).
+    Retourne operation_id, new_<col> et changed_<col> (ancienne valeur IS DISTINCT FROM
+    la nouvelle, comme operation_update_statement) pour chaque opération modifiée.
+    """
+    return _batch_update_statement(check_columns("operations", columns, writable=True), rows)
+
+def statement_cache_info() -> Dict[str, Dict[str, int]]:
+    """Succès/échecs des caches d'instructions."""
+    caches = {
+        "insert": _insert_statement,
+        "bulk_insert": _bulk_insert_statement,
+        "operation_update": _operation_update_statement,
+        "select_for_update": _select_for_update_statement,
+        "batch_update": _batch_update_statement,
+    }
+    return {name: cache.cache_info()._asdict() for name, cache in caches.items()}
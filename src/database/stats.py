@@ -0,0 +1,155 @@
+# src/database/stats.py
+"""
+Statistiques de volumétrie à coût constant.
+
+Le nombre de lignes de chaque table est tenu dans `table_row_counts` par des triggers
+de niveau instruction (tables de transition) : une insertion de N lignes ajoute N, une
+suppression retire N, quel que soit le chemin d'écriture (CRUD, chargement en masse,
+cascade). Si le compteur d'une table n'est pas installé, l'estimation du planificateur
+(`pg_class.reltuples`) est utilisée à la place.
+
+Le compteur d'une table est réparti sur ROW_COUNT_SLOTS lignes : chaque session écrit
+dans la ligne de son numéro de processus (`pg_backend_pid() % ROW_COUNT_SLOTS`) et la
+lecture en fait la somme. Des écritures concurrentes ne se bloquent donc pas sur une
+même ligne jusqu'à leur validation.
+"""
+
+import os
+from typing import Dict, Iterable
+
+from sqlalchemy import text
+
+from .cache import cached_query, count_tag
+from .connection import get_engine
+
+COUNTED_TABLES = ("operations", "flotteurs", "resultats_humain", "audit_log")
+ROW_COUNT_SLOTS = int(os.getenv("ROW_COUNT_SLOTS", "16"))
+
+ROW_COUNTS_SQL = f"""
+CREATE TABLE IF NOT EXISTS table_row_counts (
+    table_name TEXT NOT NULL,
+    slot SMALLINT NOT NULL DEFAULT 0,
+    row_count BIGINT NOT NULL,
+    PRIMARY KEY (table_name, slot)
+);
+
+CREATE OR REPLACE FUNCTION table_row_counts_add(counted TEXT, delta BIGINT) RETURNS void AS $$
+    INSERT INTO table_row_counts (table_name, slot, row_count)
+    VALUES (counted, pg_backend_pid() % {ROW_COUNT_SLOTS}, delta)
+    ON CONFLICT (table_name, slot) DO UPDATE SET row_count = table_row_counts.row_count + EXCLUDED.row_count;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION table_row_counts_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        UPDATE table_row_counts SET row_count = 0 WHERE table_name = TG_TABLE_NAME;
+    ELSIF TG_OP = 'INSERT' THEN
+        PERFORM table_row_counts_add(TG_TABLE_NAME, (SELECT count(*) FROM changed_rows));
+    ELSE
+        PERFORM table_row_counts_add(TG_TABLE_NAME, -(SELECT count(*) FROM changed_rows));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+def _upgrade_row_counts_table(conn):
+    """Ancienne table à un compteur par table : la ligne existante devient la case 0."""
+    has_slots = conn.execute(text("""
+        SELECT EXISTS (SELECT 1 FROM information_schema.columns
+                       WHERE table_name = 'table_row_counts' AND column_name = 'slot')
+    """)).scalar()
+    if not has_slots and conn.execute(text("SELECT to_regclass('table_row_counts') IS NOT NULL")).scalar():
+        conn.execute(text("""
+            ALTER TABLE table_row_counts ADD COLUMN slot SMALLINT NOT NULL DEFAULT 0;
+            ALTER TABLE table_row_counts DROP CONSTRAINT table_row_counts_pkey;
+            ALTER TABLE table_row_counts ADD PRIMARY KEY (table_name, slot);
+        """))
+
+def install_row_counters(conn=None, tables: Iterable[str] = COUNTED_TABLES):
+    """
+    Installe les triggers de comptage et initialise les compteurs par un COUNT(*) exact.
+
+    Les tables sont verrouillées en écriture le temps de l'initialisation pour que le
+    compteur de départ soit cohérent avec les triggers.
+    """
+    if conn is None:
+        with get_engine().begin() as conn:
+            return install_row_counters(conn, tables)
+
+    _upgrade_row_counts_table(conn)
+    conn.execute(text(ROW_COUNTS_SQL))
+    for table in tables:
+        conn.execute(text(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE"))
+        conn.execute(text(f"""
+            DROP TRIGGER IF EXISTS {table}_count_insert ON {table};
+            DROP TRIGGER IF EXISTS {table}_count_delete ON {table};
+            DROP TRIGGER IF EXISTS {table}_count_truncate ON {table};
+            CREATE TRIGGER {table}_count_insert AFTER INSERT ON {table}
+                REFERENCING NEW TABLE AS changed_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION table_row_counts_apply();
+            CREATE TRIGGER {table}_count_delete AFTER DELETE ON {table}
+                REFERENCING OLD TABLE AS changed_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION table_row_counts_apply();
+            CREATE TRIGGER {table}_count_truncate AFTER TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION table_row_counts_apply();
+        """))
+        conn.execute(text("DELETE FROM table_row_counts WHERE table_name = :table_name"), {"table_name": table})
+        conn.execute(text(f"""
+            INSERT INTO table_row_counts (table_name, slot, row_count)
+            SELECT :table_name, 0, count(*) FROM {table}
+        """), {"table_name": table})
+
+def adjust_row_count(conn, table: str, delta: int):
+    """
+    Corrige un compteur pour une modification que les triggers ne voient pas
+    (ex: partition détachée de audit_log).
+    """
+    if conn.execute(text("SELECT to_regclass('table_row_counts') IS NOT NULL")).scalar():
+        conn.execute(text("""
+            UPDATE table_row_counts SET row_count = row_count + :delta
+            WHERE table_name = :table_name AND slot = 0
+        """), {"table_name": table, "delta": delta})
+
+def _estimate_row_count(conn, table: str) -> int:
+    """Estimation du planificateur, partitions comprises (reltuples vaut -1 si jamais analysée)."""
+    return int(conn.execute(text("""
+        SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)
+        FROM pg_class c
+        WHERE c.oid = to_regclass(:table_name)
+           OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(:table_name))
+    """), {"table_name": table}).scalar())
+
+@cached_query(tags=lambda tables=COUNTED_TABLES: tuple(count_tag(t) for t in tables))
+def get_table_stats(tables: Iterable[str] = COUNTED_TABLES) -> Dict[str, Dict]:
+    """
+    Nombre de lignes par table, en temps constant.
+
+    Returns:
+        dict: {table: {"rows": int, "exact": bool}} ; exact=False quand la valeur est
+              l'estimation de pg_class faute de compteur installé
+    """
+    tables = tuple(tables)
+    with get_engine().connect() as conn:
+        has_counters = conn.execute(text("SELECT to_regclass('table_row_counts') IS NOT NULL")).scalar()
+        counters = {}
+        if has_counters:
+            counters = dict(conn.execute(
+                text("""
+                    SELECT table_name, SUM(row_count) FROM table_row_counts
+                    WHERE table_name = ANY(:tables) GROUP BY table_name
+                """),
+                {"tables": list(tables)}
+            ).fetchall())
+
+        stats = {}
+        for table in tables:
+            if table in counters:
+                stats[table] = {"rows": int(counters[table]), "exact": True}
+            else:
+                stats[table] = {"rows": _estimate_row_count(conn, table), "exact": False}
+    return stats
+
+def get_row_count(table: str) -> int:
+    """Nombre de lignes d'une table (compteur, sinon estimation)."""
+    return get_table_stats((table,))[table]["rows"]
@@ -0,0 +1,91 @@
+# src/database/tables.py
+"""
+Métadonnées SQLAlchemy des tables, conformes au DDL de init_db.py.
+
+Sert de référence unique des colonnes existantes (liste blanche pour les requêtes
+construites dynamiquement) et de leurs types.
+"""
+
+from sqlalchemy import (
+    BigInteger, Boolean, Column, DateTime, Float, Integer, MetaData, Table, Text, text
+)
+
+metadata = MetaData()
+
+operations = Table(
+    "operations", metadata,
+    Column("operation_id", BigInteger, primary_key=True),
+    Column("date_heure_reception_alerte", DateTime(timezone=True)),
+    Column("date_heure_fin_operation", DateTime(timezone=True)),
+    Column("type_operation", Text),
+    Column("type_operation_saisi", Boolean),
+    Column("evenement", Text),
+    Column("categorie_evenement", Text),
+    Column("zone_responsabilite", Text),
+    Column("fuseau_horaire", Text),
+    Column("pourquoi_alerte", Text),
+    Column("pourquoi_alerte_saisi", Boolean),
+    Column("moyen_alerte", Text),
+    Column("qui_alerte", Text),
+    Column("categorie_qui_alerte", Text),
+    Column("cross_name", Text),
+    Column("departement", Text),
+    Column("prefecture_maritime", Text),
+    Column("est_metropolitain", Boolean),
+    Column("vent_force", Float),
+    Column("mer_force", Float),
+    Column("vent_direction", Float),
+    Column("vent_direction_categorie", Text),
+    Column("longitude", Float),
+    Column("latitude", Float),
+    Column("autorite", Text),
+    Column("numero_sitrep", Integer),
+    Column("cross_sitrep", Text),
+    Column("systeme_source", Text),
+    Column("phase_journee", Text),
+    Column("sans_flotteur_implique", Boolean),
+    Column("total_flotteurs_impliques", Integer),
+    Column("maree_categorie", Text),
+    Column("maree_port", Text),
+    Column("maree_coefficient", Float),
+    Column("distance_cote_metres", Float),
+    Column("distance_cote_milles_nautiques", Float),
+    Column("est_vacances_scolaires", Boolean),
+    Column("donnees_meteo_imputees", Boolean),
+    Column("version", Integer, nullable=False, server_default=text("1")),
+)
+
+flotteurs = Table(
+    "flotteurs", metadata,
+    Column("operation_id", BigInteger),
+    Column("numero_ordre", Float),
+    Column("pavillon", Text),
+    Column("resultat_flotteur", Text),
+    Column("type_flotteur", Text),
+    Column("categorie_flotteur", Text),
+    Column("numero_immatriculation", Text),
+)
+
+resultats_humain = Table(
+    "resultats_humain", metadata,
+    Column("operation_id", BigInteger),
+    Column("categorie_personne", Text),
+    Column("resultat_humain", Text),
+    Column("nombre", Integer),
+    Column("dont_nombre_blesse", Integer),
+)
+
+audit_log = Table(
+    "audit_log", metadata,
+    Column("id", BigInteger, primary_key=True, autoincrement=True),
+    Column("table_name", Text, nullable=False),
+    Column("operation", Text, nullable=False),
+    Column("changed_by", Text, nullable=False),
+    Column("operation_id", BigInteger),
+    Column("column_name", Text),
+    Column("old_value", Text),
+    Column("new_value", Text),
+    Column("timestamp", DateTime, primary_key=True, server_default=text("CURRENT_TIMESTAMP")),
+)
+
+TABLES = {table.name: table for table in (operations, flotteurs, resultats_humain, audit_log)}
@@ -3,7 +3,13 @@
 Test manuel de la fonction update_operation.
 """
 
-from update import update_operation
+import os
+import sys
+
+# Ajoute src au path pour importer le package database quand lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.update import update_operation
 
 if __name__ == "__main__":
     # ID d'une opération existante (prends-en une dans ton jeu de données)
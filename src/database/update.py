@@ -3,92 +3,357 @@
 Fonctions pour mettre à jour les opérations et journaliser les changements.
 """
 
-import os
-from sqlalchemy import create_engine, text
-from dotenv import load_dotenv
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-load_dotenv()
+from sqlalchemy import text
 
-DB_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-engine = create_engine(DB_URL, pool_pre_ping=True)
+from .aggregates import OPERATIONS_KEY_COLUMNS, apply_operation_update, apply_operations, apply_rows
+from .audit_partitions import ensure_current_partitions
+from .audit_triggers import audit_triggers_installed, begin_trigger_audit
+from .audit_writer import audit_writer_enabled, get_audit_writer
+from .cache import invalidate_operation_write
+from .connection import get_engine
+from .query import build_where
+from .statements import (
+    batch_update_statement, bulk_insert_statement, check_columns, insert_statement,
+    operation_update_statement, select_for_update_statement
+)
+from .tables import audit_log
 
-def update_operation(operation_id: int, updates: dict, changed_by: str = "operator"):
+# Nombre d'opérations par requête dans les traitements par lot
+BATCH_SIZE = 1000
+
+class VersionConflictError(Exception):
+    """L'opération a été modifiée par quelqu'un d'autre depuis sa lecture (verrou optimiste)."""
+
+    def __init__(self, operation_id: int, expected_version: int, current_version: int):
+        self.operation_id = operation_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+        super().__init__(
+            f"Opération {operation_id} modifiée entre-temps "
+            f"(version attendue {expected_version}, version actuelle {current_version})"
+        )
+
+def _audit_str(value):
+    return str(value) if value is not None else None
+
+def _audit_row(operation: str, changed_by: str, operation_id: int, column_name: str = None,
+               old_value=None, new_value=None) -> dict:
+    return {
+        "table_name": "operations",
+        "operation": operation,
+        "changed_by": changed_by,
+        "operation_id": operation_id,
+        "column_name": column_name,
+        "old_value": _audit_str(old_value),
+        "new_value": _audit_str(new_value),
+    }
+
+def _write_audit(conn, rows: list, deferred: list = None):
+    """
+    Journalise dans la transaction en cours, ou réserve les lignes pour l'écrivain
+    asynchrone (`deferred`, soumis par `_submit_deferred` après validation).
+    """
+    if deferred is not None:
+        deferred.extend(rows)
+    elif rows:
+        conn.execute(audit_log.insert().values(rows))
+
+def _submit_deferred(deferred: list = None):
+    """
+    Soumet les lignes d'audit réservées à l'écrivain asynchrone. Appelé une fois
+    l'écriture validée : un échec est signalé mais ne l'annule pas.
+    """
+    if not deferred:
+        return
+    try:
+        get_audit_writer().submit(deferred)
+    except Exception as e:
+        print(f"[WARN] Écriture validée, mais {len(deferred)} ligne(s) d'audit non soumise(s) : {e}")
+
+def _write_context():
+    """
+    Préparatifs communs aux écritures : partitions d'audit du mois, mode de
+    journalisation, et lignes réservées à l'écrivain asynchrone (None : INSERT dans
+    la transaction).
+
+    Returns:
+        deferred (liste, ou None)
+    """
+    ensure_current_partitions()
+    audit_triggers_installed()  # mode mémorisé avant la transaction (au plus une requête par AUDIT_MODE_TTL)
+    return [] if audit_writer_enabled() else None
+
+def _audit_by_trigger(conn, changed_by: str) -> bool:
+    """
+    True si les triggers d'audit journalisent la transaction en cours (l'auteur leur
+    est alors transmis), False si l'écriture est journalisée depuis Python.
+    Sans triggers installés, aucune requête supplémentaire.
+    """
+    return audit_triggers_installed() and begin_trigger_audit(conn, changed_by)
+
+# === Corps transactionnels (partagés avec database.async_api via run_sync) ===
+
+def _update_operation_tx(conn, operation_id: int, updates: dict, changed_by: str,
+                         expected_version, deferred):
+    columns = list(updates.keys())
+    update_query = operation_update_statement(columns, returned=OPERATIONS_KEY_COLUMNS,
+                                              version_check=expected_version is not None)
+    params = {**updates, "operation_id": operation_id, "expected_version": expected_version}
+
+    audit_by_trigger = _audit_by_trigger(conn, changed_by)
+
+    # 1. Verrouiller, mettre à jour et récupérer anciennes/nouvelles valeurs
+    result = conn.execute(update_query, params).fetchone()
+    if result is None:
+        print(f"Aucune opération trouvée avec operation_id = {operation_id}")
+        raise ValueError(f"Aucune opération trouvée avec operation_id = {operation_id}")
+    row = result._mapping
+    if row["new_version"] is None:
+        raise VersionConflictError(operation_id, expected_version, row["old_version"])
+    old_values = {c: row[f"old_{c}"] for c in set(columns) | OPERATIONS_KEY_COLUMNS}
+    print(f"Version {row['old_version']} -> {row['new_version']}")
+
+    # Agrégats : l'opération change de groupe si une clé de regroupement est modifiée
+    apply_operation_update(conn, old_values, updates)
+
+    # 2. Journaliser chaque colonne réellement modifiée
+    # (sauf si les triggers d'audit s'en chargent)
+    audit_rows = []
+    for column in columns:
+        if row[f"changed_{column}"] and not audit_by_trigger:
+            audit_row = _audit_row("UPDATE", changed_by, operation_id, column,
+                                   row[f"old_{column}"], row[f"new_{column}"])
+            print(f"Logging changement: {column} de '{audit_row['old_value']}' à '{audit_row['new_value']}'")
+            audit_rows.append(audit_row)
+    _write_audit(conn, audit_rows, deferred)
+
+def _update_operations_tx(conn, pending: Dict[int, dict], changed_by: str, outcomes: Dict[int, str],
+                          deferred):
+    columns = set().union(*pending.values())
+    select_query = select_for_update_statement(columns | OPERATIONS_KEY_COLUMNS)
+    ids = sorted(pending)
+
+    audit_by_trigger = _audit_by_trigger(conn, changed_by)
+    for start in range(0, len(ids), BATCH_SIZE):
+        chunk = ids[start:start + BATCH_SIZE]
+
+        # 1. Anciennes valeurs de toutes les opérations de la tranche
+        old_rows = {
+            row.operation_id: dict(row._mapping)
+            for row in conn.execute(select_query, {"ids": chunk})
+        }
+        for op_id in chunk:
+            if op_id not in old_rows:
+                outcomes[op_id] = "not_found"
+        found = [op_id for op_id in chunk if op_id in old_rows]
+
+        # 2. Un UPDATE par jeu de colonnes modifiées ; garde les colonnes réellement changées
+        groups = {}
+        for op_id in found:
+            groups.setdefault(tuple(sorted(pending[op_id])), []).append(op_id)
+        changes = []
+        for group_columns, group_ids in groups.items():
+            params = {}
+            for i, op_id in enumerate(group_ids):
+                params[f"id_{i}"] = op_id
+                for j, column in enumerate(group_columns):
+                    params[f"v_{i}_{j}"] = pending[op_id][column]
+            for row in conn.execute(batch_update_statement(group_columns, len(group_ids)), params):
+                row = row._mapping
+                changes.extend((row["operation_id"], column, row[f"new_{column}"])
+                               for column in group_columns if row[f"changed_{column}"])
+
+        # Agrégats : déplacer les opérations dont une clé de regroupement change
+        moved = [op_id for op_id in found if OPERATIONS_KEY_COLUMNS & set(pending[op_id])]
+        apply_rows(conn, "agg_operations_mensuelles", [old_rows[i] for i in moved], -1)
+        apply_rows(conn, "agg_operations_mensuelles",
+                   [{**old_rows[i], **pending[i]} for i in moved], +1)
+
+        # 3. Journal : un seul INSERT multi-lignes (ou aucun avec les triggers d'audit)
+        audit_rows = [] if audit_by_trigger else [
+            _audit_row("UPDATE", changed_by, op_id, column, old_rows[op_id].get(column), new_value)
+            for op_id, column, new_value in sorted(changes, key=lambda change: change[0])
+        ]
+        _write_audit(conn, audit_rows, deferred)
+
+        for op_id in found:
+            outcomes[op_id] = "updated"
+
+def _delete_operation_tx(conn, operation_id: int, changed_by: str, deferred):
+    audit_by_trigger = _audit_by_trigger(conn, changed_by)
+
+    # Agrégats : retirer l'opération et ses lignes filles avant la cascade
+    apply_operations(conn, [operation_id], -1)
+
+    # 1. Supprimer l'opération
+    result = conn.execute(text("DELETE FROM operations WHERE operation_id = :operation_id"),
+                          {"operation_id": operation_id})
+    if result.rowcount == 0:
+        raise ValueError(f"Aucune opération trouvée avec operation_id = {operation_id}")
+
+    # 2. Journaliser
+    if not audit_by_trigger:
+        _write_audit(conn, [_audit_row("DELETE", changed_by, operation_id)], deferred)
+
+def _insert_operation_tx(conn, operation_data: dict, changed_by: str, deferred):
+    audit_by_trigger = _audit_by_trigger(conn, changed_by)
+
+    # 1. Insérer l'opération (instruction mémorisée par jeu de colonnes)
+    conn.execute(insert_statement("operations", operation_data.keys()), operation_data)
+    apply_rows(conn, "agg_operations_mensuelles", [operation_data], +1)
+
+    # 2. Journaliser
+    if not audit_by_trigger:
+        _write_audit(conn, [_audit_row("INSERT", changed_by, operation_data["operation_id"])], deferred)
+
+def _delete_operations_tx(conn, where: str, params: dict, after: int, chunk_size: int,
+                          changed_by: str, deferred):
+    """Supprime la tranche suivante (operation_id > after) ; retourne (ids, flotteurs, resultats_humain)."""
+    audit_by_trigger = _audit_by_trigger(conn, changed_by)
+
+    # 1. Verrouiller la tranche, parcourue dans l'ordre des IDs (pagination par clé)
+    ids = list(conn.execute(text(f"""
+        SELECT o.operation_id FROM operations o
+        WHERE {where} AND o.operation_id > :after
+        ORDER BY o.operation_id
+        LIMIT :chunk_size
+        FOR UPDATE
+    """), {**params, "after": after, "chunk_size": chunk_size}).scalars())
+    if not ids:
+        return [], 0, 0
+
+    # Agrégats : retirer les opérations et leurs lignes filles avant suppression
+    apply_operations(conn, ids, -1)
+
+    # 2. Supprimer lignes filles et opérations en une instruction, en comptant chaque table
+    result = conn.execute(text("""
+        WITH f AS (DELETE FROM flotteurs WHERE operation_id = ANY(:ids) RETURNING 1),
+             r AS (DELETE FROM resultats_humain WHERE operation_id = ANY(:ids) RETURNING 1),
+             o AS (DELETE FROM operations WHERE operation_id = ANY(:ids) RETURNING operation_id)
+        SELECT (SELECT COUNT(*) FROM f), (SELECT COUNT(*) FROM r), ARRAY(SELECT operation_id FROM o)
+    """), {"ids": ids}).fetchone()
+    deleted = sorted(result[2])
+
+    # 3. Journal : un seul INSERT multi-lignes (ou aucun avec les triggers d'audit)
+    if not audit_by_trigger:
+        _write_audit(conn, [_audit_row("DELETE", changed_by, op_id) for op_id in deleted], deferred)
+    return deleted, int(result[0]), int(result[1])
+
+def _insert_operations_tx(conn, rows: List[dict], changed_by: str, deferred) -> List[int]:
+    """Insère un lot (IDs distincts) ; retourne les IDs réellement insérés (absents de la base)."""
+    audit_by_trigger = _audit_by_trigger(conn, changed_by)
+
+    # 1. Un INSERT multi-lignes par jeu de colonnes
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    inserted = []
+    for columns, group in groups.items():
+        inserted.extend(conn.execute(bulk_insert_statement("operations", columns), group).scalars())
+
+    inserted_ids = set(inserted)
+    apply_rows(conn, "agg_operations_mensuelles", [row for row in rows if row["operation_id"] in inserted_ids], +1)
+
+    # 2. Journal : un seul INSERT multi-lignes (ou aucun avec les triggers d'audit)
+    if not audit_by_trigger:
+        _write_audit(conn, [_audit_row("INSERT", changed_by, op_id) for op_id in inserted], deferred)
+    return inserted
+
+def _prepare_batch(updates: Dict[int, dict]):
+    """Sépare les opérations sans modification et vérifie les colonnes du lot."""
+    updates = {int(op_id): dict(values) for op_id, values in updates.items()}
+    outcomes = {op_id: "unchanged" for op_id, values in updates.items() if not values}
+    pending = {op_id: values for op_id, values in updates.items() if values}
+    if pending:
+        check_columns("operations", set().union(*pending.values()), writable=True)
+    return outcomes, pending
+
+# === API publique ===
+
+def update_operation(operation_id: int, updates: dict, changed_by: str = "operator",
+                     expected_version: int = None):
     """
     Met à jour une opération et logue chaque changement détaillé.
 
+    Une seule requête verrouille la ligne, la met à jour et retourne les anciennes et
+    nouvelles valeurs des seules colonnes modifiées ; la colonne `version` est incrémentée.
+
     Args:
         operation_id: ID de l'opération à modifier
         updates: dict {colonne: nouvelle_valeur}
         changed_by: utilisateur ayant fait la modification
+        expected_version: version lue par l'appelant ; si elle ne correspond plus,
+                          rien n'est modifié et VersionConflictError est levée
 
     Returns:
         bool: True si succès, False sinon
+
+    Raises:
+        UnknownColumnError: colonne absente de la table operations
+        VersionConflictError: l'opération a changé depuis `expected_version`
     """
     if not updates:
         return True  # rien à faire
 
-    # Construire la clause SET dynamiquement
-    reserved_keywords = {"cross"}
-    set_clause = ", ".join([
-        f'"{key}" = :{key}' if key in reserved_keywords else f"{key} = :{key}"
-        for key in updates.keys()
-    ])
-    updates["operation_id"] = operation_id
-
-    update_query = text(f"""
-        UPDATE operations
-        SET {set_clause}
-        WHERE operation_id = :operation_id
-    """)
-
-    select_query = text("SELECT * FROM operations WHERE operation_id = :operation_id")
-    log_query = text("""
-        INSERT INTO audit_log (table_name, operation, changed_by, operation_id, column_name, old_value, new_value)
-        VALUES ('operations', 'UPDATE', :changed_by, :operation_id, :column_name, :old_value, :new_value)
-    """)
+    # Colonnes inconnues ou non modifiables refusées avant tout accès à la base
+    check_columns("operations", updates.keys(), writable=True)
 
     try:
         print(f"Début de mise à jour pour operation_id={operation_id}, updates={updates}")
-        with engine.connect() as conn:
+        deferred = _write_context()
+        with get_engine().connect() as conn:
             with conn.begin():
-                # 1. Récupérer les anciennes valeurs
-                result = conn.execute(select_query, {"operation_id": operation_id}).fetchone()
-                if result is None:
-                    print(f"Aucune opération trouvée avec operation_id = {operation_id}")
-                    raise ValueError(f"Aucune opération trouvée avec operation_id = {operation_id}")
-                old_values = dict(result._mapping)
-                print(f"Anciennes valeurs récupérées: {old_values}")
-
-                # 2. Mettre à jour l'opération
-                print(f"Exécution de la requête UPDATE: {update_query}")
-                result = conn.execute(update_query, updates)
-                print(f"Résultat UPDATE: rowcount={result.rowcount}")
-                if result.rowcount == 0:
-                    raise ValueError(f"Aucune opération trouvée avec operation_id = {operation_id}")
-
-                # 3. Journaliser chaque changement
-                for column, new_value in updates.items():
-                    if column != "operation_id":  # Ne pas logger operation_id
-                        old_value = old_values.get(column)
-                        # Convertir en string pour le stockage
-                        old_str = str(old_value) if old_value is not None else None
-                        new_str = str(new_value) if new_value is not None else None
-
-                        print(f"Logging changement: {column} de '{old_str}' à '{new_str}'")
-                        conn.execute(log_query, {
-                            "changed_by": changed_by,
-                            "operation_id": operation_id,
-                            "column_name": column,
-                            "old_value": old_str,
-                            "new_value": new_str
-                        })
+                _update_operation_tx(conn, operation_id, updates, changed_by, expected_version,
+                                     deferred)
+        invalidate_operation_write(operation_id, cardinality_changed=False)
         print("Mise à jour réussie")
-        return True
+    except VersionConflictError as e:
+        print(f"Conflit de version : {e}")
+        raise
     except Exception as e:
         print(f"Erreur lors de la mise à jour : {e}")
         import traceback
         traceback.print_exc()
         return False
+    _submit_deferred(deferred)
+    return True
+
+def update_operations(updates: Dict[int, dict], changed_by: str = "operator") -> Dict[int, str]:
+    """
+    Met à jour un lot d'opérations en quelques requêtes et logue chaque changement.
+
+    Par tranche de BATCH_SIZE opérations : un SELECT des anciennes valeurs (colonnes
+    modifiées uniquement, `= ANY(:ids)`), un `UPDATE ... FROM (VALUES ...)` par jeu de
+    colonnes et un INSERT multi-lignes dans audit_log. Le tout dans une seule transaction.
+
+    Args:
+        updates: dict {operation_id: {colonne: nouvelle_valeur}}
+        changed_by: utilisateur ayant fait la modification
+
+    Returns:
+        dict: {operation_id: "updated" | "unchanged" | "not_found" | "failed"}
+              ("unchanged" : aucune colonne à modifier ; "failed" : transaction annulée)
+    """
+    outcomes, pending = _prepare_batch(updates)
+    if not pending:
+        return outcomes
+
+    try:
+        deferred = _write_context()
+        with get_engine().connect() as conn:
+            with conn.begin():
+                _update_operations_tx(conn, pending, changed_by, outcomes, deferred)
+    except Exception as e:
+        print(f"Erreur lors de la mise à jour par lot : {e}")
+        return {**outcomes, **{op_id: "failed" for op_id in pending}}
+
+    invalidate_operation_write([op_id for op_id, outcome in outcomes.items() if outcome == "updated"],
+                               cardinality_changed=False)
+    print(f"Mise à jour par lot : {sum(o == 'updated' for o in outcomes.values())}/{len(outcomes)} opérations modifiées")
+    _submit_deferred(deferred)
+    return outcomes
 
 def delete_operation(operation_id: int, changed_by: str = "operator"):
     """
@@ -101,30 +366,84 @@ def delete_operation(operation_id: int, changed_by: str = "operator"):
     Returns:
         bool: True si succès, False sinon
     """
-    delete_query = text("DELETE FROM operations WHERE operation_id = :operation_id")
-
-    log_query = text("""
-        INSERT INTO audit_log (table_name, operation, changed_by, operation_id)
-        VALUES ('operations', 'DELETE', :changed_by, :operation_id)
-    """)
-
     try:
-        with engine.connect() as conn:
+        deferred = _write_context()
+        with get_engine().connect() as conn:
             with conn.begin():
-                # 1. Supprimer l'opération
-                result = conn.execute(delete_query, {"operation_id": operation_id})
-                if result.rowcount == 0:
-                    raise ValueError(f"Aucune opération trouvée avec operation_id = {operation_id}")
-
-                # 2. Journaliser
-                conn.execute(log_query, {
-                    "changed_by": changed_by,
-                    "operation_id": operation_id
-                })
-        return True
+                _delete_operation_tx(conn, operation_id, changed_by, deferred)
+        invalidate_operation_write(operation_id, cardinality_changed=True)
     except Exception as e:
         print(f"Erreur lors de la suppression : {e}")
         return False
+    _submit_deferred(deferred)
+    return True
+
+def delete_operations(operation_ids: Optional[Iterable[int]] = None,
+                      id_range: Optional[Tuple[int, int]] = None,
+                      filters: Optional[Dict[str, Any]] = None,
+                      changed_by: str = "operator",
+                      chunk_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Supprime en masse les opérations d'une liste d'IDs, d'un intervalle ou d'un filtre.
+
+    Les critères fournis se cumulent (ET). Les opérations sont supprimées par tranches
+    de `chunk_size`, une transaction par tranche (verrous courts) : un `DELETE` ensembliste
+    des opérations et de leurs lignes filles, et un INSERT multi-lignes dans audit_log.
+    Une erreur interrompt la purge ; les tranches déjà validées restent supprimées.
+
+    Args:
+        operation_ids: IDs à supprimer
+        id_range: (id_min, id_max), bornes incluses
+        filters: filtres de database.query (date_debut, cross_name, ...)
+        changed_by: utilisateur ayant fait la suppression
+        chunk_size: opérations par transaction
+
+    Returns:
+        dict: operations, flotteurs, resultats_humain (lignes supprimées), chunks,
+              operation_ids (IDs supprimés), error (message ou None)
+    """
+    report = {"operations": 0, "flotteurs": 0, "resultats_humain": 0, "chunks": 0,
+              "operation_ids": [], "error": None}
+    filters = dict(filters or {})
+    if operation_ids is not None:
+        filters["operation_id"] = [int(i) for i in operation_ids]
+        if not filters["operation_id"]:
+            return report  # liste vide : rien à supprimer
+    if id_range is not None:
+        filters["id_min"], filters["id_max"] = id_range
+    where, params = build_where(filters)
+    if where == "TRUE":
+        raise ValueError("Suppression en masse sans critère refusée")
+
+    after = -2 ** 63
+    try:
+        deferred = _write_context()
+        while True:
+            with get_engine().connect() as conn:
+                with conn.begin():
+                    ids, flotteurs, resultats = _delete_operations_tx(
+                        conn, where, params, after, chunk_size, changed_by, deferred
+                    )
+            if not ids:
+                break
+            invalidate_operation_write(ids, cardinality_changed=True)
+
+            report["operations"] += len(ids)
+            report["flotteurs"] += flotteurs
+            report["resultats_humain"] += resultats
+            report["chunks"] += 1
+            report["operation_ids"].extend(ids)
+            after = ids[-1]
+            _submit_deferred(deferred)
+            if deferred is not None:
+                deferred.clear()
+    except Exception as e:
+        print(f"Erreur lors de la suppression en masse : {e}")
+        report["error"] = str(e)
+
+    print(f"Suppression en masse : {report['operations']} opérations, {report['flotteurs']} flotteurs, "
+          f"{report['resultats_humain']} résultats humains ({report['chunks']} tranches)")
+    return report
 
 def insert_operation(operation_data: dict, changed_by: str = "operator"):
     """
@@ -142,32 +461,84 @@ def insert_operation(operation_data: dict, changed_by: str = "operator"):
 
     operation_id = operation_data['operation_id']
 
-    # Construire la clause INSERT dynamiquement
-    columns = list(operation_data.keys())
-    values_placeholders = [f":{col}" for col in columns]
-
-    insert_query = text(f"""
-        INSERT INTO operations ({', '.join(columns)})
-        VALUES ({', '.join(values_placeholders)})
-    """)
-
-    log_query = text("""
-        INSERT INTO audit_log (table_name, operation, changed_by, operation_id)
-        VALUES ('operations', 'INSERT', :changed_by, :operation_id)
-    """)
+    # Colonnes inconnues refusées avant tout accès à la base
+    check_columns("operations", operation_data.keys())
 
     try:
-        with engine.connect() as conn:
+        deferred = _write_context()
+        with get_engine().connect() as conn:
             with conn.begin():
-                # 1. Insérer l'opération
-                conn.execute(insert_query, operation_data)
-
-                # 2. Journaliser
-                conn.execute(log_query, {
-                    "changed_by": changed_by,
-                    "operation_id": operation_id
-                })
-        return True
+                _insert_operation_tx(conn, operation_data, changed_by, deferred)
+        invalidate_operation_write(operation_id, cardinality_changed=True)
     except Exception as e:
         print(f"Erreur lors de l'insertion : {e}")
-        return False
\ No newline at end of file
+        return False
+    _submit_deferred(deferred)
+    return True
+
+def insert_operations(rows: Iterable[dict], changed_by: str = "operator",
+                      batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Insère un lot d'opérations et logue chaque insertion.
+
+    Par tranche de `batch_size` lignes, une transaction : INSERT multi-lignes
+    (`ON CONFLICT DO NOTHING`), mise à jour des agrégats et INSERT multi-lignes dans
+    audit_log. Une tranche en échec est annulée et comptée, les suivantes sont traitées.
+
+    Args:
+        rows: dicts {colonne: valeur} (operation_id requis ; valeurs absentes = défaut SQL)
+        changed_by: utilisateur ayant fait l'insertion
+        batch_size: lignes par transaction
+
+    Returns:
+        dict: inserted (nombre de lignes insérées), duplicates (IDs déjà en base ou
+              répétés dans le lot), failed (lignes des tranches en échec), errors
+    """
+    report = {"inserted": 0, "duplicates": [], "failed": 0, "errors": []}
+    seen = set()
+    unique_rows = []
+    for row in rows:
+        if "operation_id" not in row:
+            raise ValueError("operation_id est requis pour l'insertion")
+        op_id = int(row["operation_id"])
+        if op_id in seen:
+            report["duplicates"].append(op_id)
+            continue
+        seen.add(op_id)
+        unique_rows.append({**row, "operation_id": op_id})
+    if not unique_rows:
+        return report
+
+    # Colonnes inconnues refusées avant tout accès à la base
+    check_columns("operations", set().union(*unique_rows))
+
+    try:
+        deferred = _write_context()
+    except Exception as e:
+        print(f"Erreur lors de l'insertion par lot : {e}")
+        report["failed"] = len(unique_rows)
+        report["errors"].append(str(e))
+        return report
+    for start in range(0, len(unique_rows), batch_size):
+        batch = unique_rows[start:start + batch_size]
+        try:
+            with get_engine().connect() as conn:
+                with conn.begin():
+                    inserted = _insert_operations_tx(conn, batch, changed_by, deferred)
+        except Exception as e:
+            print(f"Erreur lors de l'insertion par lot : {e}")
+            report["failed"] += len(batch)
+            report["errors"].append(str(e))
+            if deferred is not None:
+                deferred.clear()
+            continue
+
+        invalidate_operation_write(inserted, cardinality_changed=True)
+        inserted_ids = set(inserted)
+        report["inserted"] += len(inserted)
+        report["duplicates"].extend(row["operation_id"] for row in batch if row["operation_id"] not in inserted_ids)
+        _submit_deferred(deferred)
+        if deferred is not None:
+            deferred.clear()
+
+    return report
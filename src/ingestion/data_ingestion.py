@@ -5,11 +5,17 @@ Ce module fournit des fonctions pour ingérer des données avec validation et qu
 des enregistrements invalides.
 """
 
+import time
 import pandas as pd
-from typing import Dict, Any, Tuple
-from database.update import insert_operation
+from typing import Dict, Any, Tuple, Callable, Iterable, Iterator, Optional
+from database.update import insert_operation, insert_operations
 from validation.validator import validator
 
+# Lignes par morceau en import en flux (mémoire bornée)
+CSV_CHUNK_SIZE = 5000
+# Erreurs de validation conservées dans le rapport d'un import en flux
+MAX_REPORTED_ERRORS = 100
+
 def ingest_operations_data(df: pd.DataFrame, source: str = "upload") -> Dict[str, Any]:
     """
     Ingère les données d'opérations avec validation et quarantaine.
@@ -34,6 +40,7 @@ def ingest_operations_data(df: pd.DataFrame, source: str = "upload") -> Dict[str
 
     try:
         # Valider les données avec validation lazy
+        df = conform_text_columns(df)
         valid_data, invalid_data, validation_report = validator.validate_operations(df, lazy=True)
 
         report["valid_rows"] = len(valid_data)
@@ -70,6 +77,122 @@ def ingest_operations_data(df: pd.DataFrame, source: str = "upload") -> Dict[str
 
     return report
 
+def _string_columns() -> list:
+    """Colonnes déclarées texte dans le schéma des opérations."""
+    # Import local : le schéma (pandera) n'est chargé qu'au premier import de fichier
+    from validation.schemas import OPERATIONS_SCHEMA
+
+    return [
+        name for name, column in OPERATIONS_SCHEMA.columns.items()
+        if pd.api.types.is_string_dtype(column.dtype.type)
+    ]
+
+def conform_text_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convertit en texte les dates typées (fichiers colonnaires) des colonnes que le
+    schéma déclare texte, au format ISO accepté par PostgreSQL.
+    """
+    for name in _string_columns():
+        if name in df.columns and pd.api.types.is_datetime64_any_dtype(df[name]):
+            fmt = "%Y-%m-%d %H:%M:%S%z" if getattr(df[name].dt, "tz", None) is not None else "%Y-%m-%d %H:%M:%S"
+            df[name] = df[name].dt.strftime(fmt).astype(object).where(df[name].notna(), None)
+    return df
+
+def read_csv_chunks(file, chunksize: int = CSV_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Lit un CSV d'opérations par morceaux de `chunksize` lignes.
+
+    Les colonnes texte du schéma sont lues comme texte : un morceau où une colonne est
+    entièrement vide garde ainsi le même type que les autres.
+    """
+    return pd.read_csv(file, chunksize=chunksize, dtype={name: str for name in _string_columns()})
+
+def _records(df: pd.DataFrame) -> list:
+    """Lignes d'un DataFrame en dicts de valeurs Python (NaN/NaT -> None)."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+def ingest_operations_stream(chunks: Iterable[pd.DataFrame], source: str = "upload",
+                             on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Ingère des opérations morceau par morceau : validation, quarantaine et insertion par lot.
+
+    Un seul morceau est en mémoire à la fois ; les lignes invalides de chaque morceau
+    sont mises en quarantaine dans leur propre fichier.
+
+    Args:
+        chunks: DataFrames successifs (ex. `read_csv_chunks(fichier)`)
+        source: Identifiant source pour les fichiers de quarantaine
+        on_chunk: appelé après chaque morceau avec le rapport cumulé (progression)
+
+    Returns:
+        Rapport d'ingestion (mêmes clés que ingest_operations_data, plus chunks,
+        duplicate_rows, quarantine_files, seconds et rows_per_second)
+    """
+    report = {
+        "source": source,
+        "total_rows": 0,
+        "valid_rows": 0,
+        "invalid_rows": 0,
+        "inserted_rows": 0,
+        "duplicate_rows": 0,
+        "chunks": 0,
+        "quarantine_file": None,
+        "quarantine_files": [],
+        "validation_report": {"total_errors": 0, "schema_errors": [], "dataframe_errors": []},
+        "errors": [],
+        "seconds": 0.0,
+        "rows_per_second": 0.0,
+    }
+    start = time.perf_counter()
+
+    try:
+        for chunk in chunks:
+            report["chunks"] += 1
+            report["total_rows"] += len(chunk)
+            chunk = conform_text_columns(chunk)
+
+            # Valider le morceau avec validation lazy
+            valid_data, invalid_data, validation_report = validator.validate_operations(chunk, lazy=True)
+            report["valid_rows"] += len(valid_data)
+            report["invalid_rows"] += len(invalid_data)
+            summary = report["validation_report"]
+            summary["total_errors"] += validation_report.get("total_errors", 0)
+            for key in ("schema_errors", "dataframe_errors"):
+                room = MAX_REPORTED_ERRORS - len(summary[key])
+                summary[key].extend(validation_report.get(key, [])[:max(room, 0)])
+
+            # Mettre en quarantaine les lignes invalides du morceau
+            if not invalid_data.empty:
+                quarantine_file = validator.quarantine_invalid_data(
+                    invalid_data, f"{source}_part{report['chunks']:04d}", validation_report
+                )
+                report["quarantine_files"].append(quarantine_file)
+                report["quarantine_file"] = report["quarantine_file"] or quarantine_file
+
+            # Insérer les lignes valides par lot
+            if not valid_data.empty:
+                insert_report = insert_operations(_records(valid_data), changed_by=f"system_{source}")
+                report["inserted_rows"] += insert_report["inserted"]
+                report["duplicate_rows"] += len(insert_report["duplicates"])
+                report["errors"].extend(
+                    f"Erreur lors de l'insertion du morceau {report['chunks']}: {error}"
+                    for error in insert_report["errors"]
+                )
+
+            report["seconds"] = time.perf_counter() - start
+            report["rows_per_second"] = report["total_rows"] / report["seconds"] if report["seconds"] else 0.0
+            if on_chunk is not None:
+                on_chunk(report)
+
+        report["status"] = "success"
+
+    except Exception as e:
+        report["status"] = "error"
+        report["errors"].append(f"Échec de l'ingestion (morceau {report['chunks']}): {str(e)}")
+
+    report["seconds"] = time.perf_counter() - start
+    return report
+
 def ingest_flotteurs_data(df: pd.DataFrame, source: str = "upload") -> Dict[str, Any]:
     """Ingère les données de flotteurs avec validation."""
     # Placeholder - à implémenter quand le CRUD flotteurs sera prêt
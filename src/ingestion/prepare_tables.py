@@ -1,7 +1,7 @@
 # src/ingestion/prepare_tables.py
 """
 Extract + Transform:
-- Charge les CSV bruts
+- Charge les fichiers bruts (Parquet, Feather, Arrow IPC ou CSV, voir readers.find_raw_input)
 - Nettoie, impute, calcule
 - Retourne des DataFrames prêts pour PostgreSQL
 """
@@ -9,6 +9,8 @@ Extract + Transform:
 import pandas as pd
 from pathlib import Path
 
+from .readers import read_raw
+
 DATA_DIR = Path(__file__).parent.parent.parent / "data" / "raw"
 
 # Mapping officiel CROSS → départements (d'après ton analyse)
@@ -57,30 +59,21 @@ def impute_departement(row):
     # Prendre le premier département comme convention
     return CROSS_TO_DEP[cross_val][0]
 
-def prepare_operations() -> pd.DataFrame:
-    # === EXTRACT ===
-    ops = pd.read_csv(DATA_DIR / "operations.csv",low_memory=False)
-    stats = pd.read_csv(DATA_DIR / "operations_stats.csv",low_memory=False)
-
-    # === TRANSFORM: dates ===
+def parse_dates(ops: pd.DataFrame) -> pd.DataFrame:
     date_cols = ["date_heure_reception_alerte", "date_heure_fin_operation"]
     for col in date_cols:
         if col in ops.columns:
             ops[col] = pd.to_datetime(ops[col], errors="coerce")
+    return ops
 
-    # === TRANSFORM: suppression colonnes inutiles ===
+def drop_unused_columns(ops: pd.DataFrame) -> pd.DataFrame:
     cols_to_drop_ops = ["seconde_autorite"]
     for col in cols_to_drop_ops:
         if col in ops.columns:
             ops = ops.drop(columns=[col])
+    return ops
 
-    cols_to_drop_stats = ["nom_dst", "nom_stm"]
-    for col in cols_to_drop_stats:
-        if col in stats.columns:
-            stats = stats.drop(columns=[col])
-
-    # === TRANSFORM: imputations operations ===
-    # Météo
+def impute_meteo(ops: pd.DataFrame) -> pd.DataFrame:
     median_vent = ops["vent_force"].median()
     median_mer = ops["mer_force"].median()
     ops["vent_force"] = ops["vent_force"].fillna(median_vent)
@@ -90,65 +83,72 @@ def prepare_operations() -> pd.DataFrame:
     ops["donnees_meteo_imputees"] = (
         ops["vent_force"].isna().astype(bool) | ops["mer_force"].isna().astype(bool)
     )
+    return ops
 
-    # Autorité & autres
+def impute_autorite_position(ops: pd.DataFrame) -> pd.DataFrame:
     ops["autorite"] = ops["autorite"].fillna("Non renseigné")
     ops["longitude"] = ops["longitude"].fillna(-1)
     ops["latitude"] = ops["latitude"].fillna(-1)
+    return ops
 
-    
-    # === IMPUTATION 1 : pourquoi_alerte + flag ===
-    ops["pourquoi_alerte_saisi"] = ops["pourquoi_alerte"].notna()
+def _impute_from_evenement(ops: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Impute `column` par son mode pour le même événement, sinon son mode global ; flag `<column>_saisi`."""
+    flag = f"{column}_saisi"
+    ops[flag] = ops[column].notna()
     if "evenement" in ops.columns:
         mode_map = (
-            ops.dropna(subset=["evenement", "pourquoi_alerte"])
-            .groupby("evenement")["pourquoi_alerte"]
+            ops.dropna(subset=["evenement", column])
+            .groupby("evenement")[column]
             .agg(lambda x: x.mode().iloc[0] if not x.mode().empty else None)
         )
         imputed_from_evenement = ops["evenement"].map(mode_map)
-        mask_to_impute = ops["pourquoi_alerte"].isna() & imputed_from_evenement.notna()
-        ops.loc[mask_to_impute, "pourquoi_alerte"] = imputed_from_evenement[mask_to_impute]
-        ops.loc[mask_to_impute, "pourquoi_alerte_saisi"] = False
+        mask_to_impute = ops[column].isna() & imputed_from_evenement.notna()
+        ops.loc[mask_to_impute, column] = imputed_from_evenement[mask_to_impute]
+        ops.loc[mask_to_impute, flag] = False
 
-    if ops["pourquoi_alerte"].isna().any():
-        global_mode = ops["pourquoi_alerte"].mode()
+    if ops[column].isna().any():
+        global_mode = ops[column].mode()
         if not global_mode.empty:
             final_fill = global_mode.iloc[0]
-            mask_final = ops["pourquoi_alerte"].isna()
-            ops.loc[mask_final, "pourquoi_alerte"] = final_fill
-            ops.loc[mask_final, "pourquoi_alerte_saisi"] = False
+            mask_final = ops[column].isna()
+            ops.loc[mask_final, column] = final_fill
+            ops.loc[mask_final, flag] = False
+    return ops
 
-    # === IMPUTATION 2 : type_operation + flag ===
-    ops["type_operation_saisi"] = ops["type_operation"].notna()
-    if "evenement" in ops.columns:
-        mode_map = (
-            ops.dropna(subset=["evenement", "type_operation"])
-            .groupby("evenement")["type_operation"]
-            .agg(lambda x: x.mode().iloc[0] if not x.mode().empty else None)
-        )
-        imputed_from_evenement = ops["evenement"].map(mode_map)
-        mask_to_impute = ops["type_operation"].isna() & imputed_from_evenement.notna()
-        ops.loc[mask_to_impute, "type_operation"] = imputed_from_evenement[mask_to_impute]
-        ops.loc[mask_to_impute, "type_operation_saisi"] = False
-
-    if ops["type_operation"].isna().any():
-        global_mode = ops["type_operation"].mode()
-        if not global_mode.empty:
-            final_fill = global_mode.iloc[0]
-            mask_final = ops["type_operation"].isna()
-            ops.loc[mask_final, "type_operation"] = final_fill
-            ops.loc[mask_final, "type_operation_saisi"] = False
+def impute_pourquoi_alerte(ops: pd.DataFrame) -> pd.DataFrame:
+    return _impute_from_evenement(ops, "pourquoi_alerte")
 
+def impute_type_operation(ops: pd.DataFrame) -> pd.DataFrame:
+    return _impute_from_evenement(ops, "type_operation")
 
+def impute_departements(ops: pd.DataFrame) -> pd.DataFrame:
     # Département (avec ton mapping complet)
     ops["departement"] = ops.apply(impute_departement, axis=1)
+    return ops.rename(columns={"cross": "cross_name"})
 
-    ops = ops.rename(columns={"cross": "cross_name"})
-    
-    # === TRANSFORM: colonnes calculées ===
+def add_phase_journee(ops: pd.DataFrame) -> pd.DataFrame:
     ops["phase_journee"] = ops["date_heure_reception_alerte"].apply(get_phase_journee)
+    return ops
+
+# Transformations des opérations, dans l'ordre (chronométrées une à une par benchmarks/bench_etl.py)
+OPERATIONS_STEPS = [
+    ("dates", parse_dates),
+    ("colonnes_inutiles", drop_unused_columns),
+    ("meteo", impute_meteo),
+    ("autorite_position", impute_autorite_position),
+    ("pourquoi_alerte", impute_pourquoi_alerte),
+    ("type_operation", impute_type_operation),
+    ("departement", impute_departements),
+    ("phase_journee", add_phase_journee),
+]
+
+def prepare_stats(stats: pd.DataFrame) -> pd.DataFrame:
+    """Colonnes de operations_stats reprises dans operations, imputées."""
+    cols_to_drop_stats = ["nom_dst", "nom_stm"]
+    for col in cols_to_drop_stats:
+        if col in stats.columns:
+            stats = stats.drop(columns=[col])
 
-    # === TRANSFORM: enrichissement depuis stats ===
     flotteur_cols = [col for col in stats.columns if col.startswith("nombre_flotteurs_")]
     stats["total_flotteurs_impliques"] = stats[flotteur_cols].sum(axis=1)
 
@@ -173,14 +173,26 @@ def prepare_operations() -> pd.DataFrame:
     stats["distance_cote_metres"] = stats["distance_cote_metres"].fillna(-1)
     stats["distance_cote_milles_nautiques"] = stats["distance_cote_milles_nautiques"].fillna(-1)
     stats["est_vacances_scolaires"] = stats["est_vacances_scolaires"].astype('boolean').fillna(False).astype(bool)
-    # Fusion
-    df = ops.merge(stats_minimal, on="operation_id", how="left")
+    return stats_minimal
 
-    return df
+def merge_stats(ops: pd.DataFrame, stats_minimal: pd.DataFrame) -> pd.DataFrame:
+    return ops.merge(stats_minimal, on="operation_id", how="left")
+
+def prepare_operations(data_dir: Path = DATA_DIR) -> pd.DataFrame:
+    # === EXTRACT ===
+    ops = read_raw(data_dir, "operations", low_memory=False)
+    stats = read_raw(data_dir, "operations_stats", low_memory=False)
+
+    # === TRANSFORM: dates, colonnes inutiles, imputations, colonnes calculées ===
+    for _, step in OPERATIONS_STEPS:
+        ops = step(ops)
+
+    # === TRANSFORM: enrichissement depuis stats ===
+    return merge_stats(ops, prepare_stats(stats))
 
 
-def prepare_flotteurs() -> pd.DataFrame:
-    df = pd.read_csv(DATA_DIR / "flotteurs.csv")
+def prepare_flotteurs(data_dir: Path = DATA_DIR) -> pd.DataFrame:
+    df = read_raw(data_dir, "flotteurs")
     df["numero_immatriculation"] = df["numero_immatriculation"].fillna("Non renseigné")
     df["numero_ordre"] = df["numero_ordre"].fillna(-1)
     df["pavillon"] = df["pavillon"].fillna("Non renseigné")
@@ -190,8 +202,8 @@ def prepare_flotteurs() -> pd.DataFrame:
     return df
 
 
-def prepare_resultats_humain() -> pd.DataFrame:
-    df = pd.read_csv(DATA_DIR / "resultats_humain.csv")
+def prepare_resultats_humain(data_dir: Path = DATA_DIR) -> pd.DataFrame:
+    df = read_raw(data_dir, "resultats_humain")
     df["categorie_personne"] = df["categorie_personne"].fillna("Non renseigné")
     df["resultat_humain"] = df["resultat_humain"].fillna("Non renseigné")
     df["nombre"] = df["nombre"].fillna(0).astype(int)
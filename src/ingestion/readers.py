@@ -0,0 +1,166 @@
+# src/ingestion/readers.py
+"""
+Lecture des fichiers d'entrée : CSV, formats colonnaires (Parquet, Feather, Arrow IPC) et Excel.
+
+- Colonnaires : lus avec pyarrow puis convertis en pandas sans copie lorsque c'est
+  possible (fichiers mappés en mémoire, buffers des fichiers téléversés,
+  `to_pandas(split_blocks=True, self_destruct=True)`). Les colonnes arrivent typées :
+  pas de re-parsing de texte.
+- Excel : moteur `calamine` (paquet python-calamine, pandas >= 2.2) bien plus rapide
+  qu'openpyxl ; repli sur le moteur par défaut de pandas s'il est indisponible.
+
+Les sources sont des chemins ou des fichiers ouverts (ex. fichier téléversé Streamlit).
+"""
+
+import io
+import os
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import pandas as pd
+
+COLUMNAR_EXTENSIONS = ("parquet", "feather", "arrow", "ipc")
+EXCEL_EXTENSIONS = ("xlsx", "xls")
+UPLOAD_EXTENSIONS = ["csv", *COLUMNAR_EXTENSIONS, *EXCEL_EXTENSIONS]
+# Ordre de recherche des entrées brutes de prepare_tables (typé d'abord)
+RAW_EXTENSIONS = ("parquet", "feather", "arrow", "csv")
+
+Source = Union[str, os.PathLike, io.IOBase]
+
+def file_extension(name: Union[str, os.PathLike]) -> str:
+    """Extension en minuscules, sans le point (`operations.PARQUET` -> `parquet`)."""
+    return Path(str(name)).suffix.lower().lstrip(".")
+
+def _arrow_input(source: Source):
+    """Source pyarrow : fichier mappé en mémoire, ou buffer du fichier ouvert (sans copie si possible)."""
+    import pyarrow as pa
+
+    if isinstance(source, (str, os.PathLike)):
+        return pa.memory_map(str(source), "r")
+    if hasattr(source, "getbuffer"):
+        return pa.BufferReader(pa.py_buffer(source.getbuffer()))
+    return pa.BufferReader(source.read())
+
+def _ipc_reader(source: Source):
+    """Lecteur Arrow IPC, format fichier (Feather v2) ou flux."""
+    import pyarrow as pa
+
+    arrow_input = _arrow_input(source)
+    try:
+        return pa.ipc.open_file(arrow_input)
+    except pa.ArrowInvalid:
+        arrow_input.seek(0)
+        return pa.ipc.open_stream(arrow_input)
+
+def _to_pandas(table) -> pd.DataFrame:
+    # split_blocks : un bloc par colonne, sans consolidation (copie) ;
+    # self_destruct : la mémoire Arrow est libérée au fil de la conversion
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+def read_columnar(source: Source, fmt: str) -> pd.DataFrame:
+    """
+    Lit un fichier Parquet, Feather ou Arrow IPC en DataFrame.
+
+    Args:
+        source: chemin ou fichier ouvert
+        fmt: parquet, feather, arrow ou ipc
+    """
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(_arrow_input(source))
+    elif fmt == "feather":
+        import pyarrow.feather as feather
+        # Feather v1 n'est pas du format IPC : laissé à pyarrow.feather
+        table = feather.read_table(_arrow_input(source))
+    elif fmt in ("arrow", "ipc"):
+        table = _ipc_reader(source).read_all()
+    else:
+        raise ValueError(f"Format colonnaire inconnu : {fmt}")
+    return _to_pandas(table)
+
+def iter_columnar_chunks(source: Source, fmt: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Lit un fichier colonnaire par lots d'environ `chunksize` lignes (import en flux)."""
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(_arrow_input(source)).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas(split_blocks=True)
+        return
+    if fmt == "feather":
+        # Feather v2 est du format IPC ; v1 n'est lisible qu'en entier
+        try:
+            reader = _ipc_reader(source)
+        except Exception:
+            df = read_columnar(source, fmt)
+            for start in range(0, len(df), chunksize):
+                yield df.iloc[start:start + chunksize]
+            return
+    elif fmt in ("arrow", "ipc"):
+        reader = _ipc_reader(source)
+    else:
+        raise ValueError(f"Format colonnaire inconnu : {fmt}")
+
+    import pyarrow as pa
+    batches = (reader.get_batch(i) for i in range(reader.num_record_batches)) \
+        if isinstance(reader, pa.ipc.RecordBatchFileReader) else reader
+    for batch in batches:
+        for start in range(0, batch.num_rows, chunksize):
+            yield batch.slice(start, chunksize).to_pandas(split_blocks=True)
+
+def columnar_row_count(source: Source, fmt: str) -> Optional[int]:
+    """Nombre de lignes d'un fichier colonnaire, lu dans ses métadonnées (None si inconnu)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    try:
+        if fmt == "parquet":
+            return pq.ParquetFile(_arrow_input(source)).metadata.num_rows
+        reader = _ipc_reader(source)
+        if isinstance(reader, pa.ipc.RecordBatchFileReader):
+            return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    except Exception:
+        pass
+    return None
+
+def read_excel(source: Source, **kwargs) -> pd.DataFrame:
+    """Lit un classeur Excel avec calamine si disponible, sinon avec le moteur par défaut."""
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return pd.read_excel(source, **kwargs)
+    try:
+        return pd.read_excel(source, engine="calamine", **kwargs)
+    except ValueError:
+        # pandas < 2.2 : moteur calamine inconnu
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return pd.read_excel(source, **kwargs)
+
+def read_table_file(source: Source, name: Optional[str] = None, **csv_kwargs) -> pd.DataFrame:
+    """
+    Lit un fichier d'après son extension (CSV, Parquet, Feather, Arrow IPC, Excel).
+
+    Args:
+        source: chemin ou fichier ouvert
+        name: nom du fichier si `source` n'est pas un chemin (fichier téléversé)
+        csv_kwargs: options de pd.read_csv
+    """
+    fmt = file_extension(name or source)
+    if fmt in COLUMNAR_EXTENSIONS:
+        return read_columnar(source, fmt)
+    if fmt in EXCEL_EXTENSIONS:
+        return read_excel(source)
+    if fmt == "csv":
+        return pd.read_csv(source, **csv_kwargs)
+    raise ValueError(f"Format de fichier non supporté : {fmt}")
+
+def find_raw_input(data_dir: Path, stem: str) -> Path:
+    """Fichier brut `stem` dans `data_dir`, au premier format présent parmi RAW_EXTENSIONS."""
+    for fmt in RAW_EXTENSIONS:
+        path = Path(data_dir) / f"{stem}.{fmt}"
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"Aucun fichier {stem}.{{{','.join(RAW_EXTENSIONS)}}} dans {data_dir}")
+
+def read_raw(data_dir: Path, stem: str, **csv_kwargs) -> pd.DataFrame:
+    """Lit une entrée brute de prepare_tables, colonnaire de préférence (voir find_raw_input)."""
+    return read_table_file(find_raw_input(data_dir, stem), **csv_kwargs)
@@ -0,0 +1,590 @@
+# src/ingestion/synthetic_data.py
+"""
+Génération de données SEC MAR synthétiques (tests de charge, benchmarks).
+
+Produit les quatre entrées brutes lues par prepare_tables : operations.csv,
+operations_stats.csv, flotteurs.csv et resultats_humain.csv, avec leurs colonnes.
+- Répartitions reprises des extractions réelles : CROSS, événements (et leur
+  catégorie / type d'opération dominant), taux de valeurs manquantes, saisonnalité
+- Flotteurs et résultats humains rattachés à des opérations existantes ; les compteurs
+  de operations_stats (`nombre_flotteurs_*`, `nombre_personnes_*`) sont calculés à
+  partir de ces lignes
+- Reproductible : l'opération n du morceau k ne dépend que de (seed, k, taille des
+  morceaux), quel que soit le nombre de processus
+- Morceaux générés en parallèle (un fichier partiel par table et par morceau), puis
+  concaténés dans l'ordre
+
+    cd src
+    python -m ingestion.synthetic_data --operations 1000000 --workers 8 --output-dir ../data/synthetic
+"""
+
+import argparse
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_OUTPUT_DIR = Path(__file__).parent.parent.parent / "data" / "synthetic"
+DEFAULT_CHUNK_SIZE = 100_000
+TABLES = ("operations", "operations_stats", "flotteurs", "resultats_humain")
+
+# CROSS -> (poids, départements, fuseau horaire, préfecture maritime, (lat min, lat max, lon min, lon max))
+CROSS_PROFILES = {
+    "Étel": (94798, ["Morbihan", "Loire-Atlantique", "Vendée", "Finistère", "Charente-Maritime"],
+             "Europe/Paris", "atlantique", (46.0, 48.0, -5.0, -1.8)),
+    "La Garde": (91030, ["Var", "Bouches-du-Rhône", "Alpes-Maritimes", "Hérault", "Gard"],
+                 "Europe/Paris", "mediterranee", (42.5, 43.7, 3.0, 7.5)),
+    "Corsen": (43137, ["Finistère", "Côtes-d'Armor", "Ille-et-Vilaine", "Morbihan"],
+               "Europe/Paris", "atlantique", (47.5, 49.0, -6.0, -2.0)),
+    "Gris-Nez": (42069, ["Pas-de-Calais", "Nord", "Somme", "Seine-Maritime"],
+                 "Europe/Paris", "manche", (49.8, 51.3, 1.0, 2.6)),
+    "Jobourg": (31636, ["Manche", "Calvados", "Seine-Maritime", "Eure"],
+                "Europe/Paris", "manche", (48.6, 50.0, -2.5, 0.5)),
+    "Corse": (20380, ["Corse-du-Sud", "Haute-Corse"],
+              "Europe/Paris", "mediterranee", (41.3, 43.1, 8.3, 9.7)),
+    "Antilles-Guyane": (17704, ["Martinique", "Guadeloupe", "Collectivité de Saint Martin",
+                                "Collectivité de Saint Barthélémy", "Guyane"],
+                        "America/Martinique", None, (14.0, 18.2, -63.2, -60.8)),
+    "Martinique": (9764, ["Martinique"], "America/Martinique", None, (14.3, 14.9, -61.3, -60.8)),
+    "Soulac": (8678, ["Gironde", "Landes", "Charente-Maritime", "Pyrénées-Atlantiques"],
+               "Europe/Paris", "atlantique", (43.4, 46.0, -2.0, -1.0)),
+    "La Réunion": (8110, ["Réunion", "Mayotte"], "Indian/Reunion", None, (-21.4, -20.8, 55.2, 55.8)),
+    "Adge": (5104, ["Hérault", "Aude", "Pyrénées-Orientales", "Gard"],
+             "Europe/Paris", "mediterranee", (42.4, 43.5, 3.0, 4.5)),
+    "Guadeloupe": (3912, ["Guadeloupe"], "America/Guadeloupe", None, (15.8, 16.5, -61.8, -61.0)),
+    "Polynésie": (3021, ["Polynésie"], "Pacific/Tahiti", None, (-18.0, -16.5, -150.5, -149.0)),
+    "Nouvelle-Calédonie": (2440, ["Nouvelle-Calédonie"], "Pacific/Noumea", None, (-22.7, -20.0, 164.0, 167.5)),
+    "Guyane": (1652, ["Guyane"], "America/Cayenne", None, (4.5, 5.8, -54.0, -51.6)),
+    "Mayotte": (1526, ["Mayotte"], "Indian/Mayotte", None, (-13.1, -12.6, 45.0, 45.3)),
+    "Sud océan Indien": (821, ["La Réunion", "Mayotte"], "Indian/Reunion", None, (-50.0, -37.0, 50.0, 78.0)),
+}
+OVERSEAS_CROSS = ("Antilles-Guyane", "Martinique", "La Réunion", "Guadeloupe", "Polynésie",
+                  "Nouvelle-Calédonie", "Guyane", "Mayotte", "Sud océan Indien")
+
+# Événement -> (poids, catégorie d'événement, type d'opération le plus fréquent)
+EVENEMENTS = {
+    "Toutes fausses alertes": (61216, "Fausses alertes", "DIV"),
+    "Avarie du système de propulsion": (46179, "Avaries non suivies d'accident navire", "MAS"),
+    "Difficulté de manoeuvre": (44998, "Avaries non suivies d'accident navire", "SAR"),
+    "Autre événement": (35546, "Autres affaires nécessitant opération", "SAR"),
+    "Échouement": (21948, "Accidents de navire", "MAS"),
+    "Situation indéterminée": (13500, "Autres affaires nécessitant opération", "SAR"),
+    "Immobilisé dans engins / hélice engagée": (9973, "Avaries non suivies d'accident navire", "MAS"),
+    "Rupture de mouillage": (9936, "Avaries non suivies d'accident navire", "MAS"),
+    "Chavirement": (9060, "Accidents de navire", "SAR"),
+    "Voie d'eau": (8484, "Accidents de navire", "SAR"),
+    "Panne de carburant": (7800, "Avaries non suivies d'accident navire", "MAS"),
+    "Baignade": (7400, "Accidents individuels à personnes non embarquées", "SAR"),
+    "Homme à la mer": (6900, "Accidents individuels à personnes embarquées", "SAR"),
+    "Malade EvaSan": (6500, "Accidents individuels à personnes embarquées", "SAR"),
+    "Blessé EvaSan": (5800, "Accidents individuels à personnes embarquées", "SAR"),
+    "Incertitude sur la position": (5200, "Autres affaires nécessitant opération", "SAR"),
+    "Avarie électrique": (4700, "Avaries non suivies d'accident navire", "MAS"),
+    "Avarie de l'appareil à gouverner": (4300, "Avaries non suivies d'accident navire", "MAS"),
+    "Sans avarie en dérive": (4100, "Avaries non suivies d'accident navire", "MAS"),
+    "Malade avec soin sans déroutement": (3900, "Accidents individuels à personnes embarquées", "SAR"),
+    "Blessé avec soin sans déroutement": (3500, "Accidents individuels à personnes embarquées", "SAR"),
+    "Démâtage": (3100, "Avaries non suivies d'accident navire", "MAS"),
+    "Incendie": (2900, "Accidents de navire", "SAR"),
+    "Plongée avec bouteille": (2600, "Accidents individuels à personnes non embarquées", "SAR"),
+    "Sans avarie inexpérience": (2500, "Avaries non suivies d'accident navire", "MAS"),
+    "Chute falaise / Emporté par une lame": (2100, "Accidents individuels à personnes non embarquées", "SAR"),
+    "Isolement par la marée / Envasé": (2000, "Accidents individuels à personnes non embarquées", "SAR"),
+    "Abordage": (1800, "Accidents de navire", "SAR"),
+    "Heurt": (1700, "Accidents de navire", "MAS"),
+    "Découverte de corps": (1500, "Accidents individuels à personnes", "SAR"),
+    "Disparu en mer": (1300, "Accidents individuels à personnes", "SAR"),
+    "Chasse sous-marine": (1200, "Accidents individuels à personnes non embarquées", "SAR"),
+    "Plongée en apnée": (900, "Accidents individuels à personnes non embarquées", "SAR"),
+    "Encalminage": (800, "Avaries non suivies d'accident navire", "MAS"),
+    "Accident aéronautique": (500, "Accidents de navire", "SAR"),
+    "Immigration clandestine": (450, "Autres affaires nécessitant opération", "SAR"),
+    "Découverte d'explosif": (400, "Autres affaires nécessitant opération", "SUR"),
+    "Suicide": (350, "Accidents individuels à personnes", "SAR"),
+    "Acte de piraterie / terrorisme": (60, "Autres affaires nécessitant opération", "SUR"),
+}
+DIVING_EVENTS = ("Plongée avec bouteille", "Plongée en apnée", "Chasse sous-marine")
+TYPE_OPERATION_WEIGHTS = {"SAR": 102069, "MAS": 68521, "DIV": 37435, "SUR": 1316}
+
+POURQUOI_ALERTE_WEIGHTS = {
+    "Événement reconnu": 114817, "Inquiétude": 15574, "Signal pyrotechnique": 12453, "Balise 406": 11723,
+    "Autre": 7460, "Balise 121,5 - 243": 6297, "Signal radio-électrique": 2806, "IMMARSAT C": 2375,
+    "IMMARSAT": 1879, "Autre signal réglementaire": 800, "IMMARSAT A": 150,
+}
+MOYEN_ALERTE_WEIGHTS = {
+    "Téléphone à terre": 105613, "VHF": 54274, "VHF phonie": 49542, "Téléphone à la mer / GSM": 27237,
+    "Téléphone fixe": 25297, "Télex": 20500, "Téléphone mobile à terre": 19466, "Téléphonie mobile 196": 17640,
+    "Téléphone mobile": 17469, "Balise de détresse": 9248, "VHF ASN": 6000, "Autre moyen d'alerte": 5000,
+    "Téléphone à la mer / satellite": 3000, "Signal pyrotechnique": 2500, "MF/HF phonie": 1500, "Email": 800,
+    "Balise de détresse EPIRB": 700, "Balise de détresse PLB": 400, "SART": 100,
+}
+# Qui alerte -> (poids, catégorie)
+QUI_ALERTE = {
+    "Navire impliqué": (97827, "Navire à la mer"),
+    "CODIS / SDIS / CTA": (36081, "Autorité civile française à terre"),
+    "Sémaphore": (35335, "Autorité militaire française à terre"),
+    "Témoin": (29276, "Organisme ou personne privée"),
+    "Centre secours locaux (caserne pompier)": (19834, "Autorité civile française à terre"),
+    "Navire de plaisance": (18033, "Navire à la mer"),
+    "MCC SARSAT COSPAS 406": (15260, "Autorité civile française à terre"),
+    "CORG / Gendarmerie nationale": (11340, "Autorité militaire française à terre"),
+    "Famille / Proche": (10522, "Organisme ou personne privée"),
+    "CROSS / MRCC": (10410, "Autorité civile française à terre"),
+    "SNSM": (8000, "Organisme ou personne privée"),
+    "MRCC étranger": (7500, "Autorité étrangère"),
+    "Capitainerie": (3594, "Autorité maritime française à terre"),
+    "Aéronef": (1069, "Aéronef"),
+}
+AUTORITE_WEIGHTS = {
+    "Préfet maritime": 250000, "Maire": 70000, "Représentant du gouvernement": 30000,
+    "CROSS ou sous-CROSS": 12000, "MRCC étranger": 6000, "Autorité portuaire": 5000, "Autre": 4000,
+    "Affaires maritimes": 2000, "RCC - RSC français": 1500, "RCC - RSC étrangers": 1200,
+    "Autorité étrangère": 800, "SG-Mer": 100,
+}
+SECONDE_AUTORITE_WEIGHTS = {
+    "Autre": 5, "MRCC étranger": 3, "CROSS ou sous-CROSS": 3, "Préfet maritime": 2,
+    "RCC - RSC étrangers": 1, "Autorité portuaire": 1, "RCC - RSC français": 1, "Maire": 1,
+}
+ZONE_RESPONSABILITE_WEIGHTS = {
+    "Eaux territoriales": 150000, "Responsabilité française": 90000, "Plage et 300 mètres": 50000,
+    "Port et accès": 45000, "Responsabilité étrangère": 15000, "Terrestre": 6000,
+    "Plan eau salée": 3000, "Hors responsabilité": 2000,
+}
+WIND_SECTORS = np.array(["nord", "nord-est", "est", "sud-est", "sud", "sud-ouest", "ouest", "nord-ouest"],
+                        dtype=object)
+# Janvier ... décembre : pic estival des activités de loisir
+MONTH_WEIGHTS = np.array([4, 4, 5, 7, 9, 11, 16, 17, 9, 7, 6, 5], dtype=float)
+# 0 h ... 23 h : alertes surtout de jour
+HOUR_WEIGHTS = np.array([2, 1.5, 1.2, 1, 1, 1.2, 2, 3, 4, 5, 6, 6.5, 6, 6, 6.5, 7, 7, 6.5, 6, 5, 4, 3.5, 3, 2.5])
+MOIS_TEXTE = np.array(["Janvier", "Février", "Mars", "Avril", "Mai", "Juin", "Juillet", "Août",
+                       "Septembre", "Octobre", "Novembre", "Décembre"], dtype=object)
+JOURS_SEMAINE = np.array(["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"], dtype=object)
+# Jours fériés fixes (mois * 100 + jour)
+JOURS_FERIES = (101, 501, 508, 714, 815, 1101, 1111, 1225)
+
+STM_BY_CROSS = {"Gris-Nez": "stm-gris-nez", "Corsen": "stm-corsen", "Jobourg": "stm-jobourg"}
+DST_BY_CROSS = {"Gris-Nez": "dst-dover", "Jobourg": "dst-casquets", "Corsen": "dst-ouessant", "Corse": "dst-corse"}
+MAREE_PORTS = {
+    "manche": ["Boulogne-sur-Mer", "Calais", "Dunkerque", "Dieppe", "Le Havre", "Cherbourg", "Granville",
+               "Saint-Malo", "Ouistreham", "Le Touquet", "Fecamp", "Barfleur"],
+    "atlantique": ["Brest", "Roscoff", "Concarneau", "Port-Navalo", "Saint-Nazaire", "Les Sables-d'Olonne",
+                   "La Rochelle-Pallice", "Pointe de Grave", "Arcachon Eyrac", "Saint-Jean-de-Luz"],
+}
+MAREE_CATEGORIES = ("20-45", "46-70", "71-95", "96-120")
+
+# Type de flotteur -> (poids, catégorie, colonnes nombre_flotteurs_<...>_impliques propres au type)
+FLOTTEUR_TYPES = {
+    "Plaisance à moteur < 8m": (52000, "Plaisance", ("plaisance_a_moteur", "plaisance_a_moteur_moins_8m")),
+    "Plaisance à voile": (50000, "Plaisance", ("plaisance_a_voile",)),
+    "Pêche": (48000, "Pêche", ()),
+    "Plaisance à moteur > 8m": (21000, "Plaisance", ("plaisance_a_moteur", "plaisance_a_moteur_plus_8m")),
+    "Navire de charge ou de servitude": (14000, "Commerce", ()),
+    "Navire à passagers": (6000, "Commerce", ()),
+    "Kitesurf": (5200, "Loisir nautique", ("kitesurf",)),
+    "Planche à voile": (4800, "Loisir nautique", ("planche_a_voile",)),
+    "Canoë / Kayak / Aviron": (4500, "Loisir nautique", ("canoe_kayak_aviron",)),
+    "Véhicule nautique à moteur": (3200, "Loisir nautique", ("vehicule_nautique_a_moteur",)),
+    "Plaisance voile légère": (3000, "Plaisance", ("plaisance_voile_legere",)),
+    "Annexe": (2600, "Plaisance", ("annexe",)),
+    "Administration / Armée": (2500, "Autre", ()),
+    "Autre loisir nautique": (2200, "Loisir nautique", ("autre_loisir_nautique",)),
+    "Stand up paddle": (1800, "Loisir nautique", ("autre_loisir_nautique",)),
+    "Engin de plage": (1500, "Loisir nautique", ("engin_de_plage",)),
+    "Surf": (1400, "Loisir nautique", ("surf",)),
+    "Conchylicole / Aquacole": (1100, "Pêche", ()),
+    "Ski nautique": (400, "Loisir nautique", ("ski_nautique",)),
+    "Aéronef de tourisme": (350, "Aéronef", ()),
+    "Hélicoptère": (150, "Aéronef", ()),
+}
+FLOTTEUR_CATEGORY_COLUMNS = {
+    "Commerce": "commerce", "Pêche": "peche", "Plaisance": "plaisance",
+    "Loisir nautique": "loisirs_nautiques", "Aéronef": "aeronefs", "Autre": "autre",
+}
+FLOTTEUR_TYPE_COLUMNS = (
+    "annexe", "autre_loisir_nautique", "canoe_kayak_aviron", "engin_de_plage", "kitesurf",
+    "plaisance_voile_legere", "plaisance_a_moteur", "plaisance_a_moteur_moins_8m", "plaisance_a_moteur_plus_8m",
+    "plaisance_a_voile", "planche_a_voile", "ski_nautique", "surf", "vehicule_nautique_a_moteur",
+)
+RESULTAT_FLOTTEUR_WEIGHTS = {
+    "Remorqué": 124676, "Assisté": 56786, "Difficulté surmontée, reprise de route": 51935,
+    "Non assisté, cas de fausse alerte": 22000, "Retrouvé après recherche": 9000, "Échoué": 8000,
+    "Côte rejointe par ses propres moyens": 7000, "Perdu / Coulé": 6000, "Inconnu": 4000,
+    "A la dérive": 2500, "Au mouillage": 1500, "Déséchoué": 1200, "Renfloué": 300, "Volé": 100,
+}
+PAVILLON_WEIGHTS = {"Français": 218352, "Étranger": 75043}
+
+CATEGORIE_PERSONNE_WEIGHTS = {
+    "Plaisancier français": 120000, "Pêcheur français": 50000, "Pratiquant loisirs nautiques": 40000,
+    "Autre": 35000, "Marin étranger": 20000, "Commerce français": 12000, "Pêcheur amateur": 8000,
+    "Toutes catégories": 4000, "Migrant": 1000, "Clandestin": 500,
+}
+RESULTAT_HUMAIN_WEIGHTS = {
+    "Personne tirée d'affaire seule": 90000, "Personne assistée": 80000, "Personne secourue": 50000,
+    "Personne retrouvée": 12000, "Personne décédée accidentellement": 3000, "Personne disparue": 1500,
+    "Personne décédée naturellement": 800, "Personne décédée": 700, "Inconnu": 500,
+}
+FAUSSE_ALERTE = "Personne impliquée dans fausse alerte"
+# Colonne nombre_personnes_<...> -> résultats humains comptés
+PERSONNES_COLUMNS = {
+    "assistees": ("Personne assistée",),
+    "decedees": ("Personne décédée",),
+    "decedees_accidentellement": ("Personne décédée accidentellement",),
+    "decedees_naturellement": ("Personne décédée naturellement",),
+    "disparues": ("Personne disparue",),
+    "impliquees_dans_fausse_alerte": (FAUSSE_ALERTE,),
+    "retrouvees": ("Personne retrouvée",),
+    "secourues": ("Personne secourue",),
+    "tirees_daffaire_seule": ("Personne tirée d'affaire seule",),
+    "tous_deces": ("Personne décédée", "Personne décédée accidentellement", "Personne décédée naturellement"),
+    "tous_deces_ou_disparues": ("Personne décédée", "Personne décédée accidentellement",
+                                "Personne décédée naturellement", "Personne disparue"),
+}
+CLANDESTINS = ("Clandestin", "Migrant")
+
+# Taux de valeurs manquantes observés sur les extractions réelles
+NULL_RATES = {
+    "type_operation": 0.46, "pourquoi_alerte": 0.54, "moyen_alerte": 0.005, "categorie_qui_alerte": 0.005,
+    "departement": 0.12, "evenement": 0.004, "autorite": 0.02, "seconde_autorite": 0.965,
+    "zone_responsabilite": 0.03, "position": 0.14, "meteo": 0.27, "mer_force": 0.02,
+    "date_heure_fin_operation": 0.01, "numero_ordre": 0.22, "pavillon": 0.07, "resultat_flotteur": 0.01,
+    "type_flotteur": 0.005, "numero_immatriculation": 0.8, "est_vacances_scolaires": 0.01,
+}
+
+def _weighted(rng, weights: dict, size: int, null_rate: float = 0.0) -> np.ndarray:
+    """Tirage pondéré parmi les clés de `weights` ; None avec la probabilité `null_rate`."""
+    values = np.array(list(weights), dtype=object)
+    p = np.fromiter(weights.values(), dtype=float)
+    drawn = values[rng.choice(len(values), size=size, p=p / p.sum())]
+    if null_rate:
+        drawn[rng.random(size) < null_rate] = None
+    return drawn
+
+def _lookup(values: np.ndarray, mapping: dict, default=None) -> np.ndarray:
+    """Valeur de `mapping` pour chaque élément (None conservé)."""
+    return np.array([mapping.get(v, default) for v in values], dtype=object)
+
+def _pick_per_group(rng, groups: np.ndarray, options: dict) -> np.ndarray:
+    """Pour chaque ligne, choix uniforme parmi les options de son groupe."""
+    picked = np.empty(len(groups), dtype=object)
+    for group, choices in options.items():
+        mask = groups == group
+        if mask.any():
+            picked[mask] = np.array(choices, dtype=object)[rng.integers(0, len(choices), mask.sum())]
+    return picked
+
+def _timestamps(rng, size: int, start_year: int, end_year: int) -> np.ndarray:
+    """Instants de réception : années uniformes, mois et heures selon la saisonnalité observée."""
+    years = rng.integers(start_year, end_year + 1, size)
+    months = rng.choice(12, size=size, p=MONTH_WEIGHTS / MONTH_WEIGHTS.sum())
+    month_start = ((years - 1970) * 12 + months).astype("datetime64[M]")
+    month_days = ((month_start + 1).astype("datetime64[D]") - month_start.astype("datetime64[D]")).astype(int)
+    days = (rng.random(size) * month_days).astype(int)
+    hours = rng.choice(24, size=size, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    minutes = rng.integers(0, 60, size)
+    return (month_start.astype("datetime64[D]") + days).astype("datetime64[m]") + hours * 60 + minutes
+
+def _utc_strings(timestamps: np.ndarray) -> pd.Series:
+    """Horodatages au format des extractions (`2025-06-11 22:50:00+00:00`), sans strftime ligne à ligne."""
+    text = pd.Series(np.datetime_as_string(timestamps, unit="s"), dtype="string")
+    return text.str.replace("T", " ", regex=False) + "+00:00"
+
+def _phase_journee(hours: np.ndarray) -> np.ndarray:
+    """Version vectorisée de prepare_tables.get_phase_journee."""
+    return np.select([(hours >= 6) & (hours < 12), (hours >= 12) & (hours < 14), (hours >= 14) & (hours < 19)],
+                     ["matinée", "déjeuner", "après-midi"], "nuit").astype(object)
+
+def _count_by_operation(positions: np.ndarray, size: int, weights=None) -> np.ndarray:
+    return np.bincount(positions, weights=weights, minlength=size).astype(np.int64)
+
+def _operations(rng, operation_ids: np.ndarray, reception: np.ndarray) -> pd.DataFrame:
+    n = len(operation_ids)
+    cross = _weighted(rng, {name: profile[0] for name, profile in CROSS_PROFILES.items()}, n)
+    evenement = _weighted(rng, {name: event[0] for name, event in EVENEMENTS.items()}, n)
+
+    # Type d'opération : celui de l'événement le plus souvent, sinon tiré globalement
+    type_operation = _lookup(evenement, {name: event[2] for name, event in EVENEMENTS.items()})
+    other_type = rng.random(n) < 0.15
+    type_operation[other_type] = _weighted(rng, TYPE_OPERATION_WEIGHTS, int(other_type.sum()))
+    type_operation[rng.random(n) < NULL_RATES["type_operation"]] = None
+
+    qui_alerte = _weighted(rng, {name: qui[0] for name, qui in QUI_ALERTE.items()}, n)
+    categorie_qui_alerte = _lookup(qui_alerte, {name: qui[1] for name, qui in QUI_ALERTE.items()})
+    categorie_qui_alerte[rng.random(n) < NULL_RATES["categorie_qui_alerte"]] = None
+
+    # Position dans la zone du CROSS
+    bounds = np.array([CROSS_PROFILES[c][4] for c in cross], dtype=float).reshape(n, 4)
+    latitude = np.round(bounds[:, 0] + rng.random(n) * (bounds[:, 1] - bounds[:, 0]), 4)
+    longitude = np.round(bounds[:, 2] + rng.random(n) * (bounds[:, 3] - bounds[:, 2]), 4)
+    no_position = rng.random(n) < NULL_RATES["position"]
+    latitude[no_position] = np.nan
+    longitude[no_position] = np.nan
+
+    # Météo : vent et mer manquent en général ensemble
+    no_meteo = rng.random(n) < NULL_RATES["meteo"]
+    vent_direction = (rng.integers(0, 37, n) * 10).astype(float)
+    vent_direction[no_meteo] = np.nan
+    vent_direction_categorie = WIND_SECTORS[((np.nan_to_num(vent_direction) + 22.5) // 45 % 8).astype(int)]
+    vent_direction_categorie[no_meteo] = None
+    vent_force = np.clip(np.round(rng.normal(3.5, 1.7, n)), 0, 12)
+    vent_force[no_meteo] = np.nan
+    mer_force = np.clip(np.round(rng.normal(2.7, 1.1, n)), 0, 9)
+    mer_force[no_meteo | (rng.random(n) < NULL_RATES["mer_force"])] = np.nan
+
+    # Durées log-normales (médiane ~2 h) ; quelques fins antérieures au début, comme dans les extractions
+    duration = np.round(rng.lognormal(np.log(120), 1.0, n)).astype("timedelta64[m]")
+    duration[rng.random(n) < 0.0007] *= -1
+    fin = _utc_strings(reception + duration)
+    fin[rng.random(n) < NULL_RATES["date_heure_fin_operation"]] = None
+
+    numero_sitrep = rng.integers(1, 2500, n)
+    sitrep_type = pd.Series(type_operation).fillna("SAR")
+    cross_sitrep = (pd.Series(cross) + " " + sitrep_type + " " + reception.astype("datetime64[Y]").astype(str)
+                    + "/" + pd.Series(numero_sitrep).astype(str))
+
+    return pd.DataFrame({
+        "operation_id": operation_ids,
+        "type_operation": type_operation,
+        "pourquoi_alerte": _weighted(rng, POURQUOI_ALERTE_WEIGHTS, n, NULL_RATES["pourquoi_alerte"]),
+        "moyen_alerte": _weighted(rng, MOYEN_ALERTE_WEIGHTS, n, NULL_RATES["moyen_alerte"]),
+        "qui_alerte": qui_alerte,
+        "categorie_qui_alerte": categorie_qui_alerte,
+        "cross": cross,
+        "departement": np.where(rng.random(n) < NULL_RATES["departement"], None,
+                                _pick_per_group(rng, cross, {c: p[1] for c, p in CROSS_PROFILES.items()})),
+        "est_metropolitain": ~np.isin(cross, OVERSEAS_CROSS),
+        "evenement": np.where(rng.random(n) < NULL_RATES["evenement"], None, evenement),
+        "categorie_evenement": _lookup(evenement, {name: event[1] for name, event in EVENEMENTS.items()}),
+        "autorite": _weighted(rng, AUTORITE_WEIGHTS, n, NULL_RATES["autorite"]),
+        "seconde_autorite": _weighted(rng, SECONDE_AUTORITE_WEIGHTS, n, NULL_RATES["seconde_autorite"]),
+        "zone_responsabilite": _weighted(rng, ZONE_RESPONSABILITE_WEIGHTS, n, NULL_RATES["zone_responsabilite"]),
+        "latitude": latitude,
+        "longitude": longitude,
+        "vent_direction": vent_direction,
+        "vent_direction_categorie": vent_direction_categorie,
+        "vent_force": vent_force,
+        "mer_force": mer_force,
+        "date_heure_reception_alerte": _utc_strings(reception),
+        "date_heure_fin_operation": fin,
+        "numero_sitrep": numero_sitrep,
+        "cross_sitrep": cross_sitrep,
+        "fuseau_horaire": _lookup(cross, {c: p[2] for c, p in CROSS_PROFILES.items()}),
+        "systeme_source": np.where(rng.random(n) < 0.03, "seamis_json", "secmarweb"),
+    })
+
+def _flotteurs(rng, operations: pd.DataFrame) -> pd.DataFrame:
+    per_operation = rng.choice(4, size=len(operations), p=[0.2, 0.77, 0.025, 0.005])
+    operation_ids = np.repeat(operations["operation_id"].to_numpy(), per_operation)
+    n = len(operation_ids)
+    # numero_ordre : 1..k au sein de chaque opération
+    starts = np.repeat(np.cumsum(per_operation) - per_operation, per_operation)
+    numero_ordre = (np.arange(n) - starts + 1).astype(float)
+    numero_ordre[rng.random(n) < NULL_RATES["numero_ordre"]] = np.nan
+
+    type_flotteur = _weighted(rng, {name: t[0] for name, t in FLOTTEUR_TYPES.items()}, n)
+    categorie_flotteur = _lookup(type_flotteur, {name: t[1] for name, t in FLOTTEUR_TYPES.items()})
+    no_type = rng.random(n) < NULL_RATES["type_flotteur"]
+    type_flotteur[no_type] = None
+    categorie_flotteur[no_type] = None
+
+    numero_immatriculation = np.full(n, None, dtype=object)
+    registered = np.flatnonzero(rng.random(n) >= NULL_RATES["numero_immatriculation"])
+    digests = rng.integers(0, 256, (len(registered), 20), dtype=np.uint8)
+    numero_immatriculation[registered] = [digest.tobytes().hex() for digest in digests]
+
+    return pd.DataFrame({
+        "operation_id": operation_ids,
+        "numero_ordre": numero_ordre,
+        "pavillon": _weighted(rng, PAVILLON_WEIGHTS, n, NULL_RATES["pavillon"]),
+        "resultat_flotteur": _weighted(rng, RESULTAT_FLOTTEUR_WEIGHTS, n, NULL_RATES["resultat_flotteur"]),
+        "type_flotteur": type_flotteur,
+        "categorie_flotteur": categorie_flotteur,
+        "numero_immatriculation": numero_immatriculation,
+    })
+
+def _resultats_humain(rng, operations: pd.DataFrame) -> pd.DataFrame:
+    per_operation = rng.choice(4, size=len(operations), p=[0.35, 0.55, 0.08, 0.02])
+    positions = np.repeat(np.arange(len(operations)), per_operation)
+    n = len(positions)
+    resultat_humain = _weighted(rng, RESULTAT_HUMAIN_WEIGHTS, n)
+    fausse_alerte = operations["categorie_evenement"].to_numpy()[positions] == "Fausses alertes"
+    resultat_humain[fausse_alerte] = FAUSSE_ALERTE
+
+    categorie_personne = _weighted(rng, CATEGORIE_PERSONNE_WEIGHTS, n)
+    # Médiane 2 personnes ; groupes nombreux pour les migrants
+    nombre = rng.geometric(0.35, n)
+    migrants = np.isin(categorie_personne, CLANDESTINS)
+    nombre[migrants] = rng.integers(5, 80, int(migrants.sum()))
+    return pd.DataFrame({
+        "operation_id": operations["operation_id"].to_numpy()[positions],
+        "categorie_personne": categorie_personne,
+        "resultat_humain": resultat_humain,
+        "nombre": nombre,
+        "dont_nombre_blesse": rng.binomial(nombre, 0.025),
+    })
+
+def _operations_stats(rng, operations: pd.DataFrame, reception: np.ndarray, flotteurs: pd.DataFrame,
+                      resultats_humain: pd.DataFrame) -> pd.DataFrame:
+    n = len(operations)
+    dates = pd.DatetimeIndex(reception)
+    iso = dates.isocalendar()
+    cross = operations["cross"].to_numpy()
+    evenement = operations["evenement"].to_numpy()
+    prefecture = _lookup(cross, {c: p[3] for c, p in CROSS_PROFILES.items()})
+
+    stats = pd.DataFrame({
+        "operation_id": operations["operation_id"].to_numpy(),
+        "date": np.datetime_as_string(reception, unit="D"),
+        "annee": dates.year,
+        "mois": dates.month,
+        "jour": dates.day,
+        "mois_texte": MOIS_TEXTE[dates.month - 1],
+        "semaine": iso["week"].to_numpy(),
+        "annee_semaine": iso["year"].astype(str).to_numpy() + "-" + iso["week"].astype(str).str.zfill(2).to_numpy(),
+        "jour_semaine": JOURS_SEMAINE[dates.dayofweek],
+        "est_weekend": dates.dayofweek >= 5,
+        "est_jour_ferie": np.isin(dates.month * 100 + dates.day, JOURS_FERIES),
+    })
+    vacances = np.where(stats["mois"].isin([7, 8]), True, rng.random(n) < 0.2).astype(object)
+    vacances[rng.random(n) < NULL_RATES["est_vacances_scolaires"]] = None
+    stats["est_vacances_scolaires"] = vacances
+    stats["phase_journee"] = _phase_journee(dates.hour)
+    stats["concerne_plongee"] = np.isin(evenement, DIVING_EVENTS)
+    stats["implique_wingfoil"] = rng.random(n) < 0.002
+    stats["avec_clandestins"] = evenement == "Immigration clandestine"
+
+    # Distance à la côte : nulle pour un quart des opérations, connue si la position l'est
+    distance = np.where(rng.random(n) < 0.25, 0.0, np.round(rng.lognormal(np.log(3000), 2.0, n), -2))
+    distance[operations["latitude"].isna().to_numpy()] = np.nan
+    stats["distance_cote_metres"] = distance
+    stats["distance_cote_milles_nautiques"] = np.round(distance / 1852, 2)
+
+    in_stm = np.isin(cross, list(STM_BY_CROSS)) & (rng.random(n) < 0.08)
+    stats["est_dans_stm"] = in_stm
+    stats["nom_stm"] = np.where(in_stm, _lookup(cross, STM_BY_CROSS), None)
+    in_dst = np.isin(cross, list(DST_BY_CROSS)) & (rng.random(n) < 0.05)
+    stats["est_dans_dst"] = in_dst
+    stats["nom_dst"] = np.where(in_dst, _lookup(cross, DST_BY_CROSS), None)
+    stats["prefecture_maritime"] = prefecture
+
+    # Marée : façades Manche et Atlantique seulement
+    tidal = np.isin(prefecture, list(MAREE_PORTS))
+    coefficient = np.clip(np.round(rng.normal(70, 20, n)), 20, 120)
+    coefficient[~tidal] = np.nan
+    stats["maree_port"] = np.where(tidal, _pick_per_group(rng, prefecture, MAREE_PORTS), None)
+    stats["maree_coefficient"] = coefficient
+    stats["maree_categorie"] = pd.cut(coefficient, [19, 45, 70, 95, 120], labels=MAREE_CATEGORIES).astype(object)
+
+    # Compteurs de personnes, cohérents avec resultats_humain
+    positions = np.searchsorted(stats["operation_id"].to_numpy(), resultats_humain["operation_id"].to_numpy())
+    nombre = resultats_humain["nombre"].to_numpy()
+    resultat = resultats_humain["resultat_humain"].to_numpy()
+    sans_clandestins = ~resultats_humain["categorie_personne"].isin(CLANDESTINS).to_numpy()
+    for suffix, mask in (("", np.ones(len(nombre), dtype=bool)), ("_sans_clandestins", sans_clandestins)):
+        stats[f"nombre_personnes_blessees{suffix}"] = _count_by_operation(
+            positions[mask], n, resultats_humain["dont_nombre_blesse"].to_numpy()[mask])
+        for column, resultats in PERSONNES_COLUMNS.items():
+            selected = mask & np.isin(resultat, resultats)
+            stats[f"nombre_personnes_{column}{suffix}"] = _count_by_operation(positions[selected], n, nombre[selected])
+        stats[f"nombre_personnes_impliquees{suffix}"] = _count_by_operation(positions[mask], n, nombre[mask])
+
+    # Compteurs de flotteurs, cohérents avec flotteurs
+    positions = np.searchsorted(stats["operation_id"].to_numpy(), flotteurs["operation_id"].to_numpy())
+    categories = flotteurs["categorie_flotteur"].to_numpy()
+    types = flotteurs["type_flotteur"].to_numpy()
+    for categorie, column in FLOTTEUR_CATEGORY_COLUMNS.items():
+        name = "nombre_aeronefs_impliques" if column == "aeronefs" else f"nombre_flotteurs_{column}_impliques"
+        stats[name] = _count_by_operation(positions[categories == categorie], n)
+    for column in FLOTTEUR_TYPE_COLUMNS:
+        matching = [name for name, t in FLOTTEUR_TYPES.items() if column in t[2]]
+        stats[f"nombre_flotteurs_{column}_impliques"] = _count_by_operation(positions[np.isin(types, matching)], n)
+    stats["sans_flotteur_implique"] = _count_by_operation(positions, n) == 0
+    return stats
+
+def generate_chunk(seed: int, chunk_index: int, first_operation_id: int, size: int,
+                   start_year: int = 1985, end_year: int = 2025) -> Dict[str, pd.DataFrame]:
+    """Tables d'un morceau de `size` opérations ; ne dépend que de (seed, chunk_index)."""
+    rng = np.random.default_rng([seed, chunk_index])
+    operation_ids = np.arange(first_operation_id, first_operation_id + size, dtype=np.int64)
+    reception = _timestamps(rng, size, start_year, end_year)
+    operations = _operations(rng, operation_ids, reception)
+    flotteurs = _flotteurs(rng, operations)
+    resultats_humain = _resultats_humain(rng, operations)
+    stats = _operations_stats(rng, operations, reception, flotteurs, resultats_humain)
+    return {"operations": operations, "operations_stats": stats,
+            "flotteurs": flotteurs, "resultats_humain": resultats_humain}
+
+def _write_chunk(parts_dir: str, seed: int, chunk_index: int, first_operation_id: int, size: int,
+                 start_year: int, end_year: int) -> Dict[str, int]:
+    """Écrit les fichiers partiels d'un morceau (en-tête seulement pour le premier)."""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    # Écriture pyarrow : environ dix fois plus rapide que DataFrame.to_csv, relue à l'identique par pandas
+    options = pa_csv.WriteOptions(include_header=chunk_index == 0, quoting_style="needed")
+    tables = generate_chunk(seed, chunk_index, first_operation_id, size, start_year, end_year)
+    for name, df in tables.items():
+        pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False),
+                         os.path.join(parts_dir, f"{name}.{chunk_index:06d}.csv"), options)
+    return {name: len(df) for name, df in tables.items()}
+
+def generate_dataset(output_dir=DEFAULT_OUTPUT_DIR, operations: int = 10_000, seed: int = 0,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None,
+                     first_operation_id: int = 1, start_year: int = 1985,
+                     end_year: int = 2025) -> Dict[str, int]:
+    """
+    Écrit operations.csv, operations_stats.csv, flotteurs.csv et resultats_humain.csv dans `output_dir`.
+
+    Les morceaux de `chunk_size` opérations sont générés par `workers` processus
+    (défaut : nombre de CPU) ; le résultat ne dépend que de `seed` et `chunk_size`.
+    Retourne le nombre de lignes écrites par table.
+    """
+    output_dir = Path(output_dir)
+    parts_dir = output_dir / ".parts"
+    parts_dir.mkdir(parents=True, exist_ok=True)
+
+    chunks = [(str(parts_dir), seed, index, first_operation_id + start, min(chunk_size, operations - start),
+               start_year, end_year)
+              for index, start in enumerate(range(0, operations, chunk_size))]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = list(pool.map(_write_chunk, *zip(*chunks)))
+    else:
+        counts = [_write_chunk(*chunk) for chunk in chunks]
+
+    # Concaténation dans l'ordre des morceaux
+    for name in TABLES:
+        with open(output_dir / f"{name}.csv", "wb") as output:
+            for index in range(len(chunks)):
+                part = parts_dir / f"{name}.{index:06d}.csv"
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, output, 1 << 20)
+                part.unlink()
+    parts_dir.rmdir()
+    return {name: sum(count[name] for count in counts) for name in TABLES}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère des données SEC MAR synthétiques (CSV bruts de prepare_tables)")
+    parser.add_argument("--operations", type=int, default=10_000, help="Nombre d'opérations (défaut : 10 000)")
+    parser.add_argument("--seed", type=int, default=0, help="Graine (défaut : 0)")
+    parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR), help="Répertoire de sortie (défaut : data/synthetic)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Opérations par morceau (défaut : {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--workers", type=int, default=None, help="Processus (défaut : nombre de CPU)")
+    parser.add_argument("--first-id", type=int, default=1, help="Premier operation_id (défaut : 1)")
+    parser.add_argument("--start-year", type=int, default=1985, help="Première année (défaut : 1985)")
+    parser.add_argument("--end-year", type=int, default=2025, help="Dernière année (défaut : 2025)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate_dataset(args.output_dir, args.operations, args.seed, args.chunk_size, args.workers,
+                              args.first_id, args.start_year, args.end_year)
+    elapsed = time.perf_counter() - start
+    for name, count in counts.items():
+        print(f"[OK] {name}.csv : {count:,} lignes")
+    print(f"Généré en {elapsed:.1f} s dans {args.output_dir}")
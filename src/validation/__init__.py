@@ -5,7 +5,15 @@ Provides Pandera-based validation with lazy validation and quarantine system.
 """
 
 from .validator import DataValidator, validator
-from .schemas import OPERATIONS_SCHEMA, FLOTTEURS_SCHEMA, RESULTATS_HUMAIN_SCHEMA
+
+# Les schémas (pandera) sont importés au premier accès : `import validation` reste léger
+_SCHEMAS = ('OPERATIONS_SCHEMA', 'FLOTTEURS_SCHEMA', 'RESULTATS_HUMAIN_SCHEMA')
+
+def __getattr__(name):
+    if name in _SCHEMAS:
+        from . import schemas
+        return getattr(schemas, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     'DataValidator',
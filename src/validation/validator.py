@@ -5,24 +5,36 @@ Ce module implémente :
 - Validation paresseuse (collecte toutes les erreurs avant d'échouer)
 - Système de quarantaine pour les données invalides
 - Routage des données valides/invalides
+
+Pandera et les schémas ne sont importés qu'à la première validation : lister ou lire
+la quarantaine ne les charge pas.
+
+Un fichier de quarantaine est un manifeste JSON (source, rapport, contrôles en échec
+avec leur nombre de lignes) accompagné des lignes invalides en Parquet, avec une
+colonne booléenne par contrôle en échec : une page de lignes se lit sans charger le
+fichier entier (groupes de lignes et colonnes demandés seulement).
 """
 
 import pandas as pd
-import pandera as pa
-from pandera.errors import SchemaErrors
-from typing import Tuple, Dict, Any
+from typing import TYPE_CHECKING, Tuple, Dict, Any, List, Optional
 import os
 from datetime import datetime
 import json
 
-from .schemas import OPERATIONS_SCHEMA, FLOTTEURS_SCHEMA, RESULTATS_HUMAIN_SCHEMA
+if TYPE_CHECKING:
+    from pandera.errors import SchemaErrors
+
+# Lignes par groupe Parquet : granularité de lecture d'une page de quarantaine
+QUARANTINE_ROW_GROUP_SIZE = 1000
+# Colonne du numéro de ligne d'origine et préfixe des colonnes de contrôles en échec
+ROW_NUMBER_COLUMN = "_ligne"
+CHECK_COLUMN_PREFIX = "_echec_"
 
 class DataValidator:
     """Système de validation des données avec validation paresseuse et quarantaine."""
 
     def __init__(self, quarantine_dir: str = "data/quarantine"):
         self.quarantine_dir = quarantine_dir
-        os.makedirs(quarantine_dir, exist_ok=True)
 
     def validate_operations(self, df: pd.DataFrame, lazy: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
         """
@@ -35,6 +47,9 @@ class DataValidator:
         Returns:
             Tuple de (données_valides, données_invalides, rapport_validation)
         """
+        from pandera.errors import SchemaErrors
+        from .schemas import OPERATIONS_SCHEMA
+
         try:
             # Attempt validation
             validated_df = OPERATIONS_SCHEMA.validate(df, lazy=lazy)
@@ -56,7 +71,7 @@ class DataValidator:
 
             return valid_data, invalid_data, error_report
 
-    def _process_schema_errors(self, schema_errors: SchemaErrors) -> Dict[str, Any]:
+    def _process_schema_errors(self, schema_errors: "SchemaErrors") -> Dict[str, Any]:
         """Traite les SchemaErrors en un rapport structuré."""
         error_summary = {
             "status": "failed",
@@ -66,6 +81,21 @@ class DataValidator:
             "error_details": {}
         }
 
+        # Lignes en échec par contrôle (index None : toutes les lignes, ex. colonne absente)
+        failure_cases = getattr(schema_errors, "failure_cases", None)
+        if isinstance(failure_cases, pd.DataFrame) and not failure_cases.empty:
+            cases = failure_cases.assign(
+                column=failure_cases["column"].fillna("").astype(str),
+                check=failure_cases["check"].astype(str),
+            )
+            for (column, check), group in cases.groupby(["column", "check"], sort=False):
+                index = None if group["index"].isna().any() else sorted(set(group["index"].tolist()))
+                error_summary["error_details"][f"{column}:{check}" if column else check] = {
+                    "column": column or None,
+                    "check": check,
+                    "index": index,
+                }
+
         # Process schema-level errors
         for error in schema_errors.schema_errors:
             error_summary["schema_errors"].append({
@@ -86,7 +116,7 @@ class DataValidator:
 
         return error_summary
 
-    def _get_valid_rows_mask(self, df: pd.DataFrame, schema_errors: SchemaErrors) -> pd.Series:
+    def _get_valid_rows_mask(self, df: pd.DataFrame, schema_errors: "SchemaErrors") -> pd.Series:
         """Détermine quelles lignes sont valides basées sur les erreurs de validation."""
         # Start with all rows as valid
         valid_mask = pd.Series(True, index=df.index)
@@ -115,17 +145,58 @@ class DataValidator:
         if invalid_data.empty:
             return None
 
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"quarantine_{source}_{timestamp}.json"
+        basename = f"quarantine_{source}_{timestamp}"
+
+        os.makedirs(self.quarantine_dir, exist_ok=True)
+        quarantine_path = os.path.join(self.quarantine_dir, f"{basename}.json")
 
-        quarantine_path = os.path.join(self.quarantine_dir, filename)
+        # Colonnes texte mixtes (valeurs invalides) stockées en texte
+        data = invalid_data.copy()
+        for column in data.columns[data.dtypes == object]:
+            data[column] = data[column].astype(str).where(data[column].notna(), None)
+        data.insert(0, ROW_NUMBER_COLUMN, invalid_data.index)
+
+        checks = []
+        messages = {
+            (error.get("column"), error.get("check")): error.get("error_message")
+            for error in reversed(validation_report.get("schema_errors", []))
+        }
+        for key, detail in (validation_report.get("error_details") or {}).items():
+            failed = invalid_data.index.isin(detail["index"]) if detail["index"] is not None \
+                else [True] * len(invalid_data)
+            rows = int(sum(failed))
+            if not rows:
+                continue
+            data_column = f"{CHECK_COLUMN_PREFIX}{len(checks)}"
+            data[data_column] = failed
+            checks.append({
+                "key": key,
+                "column": detail["column"],
+                "check": detail["check"],
+                "rows": rows,
+                "data_column": data_column,
+                "message": messages.get((detail["column"], detail["check"])),
+            })
+
+        pq.write_table(
+            pa.Table.from_pandas(data, preserve_index=False),
+            os.path.join(self.quarantine_dir, f"{basename}.parquet"),
+            row_group_size=QUARANTINE_ROW_GROUP_SIZE,
+            compression="zstd",
+        )
 
         quarantine_record = {
             "timestamp": datetime.now().isoformat(),
             "source": source,
             "total_invalid_rows": len(invalid_data),
-            "validation_report": validation_report,
-            "invalid_data": invalid_data.to_dict('records')
+            "data_file": f"{basename}.parquet",
+            "columns": [str(column) for column in invalid_data.columns],
+            "checks": checks,
+            "validation_report": {k: v for k, v in validation_report.items() if k != "error_details"},
         }
 
         with open(quarantine_path, 'w', encoding='utf-8') as f:
@@ -146,8 +217,82 @@ class DataValidator:
         with open(filepath, 'r', encoding='utf-8') as f:
             return json.load(f)
 
+    def quarantine_error_groups(self, record: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Erreurs d'un fichier de quarantaine regroupées par colonne et contrôle.
+
+        Returns:
+            DataFrame (colonne, controle, lignes, message), lignes étant vide pour les
+            fichiers de l'ancien format (sans détail par ligne)
+        """
+        if "checks" in record:
+            groups = pd.DataFrame(record["checks"], columns=["column", "check", "rows", "message"])
+        else:
+            errors = record.get("validation_report", {})
+            groups = pd.DataFrame(
+                errors.get("schema_errors", []) + errors.get("dataframe_errors", []),
+                columns=["column", "check", "error_message"],
+            )
+            groups = groups.groupby(["column", "check"], dropna=False, sort=False, as_index=False) \
+                .agg(message=("error_message", "first"))
+            groups.insert(2, "rows", None)
+        return groups.rename(columns={"column": "colonne", "check": "controle", "rows": "lignes"})
+
+    def load_quarantine_page(self, filename: str, offset: int = 0, limit: int = 100,
+                             columns: Optional[List[str]] = None,
+                             check: Optional[str] = None) -> Tuple[pd.DataFrame, int]:
+        """
+        Lit une page des lignes d'un fichier de quarantaine.
+
+        Seuls les groupes de lignes Parquet de la page et les colonnes demandées sont lus
+        (plus, avec `check`, la colonne booléenne de ce contrôle).
+
+        Args:
+            filename: manifeste (fichier .json de get_quarantine_files)
+            offset: position de la première ligne de la page
+            limit: nombre de lignes de la page
+            columns: colonnes à lire (toutes si None)
+            check: clé d'un contrôle du manifeste : seules ses lignes en échec sont retenues
+
+        Returns:
+            Tuple de (page, nombre de lignes retenues)
+        """
+        record = self.load_quarantine_file(filename)
+        columns = [ROW_NUMBER_COLUMN] + [c for c in (columns or record.get("columns", [])) if c != ROW_NUMBER_COLUMN]
+
+        if "data_file" not in record:
+            # Ancien format : lignes incluses dans le manifeste, sans détail par contrôle
+            rows = pd.DataFrame(record.get("invalid_data", []))
+            rows.insert(0, ROW_NUMBER_COLUMN, rows.index)
+            return rows[[c for c in columns if c in rows.columns]].iloc[offset:offset + limit], len(rows)
+
+        import numpy as np
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(os.path.join(self.quarantine_dir, record["data_file"]))
+        if check is not None:
+            data_column = {c["key"]: c["data_column"] for c in record["checks"]}[check]
+            failed = parquet.read(columns=[data_column]).column(0).to_numpy(zero_copy_only=False)
+            positions = np.flatnonzero(failed)
+        else:
+            positions = np.arange(parquet.metadata.num_rows)
+        wanted = positions[offset:offset + limit]
+
+        frames, start = [], 0
+        for row_group in range(parquet.num_row_groups):
+            size = parquet.metadata.row_group(row_group).num_rows
+            local = wanted[(wanted >= start) & (wanted < start + size)] - start
+            if len(local):
+                frames.append(parquet.read_row_group(row_group, columns=columns).take(local).to_pandas())
+            start += size
+        page = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        return page, len(positions)
+
     def validate_flotteurs(self, df: pd.DataFrame, lazy: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
         """Valide les données de flotteurs."""
+        from pandera.errors import SchemaErrors
+        from .schemas import FLOTTEURS_SCHEMA
+
         try:
             validated_df = FLOTTEURS_SCHEMA.validate(df, lazy=lazy)
             return validated_df, pd.DataFrame(), {"status": "success", "errors": []}
@@ -160,6 +305,9 @@ class DataValidator:
 
     def validate_resultats_humain(self, df: pd.DataFrame, lazy: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
         """Valide les données de résultats humain."""
+        from pandera.errors import SchemaErrors
+        from .schemas import RESULTATS_HUMAIN_SCHEMA
+
         try:
             validated_df = RESULTATS_HUMAIN_SCHEMA.validate(df, lazy=lazy)
             return validated_df, pd.DataFrame(), {"status": "success", "errors": []}
@@ -170,5 +318,5 @@ class DataValidator:
             invalid_data = df[~valid_mask].copy() if (~valid_mask).any() else pd.DataFrame()
             return valid_data, invalid_data, error_report
 
-# Global validator instance
+# Global validator instance (sans effet de bord : le répertoire est créé à la première mise en quarantaine)
 validator = DataValidator()
\ No newline at end of file